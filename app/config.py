@@ -1,4 +1,6 @@
 from functools import lru_cache
+from typing import Any
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -11,11 +13,58 @@ class Settings(BaseSettings):
     database_url: str = Field("sqlite:///./meta_agent.db", alias="DATABASE_URL")
     redis_url: str = Field("redis://localhost:6379/0", alias="REDIS_URL")
 
+    # Snapshot cache encoding: codec is orjson or msgpack; compression is none, zlib, zstd or lz4
+    cache_codec: str = Field("orjson", alias="CACHE_CODEC")
+    cache_compression: str = Field("zlib", alias="CACHE_COMPRESSION")
+    cache_compress_min_bytes: int = Field(1024, alias="CACHE_COMPRESS_MIN_BYTES")
+
+    # Shared outbound HTTP client pools (one per upstream host)
+    http_timeout_seconds: float = Field(30.0, alias="HTTP_TIMEOUT_SECONDS")
+    http_connect_timeout_seconds: float = Field(5.0, alias="HTTP_CONNECT_TIMEOUT_SECONDS")
+    http_max_connections: int = Field(100, alias="HTTP_MAX_CONNECTIONS")
+    http_max_keepalive_connections: int = Field(20, alias="HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    http_keepalive_expiry_seconds: float = Field(30.0, alias="HTTP_KEEPALIVE_EXPIRY_SECONDS")
+    http2_enabled: bool = Field(True, alias="HTTP2_ENABLED")
+
     jwt_secret: str = Field("change-me", alias="JWT_SECRET")
     jwt_exp_minutes: int = Field(60, alias="JWT_EXP_MINUTES")
+    # Bearer tokens are checked by AuthMiddleware on every route except these prefixes
+    auth_required: bool = Field(True, alias="AUTH_REQUIRED")
+    auth_public_paths: str = Field("/health,/auth/login,/docs,/redoc,/openapi.json", alias="AUTH_PUBLIC_PATHS")
+    auth_cache_ttl_seconds: float = Field(300.0, alias="AUTH_CACHE_TTL_SECONDS")
+    auth_cache_max_entries: int = Field(10_000, alias="AUTH_CACHE_MAX_ENTRIES")
+
+    # Per-tenant token buckets on expensive endpoints, {"bucket": {"capacity": n, "per_minute": n}};
+    # RATE_LIMIT_OVERRIDES sets them per tenant, e.g. {"agency@example.com": {"workflow": {...}}}
+    rate_limits: dict[str, dict[str, float]] = Field(
+        default_factory=lambda: {
+            "workflow": {"capacity": 10.0, "per_minute": 4.0},
+            "traffic": {"capacity": 50.0, "per_minute": 20.0},
+            "refresh": {"capacity": 20.0, "per_minute": 10.0},
+        },
+        alias="RATE_LIMITS",
+    )
+    rate_limit_overrides: dict[str, dict[str, dict[str, float]]] = Field(
+        default_factory=dict, alias="RATE_LIMIT_OVERRIDES"
+    )
 
     meta_ads_token: str = Field("", alias="META_ADS_TOKEN")
     meta_business_id: str = Field("", alias="META_BUSINESS_ID")
+    meta_graph_url: str = Field("", alias="META_GRAPH_URL")  # override for a local Graph API stand-in
+    # Comma-separated async insights levels pulled per refresh, e.g. "campaign,adset,ad"
+    meta_breakdown_levels: str = Field("", alias="META_BREAKDOWN_LEVELS")
+    # Highest-spend rows kept per level; the rest never reach the prompt, cache or DB.
+    meta_breakdown_max_rows: int = Field(25, alias="META_BREAKDOWN_MAX_ROWS")
+    meta_async_max_jobs: int = Field(10, alias="META_ASYNC_MAX_JOBS")
+    meta_async_job_timeout_seconds: int = Field(600, alias="META_ASYNC_JOB_TIMEOUT_SECONDS")
+
+    # Meta quota governor (percentages of Meta's usage windows)
+    meta_quota_soft_pct: float = Field(75.0, alias="META_QUOTA_SOFT_PCT")
+    meta_quota_hard_pct: float = Field(95.0, alias="META_QUOTA_HARD_PCT")
+    meta_quota_pace_seconds: float = Field(10.0, alias="META_QUOTA_PACE_SECONDS")
+    meta_quota_max_inline_wait_seconds: float = Field(15.0, alias="META_QUOTA_MAX_INLINE_WAIT_SECONDS")
+    meta_quota_cooldown_seconds: float = Field(300.0, alias="META_QUOTA_COOLDOWN_SECONDS")
+    meta_quota_window_seconds: int = Field(3600, alias="META_QUOTA_WINDOW_SECONDS")
 
     comp_intel_api_key: str = Field("", alias="COMP_INTEL_API_KEY")
     
@@ -33,10 +82,85 @@ class Settings(BaseSettings):
     # Claude model selection
     claude_model: str = Field("claude-3-5-sonnet-20240620", alias="CLAUDE_MODEL")
 
+    # Adaptive model routing; MODEL_ROUTING_RULES (JSON list) replaces the built-in rules,
+    # LLM_TENANT_BUDGETS maps account IDs to {"max_latency_ms": ..., "max_tokens_per_hour": ...}
+    model_routing_enabled: bool = Field(False, alias="MODEL_ROUTING_ENABLED")
+    model_routing_dry_run: bool = Field(False, alias="MODEL_ROUTING_DRY_RUN")
+    model_routing_rules: list[dict[str, Any]] = Field(default_factory=list, alias="MODEL_ROUTING_RULES")
+    model_routing_stats_window_minutes: int = Field(60, alias="MODEL_ROUTING_STATS_WINDOW_MINUTES")
+    model_routing_stats_ttl_seconds: int = Field(60, alias="MODEL_ROUTING_STATS_TTL_SECONDS")
+    model_routing_max_error_rate: float = Field(0.2, alias="MODEL_ROUTING_MAX_ERROR_RATE")
+    llm_tenant_budgets: dict[str, dict[str, float]] = Field(default_factory=dict, alias="LLM_TENANT_BUDGETS")
+
+    # Batch insight generation for scheduled refreshes
+    insight_batch_enabled: bool = Field(False, alias="INSIGHT_BATCH_ENABLED")
+    insight_batch_provider: str = Field("claude", alias="INSIGHT_BATCH_PROVIDER")
+    insight_batch_poll_seconds: int = Field(60, alias="INSIGHT_BATCH_POLL_SECONDS")
+    insight_batch_timeout_seconds: int = Field(3300, alias="INSIGHT_BATCH_TIMEOUT_SECONDS")
+
+    # Admission control for /workflow/execute and /workflow/task: concurrent calls per provider
+    # (ADMISSION_PROVIDER_CONCURRENCY overrides per provider, e.g. {"claude": 16}), a bounded wait
+    # queue, and the default deadline a request's queue wait plus typical call time must fit in
+    admission_default_concurrency: int = Field(8, alias="ADMISSION_DEFAULT_CONCURRENCY")
+    admission_provider_concurrency: dict[str, int] = Field(
+        default_factory=dict, alias="ADMISSION_PROVIDER_CONCURRENCY"
+    )
+    admission_max_queue: int = Field(16, alias="ADMISSION_MAX_QUEUE")
+    admission_deadline_seconds: float = Field(120.0, alias="ADMISSION_DEADLINE_SECONDS")
+
+    # Long-poll bounds for GET /workflow/jobs/{id}?wait=
+    workflow_job_poll_seconds: float = Field(1.0, alias="WORKFLOW_JOB_POLL_SECONDS")
+    workflow_job_max_wait_seconds: int = Field(30, alias="WORKFLOW_JOB_MAX_WAIT_SECONDS")
+    # Hard time limit of a workflow job on the worker; a job still "running" after it is failed
+    workflow_job_time_limit_seconds: int = Field(1800, alias="WORKFLOW_JOB_TIME_LIMIT_SECONDS")
+
     alert_webhook_url: str = Field("", alias="ALERT_WEBHOOK_URL")
     alert_emails: str = Field("", alias="ALERT_EMAILS")
+    # Repeats of an (account, type, severity bucket) alert within the window are only counted;
+    # delivered alerts are bundled into one digest every ALERT_DIGEST_INTERVAL_MINUTES.
+    alert_suppression_seconds: int = Field(21600, alias="ALERT_SUPPRESSION_SECONDS")
+    alert_digest_enabled: bool = Field(True, alias="ALERT_DIGEST_ENABLED")
+    alert_digest_interval_minutes: int = Field(15, alias="ALERT_DIGEST_INTERVAL_MINUTES")
+    alert_digest_max_items: int = Field(500, alias="ALERT_DIGEST_MAX_ITEMS")
+    alert_digest_max_retries: int = Field(3, alias="ALERT_DIGEST_MAX_RETRIES")
+
+    # Alert email (sent to ALERT_EMAILS, comma-separated) over pooled SMTP connections
+    smtp_host: str = Field("", alias="SMTP_HOST")
+    smtp_port: int = Field(587, alias="SMTP_PORT")
+    smtp_username: str = Field("", alias="SMTP_USERNAME")
+    smtp_password: str = Field("", alias="SMTP_PASSWORD")
+    smtp_use_tls: bool = Field(True, alias="SMTP_USE_TLS")
+    smtp_sender: str = Field("alerts@localhost", alias="SMTP_SENDER")
+    smtp_pool_size: int = Field(4, alias="SMTP_POOL_SIZE")
+    smtp_timeout_seconds: float = Field(10.0, alias="SMTP_TIMEOUT_SECONDS")
+    alert_email_max_retries: int = Field(3, alias="ALERT_EMAIL_MAX_RETRIES")
+
+    # JSON responses at least this large are gzip/brotli compressed (report endpoints)
+    response_compress_min_bytes: int = Field(1024, alias="RESPONSE_COMPRESS_MIN_BYTES")
+    response_gzip_level: int = Field(6, alias="RESPONSE_GZIP_LEVEL")
+    response_brotli_quality: int = Field(5, alias="RESPONSE_BROTLI_QUALITY")
+
+    # Push channel (GET /events/stream, WS /events/ws)
+    event_heartbeat_seconds: float = Field(15.0, alias="EVENT_HEARTBEAT_SECONDS")
+    event_queue_size: int = Field(100, alias="EVENT_QUEUE_SIZE")
 
     report_bucket_path: str = Field("/reports", alias="REPORT_BUCKET_PATH")
+    # Processes rendering HTML/PDF artifacts on first download (under REPORT_BUCKET_PATH/rendered)
+    render_pool_size: int = Field(2, alias="RENDER_POOL_SIZE")
+
+    # Columnar archive for aged report_runs payloads
+    archive_path: str = Field("/reports/archive", alias="ARCHIVE_PATH")
+    archive_after_days: int = Field(90, alias="ARCHIVE_AFTER_DAYS")
+
+    # Retention defaults; RETENTION_POLICIES overrides them per account as JSON,
+    # e.g. {"123": {"rollup_after_days": 14, "alert_retention_days": 30}}
+    retention_rollup_after_days: int = Field(30, alias="RETENTION_ROLLUP_AFTER_DAYS")
+    retention_prune_after_days: int = Field(7, alias="RETENTION_PRUNE_AFTER_DAYS")
+    alert_retention_days: int = Field(90, alias="ALERT_RETENTION_DAYS")
+    # Stored workflow step results are reused for this long, then deleted by the retention job
+    workflow_step_retention_days: int = Field(14, alias="WORKFLOW_STEP_RETENTION_DAYS")
+    retention_batch_size: int = Field(500, alias="RETENTION_BATCH_SIZE")
+    retention_policies: dict[str, dict[str, int]] = Field(default_factory=dict, alias="RETENTION_POLICIES")
 
     otel_endpoint: str = Field("", alias="OTEL_EXPORTER_OTLP_ENDPOINT")
 
@@ -48,5 +172,6 @@ class Settings(BaseSettings):
 
 @lru_cache
 def get_settings() -> Settings:
-    return Settings()
+    # Fields are filled from the environment by their aliases, which mypy cannot see.
+    return Settings()  # type: ignore[call-arg]
 
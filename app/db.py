@@ -1,6 +1,7 @@
 from contextlib import contextmanager
 from typing import Generator
 
+from sqlalchemy import Engine, inspect, text
 from sqlmodel import Session, SQLModel, create_engine
 
 from app.config import get_settings
@@ -10,8 +11,39 @@ settings = get_settings()
 engine = create_engine(settings.database_url, echo=settings.environment == "local")
 
 
-def init_db() -> None:
-    SQLModel.metadata.create_all(engine)
+def _add_missing_columns(bind: Engine) -> None:
+    """Add columns that models gained after their table was created.
+
+    Columns are added nullable, so this works on tables that already hold rows;
+    existing rows read the new column as NULL.
+    """
+    inspector = inspect(bind)
+    preparer = bind.dialect.identifier_preparer
+    with bind.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=bind.dialect)}"
+                    )
+                )
+
+
+def init_db(bind: Engine | None = None) -> None:
+    bind = bind or engine
+    SQLModel.metadata.create_all(bind)
+    # create_all skips tables that already exist, so columns and indexes added to a
+    # model later are created here.
+    _add_missing_columns(bind)
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind, checkfirst=True)
 
 
 @contextmanager
@@ -21,4 +53,3 @@ def get_session() -> Generator[Session, None, None]:
         yield session
     finally:
         session.close()
-
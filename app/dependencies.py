@@ -1,11 +1,59 @@
-from typing import Generator
+import math
+from collections.abc import Callable, Generator
+from typing import Annotated
 
+from fastapi import Depends, HTTPException, Request, status
 from sqlmodel import Session
 
+from app.config import get_settings
 from app.db import get_session
+from app.services.rate_limiter import TokenBucketLimiter
+
+settings = get_settings()
+rate_limiter = TokenBucketLimiter()
 
 
 def get_db_session() -> Generator[Session, None, None]:
     with get_session() as session:
         yield session
 
+
+DbSession = Annotated[Session, Depends(get_db_session)]
+
+
+def request_tenant(request: Request) -> str:
+    """Tenant set by AuthMiddleware; unauthenticated calls (auth disabled) share a bucket per client IP."""
+    tenant = getattr(request.state, "tenant", None)
+    if tenant:
+        return tenant
+    return f"anon:{request.client.host if request.client else 'unknown'}"
+
+
+def request_timeout(request: Request) -> float:
+    """Seconds the caller will wait (``X-Request-Timeout``), capped at the server default."""
+    try:
+        timeout = float(request.headers.get("x-request-timeout", settings.admission_deadline_seconds))
+    except ValueError:
+        timeout = settings.admission_deadline_seconds
+    if not math.isfinite(timeout):
+        timeout = settings.admission_deadline_seconds
+    return min(max(timeout, 0.0), settings.admission_deadline_seconds)
+
+
+def enforce_rate_limit(request: Request, bucket: str, cost: float = 1.0) -> None:
+    decision = rate_limiter.take(request_tenant(request), bucket, cost)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Rate limit exceeded for {bucket}",
+            headers={"Retry-After": str(max(1, math.ceil(decision.retry_after)))},
+        )
+
+
+def rate_limit(bucket: str, cost: float = 1.0) -> Callable[[Request], None]:
+    """Route dependency spending ``cost`` tokens from the caller's ``bucket``."""
+
+    def dependency(request: Request) -> None:
+        enforce_rate_limit(request, bucket, cost)
+
+    return dependency
@@ -1,20 +1,45 @@
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import get_settings
 from app.db import init_db
 from app.logging_config import configure_logging
-from app.routers import api_router
+from app.middleware import AuthMiddleware
+from app.routers import api_router, reports
+from app.services.admission import Overloaded, retry_after_header
+from app.services.event_bus import event_broker
+from app.services.http_clients import http_clients
 
 configure_logging()
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    init_db()
+    await http_clients.start()
+    try:
+        yield
+    finally:
+        await event_broker.close()
+        reports.renderer.shutdown()
+        await http_clients.aclose()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Meta Growth Agent",
     version="0.1.0",
     description="Backend agent for Meta Ads diagnostics and competitor intelligence.",
 )
 
+# Added before CORS so CORS stays outermost: preflights and 401s still carry CORS headers
+app.add_middleware(AuthMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -32,9 +57,13 @@ app.add_middleware(
 app.include_router(api_router)
 
 
-@app.on_event("startup")
-async def startup_event() -> None:
-    init_db()
+@app.exception_handler(Overloaded)
+async def overloaded(_: Request, exc: Overloaded) -> JSONResponse:
+    return JSONResponse(
+        {"detail": str(exc), "reason": exc.reason},
+        status_code=503,
+        headers=retry_after_header(exc),
+    )
 
 
 @app.get("/health")
@@ -0,0 +1,100 @@
+"""ASGI middleware: bearer-token verification."""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any
+from urllib.parse import parse_qs
+
+import jwt
+import structlog
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+
+class TokenVerifier:
+    """Verifies HS256 tokens, keeping decoded claims in a small TTL/LRU cache.
+
+    Dashboards poll with the same token every few seconds; a hit skips the HMAC and
+    JSON work. Entries never outlive the token's own ``exp``.
+    """
+
+    def __init__(self, ttl_seconds: float | None = None, max_entries: int | None = None) -> None:
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.auth_cache_ttl_seconds
+        self.max_entries = max_entries or settings.auth_cache_max_entries
+        self._cache: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """Return the token's claims; raises ``jwt.InvalidTokenError`` when it is not valid."""
+        now = time.time()
+        hit = self._cache.get(token)
+        if hit is not None:
+            if hit[0] > now:
+                self._cache.move_to_end(token)
+                return hit[1]
+            del self._cache[token]
+
+        claims = jwt.decode(token, settings.jwt_secret, algorithms=["HS256"], options={"require": ["sub", "exp"]})
+        self._cache[token] = (min(now + self.ttl_seconds, float(claims["exp"])), claims)
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return claims
+
+
+def _bearer_token(scope: Scope) -> str | None:
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token.strip() if scheme.lower() == "bearer" else None
+    # EventSource and WebSocket clients cannot set headers.
+    values = parse_qs(scope.get("query_string", b"").decode()).get("access_token")
+    return values[0] if values else None
+
+
+class AuthMiddleware:
+    """Rejects requests without a valid bearer token, except on public paths.
+
+    Verified claims are placed on ``request.state.claims`` and the tenant (the ``tenant``
+    claim, falling back to ``sub``) on ``request.state.tenant`` for rate limiting.
+    """
+
+    def __init__(self, app: ASGIApp, verifier: TokenVerifier | None = None) -> None:
+        self.app = app
+        self.verifier = verifier or TokenVerifier()
+        self.public_paths = tuple(path.strip() for path in settings.auth_public_paths.split(",") if path.strip())
+
+    def _is_public(self, path: str) -> bool:
+        return any(path == public or path.startswith(public.rstrip("/") + "/") for public in self.public_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket") or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        token = _bearer_token(scope)
+        claims = None
+        if token:
+            try:
+                claims = self.verifier.verify(token)
+            except jwt.InvalidTokenError as exc:
+                logger.info("auth.invalid_token", path=scope["path"], error=str(exc))
+
+        if claims is not None:
+            state = scope.setdefault("state", {})
+            state["claims"] = claims
+            state["tenant"] = str(claims.get("tenant") or claims["sub"])
+        elif settings.auth_required and not self._is_public(scope["path"]):
+            if scope["type"] == "websocket":
+                await send({"type": "websocket.close", "code": 1008})
+                return
+            response = JSONResponse(
+                {"detail": "Invalid or missing bearer token"}, status_code=401, headers={"WWW-Authenticate": "Bearer"}
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
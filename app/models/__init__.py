@@ -1,2 +1,3 @@
-from app.models.report import AlertEvent, ReportRun  # noqa: F401
-
+from app.models.report import AlertEvent, ReportDailySummary, ReportRun  # noqa: F401
+from app.models.usage import LLMUsageHourly  # noqa: F401
+from app.models.workflow import WorkflowJob, WorkflowStepResult  # noqa: F401
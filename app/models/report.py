@@ -1,10 +1,14 @@
-from datetime import datetime
+from datetime import UTC, date, datetime
 from typing import Any, Optional
 
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, Column, Index, UniqueConstraint
 from sqlmodel import Field, SQLModel
 
 
+def utcnow() -> datetime:
+    return datetime.now(UTC)
+
+
 class ReportRun(SQLModel, table=True):
     __tablename__ = "report_runs"
 
@@ -15,18 +19,46 @@ class ReportRun(SQLModel, table=True):
     competitor_payload: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
     insight_text: str
     insight_metadata: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    # StructuredInsight sections, parsed once when the run is saved.
+    insight_structured: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
     artifacts_path: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Set once the payloads have been moved to the columnar archive; the row stays as a pointer.
+    archive_path: str | None = None
+    # Key of the archive files the row is written to, recorded before they are written.
+    archive_batch: str | None = None
+    created_at: datetime = Field(default_factory=utcnow)
 
 
 class AlertEvent(SQLModel, table=True):
     __tablename__ = "alert_events"
+    # Keyset pages are ordered by (created_at, id), optionally scoped to accounts and severity.
+    __table_args__ = (
+        Index("ix_alert_events_created_id", "created_at", "id"),
+        Index("ix_alert_events_account_created_id", "account_id", "created_at", "id"),
+        Index("ix_alert_events_account_severity_created_id", "account_id", "severity", "created_at", "id"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     account_id: str
     alert_type: str
     severity: str
     message: str
-    metadata: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # "metadata" is reserved on declarative models, so the attribute is renamed but the column is not.
+    alert_metadata: dict[str, Any] = Field(default_factory=dict, sa_column=Column("metadata", JSON))
+    created_at: datetime = Field(default_factory=utcnow)
+
+
+class ReportDailySummary(SQLModel, table=True):
+    """One row per account per day, replacing the hourly runs once they age out."""
+
+    __tablename__ = "report_daily_summaries"
+    __table_args__ = (UniqueConstraint("account_id", "day"),)
 
+    id: int | None = Field(default=None, primary_key=True)
+    account_id: str = Field(index=True)
+    day: date
+    run_count: int = 0
+    avg_spend: float | None = None
+    avg_purchase_roas: float | None = None
+    last_run_id: int | None = None
+    created_at: datetime = Field(default_factory=utcnow)
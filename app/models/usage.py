@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+from app.models.report import utcnow
+
+
+class LLMUsageHourly(SQLModel, table=True):
+    """LLM calls rolled up per hour, account, task, provider and model."""
+
+    __tablename__ = "llm_usage_hourly"
+    __table_args__ = (UniqueConstraint("hour", "account_id", "task", "provider", "model"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    hour: datetime = Field(index=True)
+    account_id: str = Field(index=True)
+    task: str
+    provider: str
+    model: str
+    calls: int = 0
+    errors: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms_total: float = 0.0
+    latency_ms_max: float = 0.0
+    updated_at: datetime = Field(default_factory=utcnow)
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import JSON, Column, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+from app.models.report import utcnow
+
+
+class WorkflowStepResult(SQLModel, table=True):
+    """Output of one workflow step, keyed by a fingerprint of the inputs it consumed."""
+
+    __tablename__ = "workflow_step_results"
+    __table_args__ = (UniqueConstraint("task", "fingerprint"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    task: str
+    fingerprint: str = Field(index=True)
+    domain: str = Field(index=True)
+    provider: str
+    model: str
+    content: str
+    response_metadata: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=utcnow)
+
+
+class WorkflowJob(SQLModel, table=True):
+    """A market-research workflow run queued for a Celery worker."""
+
+    __tablename__ = "workflow_jobs"
+
+    id: str = Field(primary_key=True)
+    domain: str
+    status: str = Field(default="queued", index=True)  # queued, running, succeeded, failed
+    # The request and the provider mapping are snapshotted at submit time so the job
+    # is unaffected by later /workflow/config changes.
+    request_payload: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    config: dict[str, str] = Field(default_factory=dict, sa_column=Column(JSON))
+    result: dict[str, Any] | None = Field(default=None, sa_column=Column(JSON))
+    error: str | None = None
+    created_at: datetime = Field(default_factory=utcnow)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
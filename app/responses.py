@@ -0,0 +1,62 @@
+"""JSON responses encoded with orjson and compressed according to ``Accept-Encoding``."""
+from __future__ import annotations
+
+import gzip
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+
+from app.config import get_settings
+
+try:
+    import brotli  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+settings = get_settings()
+
+# Server preference when the client accepts several with equal weight.
+ENCODINGS = ("br", "gzip")
+
+
+def _accepted(header: str) -> dict[str, float]:
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    accepted = _accepted(accept_encoding)
+    candidates = [
+        (accepted.get(encoding, accepted.get("*", 0.0)), -index, encoding)
+        for index, encoding in enumerate(ENCODINGS)
+        if encoding != "br" or brotli is not None
+    ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+def json_response(request: Request, content: Any, status_code: int = 200) -> Response:
+    """Serialize ``content`` with orjson; bodies above the threshold are gzip/brotli compressed."""
+    body = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= settings.response_compress_min_bytes:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding == "br":
+            body = brotli.compress(body, quality=settings.response_brotli_quality)
+        elif encoding == "gzip":
+            body = gzip.compress(body, compresslevel=settings.response_gzip_level)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.routers import reports, alerts, auth, workflow, traffic
+from app.routers import reports, alerts, auth, workflow, traffic, usage, events
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
@@ -8,4 +8,5 @@ api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
 api_router.include_router(workflow.router, prefix="/workflow", tags=["workflow"])
 api_router.include_router(traffic.router, prefix="/traffic", tags=["traffic"])
-
+api_router.include_router(usage.router, prefix="/usage", tags=["usage"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
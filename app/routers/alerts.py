@@ -1,18 +1,54 @@
-from typing import List
+from datetime import datetime
+from typing import Annotated
 
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+from fastapi import APIRouter, HTTPException, Query, Response, status
 
-from app.dependencies import get_db_session
-from app.models.report import AlertEvent
+from app.dependencies import DbSession
 from app.schemas.alerts import AlertResponse
+from app.services.alert_query_service import AlertQueryService
 
 router = APIRouter()
+query_service = AlertQueryService()
 
 
-@router.get("/", response_model=List[AlertResponse])
-async def list_alerts(db: Session = Depends(get_db_session)) -> list[AlertResponse]:
-    statement = select(AlertEvent).order_by(AlertEvent.created_at.desc()).limit(50)
-    results = db.exec(statement).all()
-    return [AlertResponse(**alert.model_dump()) for alert in results]
+def _split(value: str | None) -> list[str] | None:
+    return [item.strip() for item in value.split(",") if item.strip()] if value else None
 
+
+@router.get("/", response_model=list[AlertResponse])
+def list_alerts(
+    response: Response,
+    db: DbSession,
+    account_ids: Annotated[
+        str | None, Query(description="Comma-separated ad account IDs; all accounts when omitted")
+    ] = None,
+    severity: Annotated[str | None, Query(description="Comma-separated severities")] = None,
+    alert_type: Annotated[str | None, Query(description="Comma-separated alert types")] = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: Annotated[str | None, Query(description="X-Next-Cursor from the previous page")] = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+    with_total: Annotated[
+        bool, Query(description="Return an estimated match count in X-Total-Estimate / X-Total-Exact")
+    ] = False,
+) -> list[AlertResponse]:
+    """Newest alerts first. The next page's cursor is returned in the ``X-Next-Cursor`` header."""
+    filters = {
+        "account_ids": _split(account_ids),
+        "severities": _split(severity),
+        "alert_types": _split(alert_type),
+        "since": since,
+        "until": until,
+    }
+    try:
+        items, next_cursor = query_service.list_alerts(db, limit=limit, cursor=cursor, **filters)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if with_total:
+        total, exact = query_service.estimate_total(db, **filters)
+        response.headers["X-Total-Estimate"] = str(total)
+        response.headers["X-Total-Exact"] = str(exact).lower()
+    return items
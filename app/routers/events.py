@@ -0,0 +1,55 @@
+from typing import Annotated
+
+import orjson
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from app.config import get_settings
+from app.services.event_bus import event_broker
+
+router = APIRouter()
+settings = get_settings()
+
+
+def _split(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+@router.get("/stream")
+async def stream_events(
+    account_ids: Annotated[str, Query(description="Comma-separated ad account IDs")],
+) -> StreamingResponse:
+    """Server-sent events for new reports and alerts, with a comment line as heartbeat."""
+    # An empty filter would subscribe to every tenant's events.
+    accounts = _split(account_ids)
+    if not accounts:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="account_ids is required")
+
+    async def body():  # type: ignore[no-untyped-def]
+        async with event_broker.subscribe(accounts) as subscription:
+            while True:
+                event = await subscription.next(settings.event_heartbeat_seconds)
+                if event is None:
+                    yield b": keepalive\n\n"
+                else:
+                    yield b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+    return StreamingResponse(
+        body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, account_ids: str) -> None:
+    accounts = _split(account_ids)
+    if not accounts:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="account_ids is required")
+        return
+    await websocket.accept()
+    try:
+        async with event_broker.subscribe(accounts) as subscription:
+            while True:
+                event = await subscription.next(settings.event_heartbeat_seconds)
+                await websocket.send_json(event or {"type": "heartbeat"})
+    except WebSocketDisconnect:
+        pass
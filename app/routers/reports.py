@@ -1,28 +1,213 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from datetime import datetime
+from typing import Annotated, Any
 
-from app.dependencies import get_db_session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlmodel import Session, col, select
+
+from app.dependencies import DbSession, rate_limit
 from app.models.report import ReportRun
-from app.schemas.reports import RefreshRequest, ReportResponse, ReportSummary
-from app.services.report_service import ReportService
+from app.responses import json_response
+from app.schemas.reports import (
+    BatchReportRequest,
+    BatchReportResponse,
+    RefreshRequest,
+    ReportResponse,
+)
+from app.services.report_export_service import EXPORT_FORMATS, ReportExportService
+from app.services.report_renderer import (
+    RENDER_FORMATS,
+    RenderUnavailable,
+    ReportArchived,
+    ReportRenderer,
+)
+from app.services.report_service import ReportService, report_field_spec
 from app.tasks.refresh import enqueue_refresh
 
 router = APIRouter()
 service = ReportService()
+export_service = ReportExportService()
+renderer = ReportRenderer()
+
+MAX_BATCH_ACCOUNTS = 100
+# Per export request; larger exports are resumed with after_id.
+EXPORT_MAX_ROWS = 50_000
+
+
+FIELDS_DESCRIPTION = (
+    "Comma-separated sections to return, e.g. insight,meta.spend,meta.purchase_roas; "
+    "account_id and created_at are always included"
+)
+
+
+def _field_spec(fields: str | None) -> dict | None:
+    try:
+        return report_field_spec(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+def _check_account_ids(account_ids: list[str]) -> list[str]:
+    if not account_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="account_ids is required")
+    if len(account_ids) > MAX_BATCH_ACCOUNTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_ACCOUNTS} accounts per request",
+        )
+    return account_ids
+
+
+def _split_account_ids(account_ids: str) -> list[str]:
+    return _check_account_ids([account_id.strip() for account_id in account_ids.split(",") if account_id.strip()])
+
+
+def _batch_response(request: Request, db: Session, account_ids: list[str], fields: str | None) -> Response:
+    _check_account_ids(account_ids)
+    spec = _field_spec(fields)
+    reports = service.get_latest_summaries(db, account_ids)
+    missing = [account_id for account_id in dict.fromkeys(account_ids) if account_id not in reports]
+    response = BatchReportResponse.model_construct(reports=reports, missing=missing)
+    # Unrequested sections are skipped by the serializer, not dropped afterwards.
+    include: dict[str, Any] | None = {"reports": {"__all__": spec}, "missing": True} if spec else None
+    return json_response(request, response.model_dump(mode="json", include=include))
+
+
+@router.get("/", response_model=BatchReportResponse)
+async def get_reports(
+    request: Request,
+    db: DbSession,
+    account_ids: Annotated[str, Query(description="Comma-separated ad account IDs")],
+    fields: Annotated[str | None, Query(description=FIELDS_DESCRIPTION)] = None,
+) -> Response:
+    return _batch_response(request, db, _split_account_ids(account_ids), fields)
+
+
+@router.post("/batch", response_model=BatchReportResponse)
+async def get_reports_batch(
+    request: Request,
+    payload: BatchReportRequest,
+    db: DbSession,
+    fields: Annotated[str | None, Query(description=FIELDS_DESCRIPTION)] = None,
+) -> Response:
+    return _batch_response(request, db, payload.account_ids, fields)
+
+
+def _export_response(
+    fmt: str,
+    fields: str | None,
+    filename: str,
+    **filters: object,
+) -> StreamingResponse:
+    try:
+        columns = export_service.resolve_columns(fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+    rows = export_service.iter_rows(columns=columns, **filters)  # type: ignore[arg-type]
+    return StreamingResponse(
+        export_service.stream(rows, columns, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+@router.get("/export")
+async def export_reports(
+    account_ids: Annotated[str, Query(description="Comma-separated ad account IDs")],
+    fmt: Annotated[str, Query(alias="format", pattern="^(ndjson|csv)$")] = "ndjson",
+    fields: Annotated[str | None, Query(description="Comma-separated columns to include")] = None,
+    after_id: Annotated[
+        int | None, Query(description="Keyset cursor: id of the last row already received")
+    ] = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: Annotated[int, Query(ge=1, le=EXPORT_MAX_ROWS)] = EXPORT_MAX_ROWS,
+) -> StreamingResponse:
+    """Stream the given accounts' report runs oldest-first, at most ``limit`` rows per request.
+
+    Continue a longer (or interrupted) export with ``after_id`` set to the last ``id`` received.
+    """
+    return _export_response(
+        fmt,
+        fields,
+        "report-runs",
+        account_ids=_split_account_ids(account_ids),
+        after_id=after_id,
+        since=since,
+        until=until,
+        limit=limit,
+    )
+
+
+@router.get("/{account_id}/history")
+async def get_report_history(
+    account_id: str,
+    fmt: Annotated[str, Query(alias="format", pattern="^(ndjson|csv)$")] = "ndjson",
+    fields: Annotated[str | None, Query(description="Comma-separated columns to include")] = None,
+    before_id: Annotated[
+        int | None, Query(description="Keyset cursor: id of the last row of the previous page")
+    ] = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: Annotated[int, Query(ge=1, le=5000)] = 100,
+) -> StreamingResponse:
+    """Stream an account's report runs newest-first, one keyset page at a time."""
+    return _export_response(
+        fmt,
+        fields,
+        f"{account_id}-history",
+        account_ids=[account_id],
+        before_id=before_id,
+        since=since,
+        until=until,
+        descending=True,
+        limit=limit,
+    )
+
+
+@router.get("/{account_id}/artifact")
+async def download_artifact(
+    account_id: str,
+    db: DbSession,
+    fmt: Annotated[str, Query(alias="format", pattern="^(html|pdf)$")] = "html",
+    report_id: Annotated[int | None, Query(description="A specific run; the latest when omitted")] = None,
+) -> FileResponse:
+    """Rendered HTML/PDF report, produced on first download and served from cache afterwards."""
+    statement = select(ReportRun).where(ReportRun.account_id == account_id)
+    if report_id is not None:
+        statement = statement.where(ReportRun.id == report_id)
+    run = db.exec(statement.order_by(col(ReportRun.id).desc())).first()
+    if not run:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
+    try:
+        path = await renderer.get_or_render(run, fmt)
+    except ReportArchived as exc:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(exc)) from exc
+    except RenderUnavailable as exc:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    return FileResponse(path, media_type=RENDER_FORMATS[fmt], filename=f"{account_id}-{run.id}.{fmt}")
 
 
 @router.get("/{account_id}", response_model=ReportResponse)
-async def get_report(account_id: str, db: Session = Depends(get_db_session)) -> ReportResponse:
-    statement = select(ReportRun).where(ReportRun.account_id == account_id).order_by(ReportRun.id.desc())
+async def get_report(
+    request: Request,
+    account_id: str,
+    db: DbSession,
+    fields: Annotated[str | None, Query(description=FIELDS_DESCRIPTION)] = None,
+) -> Response:
+    spec = _field_spec(fields)
+    statement = select(ReportRun).where(ReportRun.account_id == account_id).order_by(col(ReportRun.id).desc())
     report = db.exec(statement).first()
     if not report:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
 
     summary = service.transform_run_to_summary(report)
-    return ReportResponse(report=summary)
+    response = ReportResponse.model_construct(report=summary)
+    return json_response(request, response.model_dump(mode="json", include={"report": spec} if spec else None))
 
 
-@router.post("/{account_id}/refresh", status_code=202)
+@router.post("/{account_id}/refresh", status_code=202, dependencies=[Depends(rate_limit("refresh"))])
 async def refresh_report(account_id: str, payload: RefreshRequest) -> dict[str, str]:
     enqueue_refresh(account_id=account_id, priority=payload.priority)
     return {"status": "scheduled"}
@@ -1,19 +1,28 @@
 """Traffic analysis router using RapidAPI."""
-from fastapi import APIRouter, HTTPException, status
+import asyncio
 from typing import Any
 
+import redis
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from app.dependencies import enforce_rate_limit, rate_limit
 from app.services.traffic_service import TrafficAnalysisService
+from app.services.traffic_snapshot import TrafficSnapshot
 
 router = APIRouter()
 traffic_service = TrafficAnalysisService()
 
 
-@router.get("/{domain}")
+def _present(snapshot: TrafficSnapshot) -> dict[str, Any]:
+    return {**snapshot.to_dict(), "display": snapshot.display()}
+
+
+@router.get("/{domain}", dependencies=[Depends(rate_limit("traffic"))])
 async def get_traffic(domain: str) -> dict[str, Any]:
     """Get traffic data for a domain using RapidAPI."""
     try:
-        data = await traffic_service.get_traffic_data(domain)
-        return data
+        snapshot = await traffic_service.get_snapshot(domain)
+        return _present(snapshot)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -21,15 +30,30 @@ async def get_traffic(domain: str) -> dict[str, Any]:
         )
 
 
+@router.get("/{domain}/raw/{fetched_at}")
+def get_traffic_raw(domain: str, fetched_at: int) -> dict[str, Any]:
+    """Get the raw upstream payload behind a snapshot, while it is retained."""
+    try:
+        payload = traffic_service.get_raw_payload(domain, fetched_at)
+    except redis.RedisError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Raw traffic store unavailable"
+        ) from exc
+    if payload is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Raw traffic payload not found")
+    return payload
+
+
 @router.post("/batch")
-async def get_traffic_batch(domains: list[str]) -> dict[str, dict[str, Any]]:
+async def get_traffic_batch(request: Request, domains: list[str]) -> dict[str, dict[str, Any]]:
     """Get traffic data for multiple domains."""
+    # The limiter makes blocking Redis calls; keep them off the event loop.
+    await asyncio.to_thread(enforce_rate_limit, request, "traffic", cost=len(set(domains)))
     try:
-        data = await traffic_service.get_multiple_domains(domains)
-        return data
+        snapshots = await traffic_service.get_snapshots(domains)
+        return {domain: _present(snapshot) for domain, snapshot in snapshots.items()}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch traffic data: {str(e)}"
         )
-
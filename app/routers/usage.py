@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.dependencies import DbSession
+from app.schemas.usage import UsageResponse, UsageRow
+from app.services.usage_service import UsageService
+
+router = APIRouter()
+service = UsageService()
+
+
+@router.get("/", response_model=UsageResponse)
+def get_usage(
+    db: DbSession,
+    group_by: Annotated[
+        str, Query(description="Comma-separated: hour, account_id, task, provider, model")
+    ] = "account_id,task",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    account_id: str | None = None,
+    task: str | None = None,
+) -> UsageResponse:
+    """LLM calls, tokens and latency aggregated from the hourly usage table."""
+    dimensions = [dimension.strip() for dimension in group_by.split(",") if dimension.strip()]
+    try:
+        rows = service.query(db, group_by=dimensions, since=since, until=until, account_id=account_id, task=task)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return UsageResponse(group_by=dimensions, rows=[UsageRow(**row) for row in rows])
@@ -1,18 +1,39 @@
 """Workflow router for AI-powered market research workflows."""
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+from functools import partial
+from typing import Annotated
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+
+from app.config import get_settings
+from app.dependencies import DbSession, rate_limit, request_timeout
+from app.models.workflow import WorkflowJob
 from app.schemas.workflow import (
+    RoutePreviewRequest,
     TaskExecutionRequest,
     TaskExecutionResponse,
     WorkflowConfigRequest,
     WorkflowExecutionRequest,
+    WorkflowJobResponse,
     WorkflowResponse,
 )
+from app.services.admission import AdmissionController, Overloaded
 from app.services.ai_providers import AIProviderFactory
-from app.services.workflow_service import WorkflowService, WorkflowTask
+from app.services.model_router import ModelRouter, RoutingDecision
+from app.services.workflow_job_service import WorkflowJobService
+from app.services.workflow_service import (
+    WorkflowConfig,
+    WorkflowService,
+    WorkflowTask,
+    extract_competitor_domains,
+)
+from app.tasks.workflow import enqueue_workflow_job
 
+settings = get_settings()
 router = APIRouter()
 workflow_service = WorkflowService()
+job_service = WorkflowJobService(workflow_service=workflow_service)
+admission = AdmissionController()
 
 
 @router.get("/providers")
@@ -41,8 +62,6 @@ async def list_tasks() -> dict[str, list[str]]:
 @router.post("/config", status_code=200)
 async def configure_workflow(config: WorkflowConfigRequest) -> dict[str, str]:
     """Configure which AI provider to use for each workflow task."""
-    from app.services.workflow_service import WorkflowConfig
-    
     # Validate task names
     valid_tasks = {task.value for task in WorkflowTask}
     for task_name in config.config.keys():
@@ -68,29 +87,26 @@ async def configure_workflow(config: WorkflowConfigRequest) -> dict[str, str]:
     return {"status": "configured", "config": config.config}
 
 
-@router.post("/execute", response_model=WorkflowResponse)
-async def execute_workflow(request: WorkflowExecutionRequest) -> WorkflowResponse:
+@router.post("/execute", response_model=WorkflowResponse, dependencies=[Depends(rate_limit("workflow"))])
+async def execute_workflow(request: WorkflowExecutionRequest, http_request: Request) -> WorkflowResponse:
     """Execute a complete market research workflow."""
     try:
-        # Extract competitor domains from competitor_data if available
-        competitor_domains = []
-        if request.competitor_data:
-            # Try to extract domains from competitor data
-            if isinstance(request.competitor_data, dict):
-                for key, value in request.competitor_data.items():
-                    if isinstance(value, dict) and "url" in value:
-                        competitor_domains.append(value["url"])
-                    elif isinstance(value, str) and ("http" in value or "." in value):
-                        competitor_domains.append(value)
-        
+        competitor_domains = extract_competitor_domains(request.competitor_data)
+
+        # Admission happens once the steps are routed, on the providers they will actually call.
         result = await workflow_service.generate_market_research_report(
             domain=request.domain,
             meta_data=request.meta_data,
             competitor_data=request.competitor_data,
             custom_config=request.custom_config,
-            competitor_domains=competitor_domains if competitor_domains else None
+            competitor_domains=competitor_domains if competitor_domains else None,
+            reuse=not request.force_refresh,
+            account_id=request.account_id,
+            admit=partial(admission.admit, timeout=request_timeout(http_request)),
         )
         return WorkflowResponse(**result)
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -98,41 +114,126 @@ async def execute_workflow(request: WorkflowExecutionRequest) -> WorkflowRespons
         )
 
 
-@router.post("/task", response_model=TaskExecutionResponse)
-async def execute_task(request: TaskExecutionRequest) -> TaskExecutionResponse:
+def _job_response(job: WorkflowJob) -> WorkflowJobResponse:
+    return WorkflowJobResponse(
+        job_id=job.id,
+        domain=job.domain,
+        status=job.status,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result_url=f"/workflow/jobs/{job.id}/result",
+    )
+
+
+@router.post("/route", response_model=RoutingDecision)
+async def preview_route(request: RoutePreviewRequest) -> RoutingDecision:
+    """Report which provider and model the routing rules would pick, without calling them."""
+    model_router = workflow_service.router or ModelRouter(usage_service=workflow_service.usage_service)
+    default_provider = (
+        settings.llm_provider.lower()
+        if request.task == "insight"
+        else workflow_service.config.get_provider_for_task(request.task)
+    )
+    return model_router.route(
+        request.task,
+        request.prompt,
+        default_provider=default_provider,
+        account_id=request.account_id,
+        prompt_tokens=request.prompt_tokens,
+        preview=True,
+    )
+
+
+@router.post(
+    "/jobs",
+    response_model=WorkflowJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(rate_limit("workflow"))],
+)
+def submit_workflow_job(request: WorkflowExecutionRequest, db: DbSession) -> WorkflowJobResponse:
+    """Queue a market research workflow on the worker pool and return its job ID."""
+    job = job_service.create(db, request, workflow_service.config)
+    try:
+        enqueue_workflow_job(job.id)
+    except Exception as e:
+        job_service.mark_failed(job.id, f"enqueue failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Workflow queue unavailable"
+        ) from e
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=WorkflowJobResponse)
+async def get_workflow_job(
+    job_id: str,
+    wait: Annotated[
+        float,
+        Query(ge=0, le=settings.workflow_job_max_wait_seconds, description="Long-poll for up to this many seconds"),
+    ] = 0,
+) -> WorkflowJobResponse:
+    """Job status; with ``wait`` the request is held until the job finishes or the wait elapses."""
+    job = await job_service.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}/result", response_model=WorkflowResponse)
+def get_workflow_job_result(job_id: str) -> WorkflowResponse:
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job.status != "succeeded" or job.result is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"status": job.status, "error": job.error},
+        )
+    return WorkflowResponse(**job.result)
+
+
+@router.post("/task", response_model=TaskExecutionResponse, dependencies=[Depends(rate_limit("workflow"))])
+async def execute_task(request: TaskExecutionRequest, http_request: Request) -> TaskExecutionResponse:
     """Execute a single workflow task with a specific AI provider."""
+    # Validate task
     try:
-        # Validate task
+        task = WorkflowTask(request.task)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid task: {request.task}"
+        )
+
+    provider = request.provider or workflow_service.config.get_provider_for_task(task)
+    async with admission.admit([provider], timeout=request_timeout(http_request)):
         try:
-            task = WorkflowTask(request.task)
-        except ValueError:
+            # Provider SDKs block; keep the event loop free for queued and shed requests.
+            response = await asyncio.to_thread(
+                workflow_service.execute_task,
+                task=task,
+                prompt=request.prompt,
+                provider=provider,
+                model=request.model,
+            )
+        except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid task: {request.task}"
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Task execution failed: {str(e)}"
             )
-        
-        # Execute task
-        response = workflow_service.execute_task(
-            task=task,
-            prompt=request.prompt,
-            provider=request.provider,
-            model=request.model
-        )
-        
-        return TaskExecutionResponse(
-            content=response.content,
-            provider=response.provider,
-            model=response.model,
-            metadata=response.metadata
-        )
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Task execution failed: {str(e)}"
-        )
 
+    return TaskExecutionResponse(
+        content=response.content,
+        provider=response.provider,
+        model=response.model,
+        metadata=response.metadata,
+        input_tokens=response.input_tokens,
+        output_tokens=response.output_tokens,
+        latency_ms=response.latency_ms,
+    )
@@ -1,4 +1,6 @@
 from app.schemas.reports import (
+    BatchReportRequest,
+    BatchReportResponse,
     InsightPayload,
     ReportResponse,
     ReportSummary,
@@ -8,6 +10,8 @@ from app.schemas.alerts import AlertResponse
 from app.schemas.auth import LoginRequest, LoginResponse
 
 __all__ = [
+    "BatchReportRequest",
+    "BatchReportResponse",
     "InsightPayload",
     "ReportResponse",
     "ReportSummary",
@@ -7,6 +7,7 @@ from pydantic import BaseModel, Field
 class InsightPayload(BaseModel):
     summary: str
     recommendations: list[str] = Field(default_factory=list)
+    defensive_moves: list[str] = Field(default_factory=list)
     anomalies: list[dict[str, Any]] = Field(default_factory=list)
     llm_provider: str
 
@@ -28,3 +29,12 @@ class ReportResponse(BaseModel):
 class RefreshRequest(BaseModel):
     priority: bool = False
 
+
+
+class BatchReportRequest(BaseModel):
+    account_ids: list[str] = Field(min_length=1, max_length=100)
+
+
+class BatchReportResponse(BaseModel):
+    reports: dict[str, ReportSummary]
+    missing: list[str] = Field(default_factory=list)
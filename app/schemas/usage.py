@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class UsageRow(BaseModel):
+    hour: datetime | None = None
+    account_id: str | None = None
+    task: str | None = None
+    provider: str | None = None
+    model: str | None = None
+    calls: int
+    errors: int
+    input_tokens: int
+    output_tokens: int
+    avg_latency_ms: float
+    max_latency_ms: float
+
+
+class UsageResponse(BaseModel):
+    group_by: list[str]
+    rows: list[UsageRow] = Field(default_factory=list)
@@ -1,4 +1,5 @@
 """Schemas for workflow configuration."""
+from datetime import datetime
 from typing import Any
 
 from pydantic import BaseModel, Field
@@ -17,12 +18,17 @@ class WorkflowConfigRequest(BaseModel):
 class WorkflowExecutionRequest(BaseModel):
     """Request to execute a workflow."""
     domain: str
+    account_id: str | None = Field(None, description="Ad account LLM usage is attributed to; defaults to domain")
     meta_data: dict[str, Any] = Field(default_factory=dict)
     competitor_data: dict[str, Any] = Field(default_factory=dict)
     custom_config: dict[str, str] | None = Field(
         None,
         description="Optional custom AI provider configuration for this execution"
     )
+    force_refresh: bool = Field(
+        False,
+        description="Recompute every step instead of reusing results whose inputs are unchanged"
+    )
 
 
 class WorkflowResponse(BaseModel):
@@ -30,13 +36,34 @@ class WorkflowResponse(BaseModel):
     domain: str
     executive_summary: str
     competitors: str
+    competitor_list: list[dict[str, Any]] = Field(default_factory=list, description="competitors parsed into name/url/key_strength")
     traffic_analysis: str = ""
     market_gap: str
     growth_opportunities: str
     meta_diagnostic: str
     recommendations: str
     traffic_data: dict[str, Any] = Field(default_factory=dict)
-    workflow_metadata: dict[str, dict[str, str]]
+    workflow_metadata: dict[str, dict[str, Any]]
+
+
+class WorkflowJobResponse(BaseModel):
+    """Status of a queued workflow job."""
+    job_id: str
+    domain: str
+    status: str = Field(description="queued, running, succeeded or failed")
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    result_url: str
+
+
+class RoutePreviewRequest(BaseModel):
+    """Ask the model router what it would pick for a call."""
+    task: str
+    prompt: str = ""
+    prompt_tokens: int | None = Field(None, description="Overrides the estimate from prompt length")
+    account_id: str | None = None
 
 
 class TaskExecutionRequest(BaseModel):
@@ -53,4 +80,7 @@ class TaskExecutionResponse(BaseModel):
     provider: str
     model: str
     metadata: dict[str, Any] = Field(default_factory=dict)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms: float = 0.0
 
@@ -0,0 +1,134 @@
+"""Admission control for LLM-backed requests: per-provider concurrency with a bounded queue.
+
+Each provider gets a gate of N concurrent slots and a short wait queue. A request is
+shed immediately (``Overloaded``) when the queue is full, or when the expected queue
+wait plus the provider's typical call time already exceeds the request's deadline,
+rather than queueing work whose caller will have given up by the time it runs.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import AsyncIterator, Iterable
+from contextlib import AsyncExitStack, asynccontextmanager
+
+import structlog
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed; ``retry_after`` is a hint in seconds."""
+
+    def __init__(self, provider: str, reason: str, retry_after: float) -> None:
+        super().__init__(f"{provider} is overloaded ({reason})")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ProviderGate:
+    # Weight of the newest sample in the moving average of slot hold times.
+    SMOOTHING = 0.2
+
+    def __init__(self, provider: str, concurrency: int, max_queue: int) -> None:
+        self.provider = provider
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.service_seconds = 0.0  # unknown until the first call completes
+        self._slots = asyncio.Semaphore(concurrency)
+
+    def estimated_wait(self) -> float:
+        if not self._slots.locked():
+            return 0.0
+        # Slots free up at roughly concurrency / service_seconds per second.
+        return (self.waiting + 1) / self.concurrency * self.service_seconds
+
+    def _shed(self, reason: str) -> Overloaded:
+        retry_after = max(1.0, self.estimated_wait())
+        logger.warning(
+            "admission.shed",
+            provider=self.provider,
+            reason=reason,
+            active=self.active,
+            waiting=self.waiting,
+            retry_after=retry_after,
+        )
+        return Overloaded(self.provider, reason, retry_after)
+
+    @asynccontextmanager
+    async def slot(self, deadline: float) -> AsyncIterator[None]:
+        """Hold one slot; ``deadline`` is a ``time.monotonic()`` timestamp."""
+        if not self._slots.locked():
+            await self._slots.acquire()  # a free slot: returns without suspending
+        else:
+            if self.waiting >= self.max_queue:
+                raise self._shed("queue_full")
+            queue_budget = deadline - time.monotonic() - self.service_seconds
+            if self.estimated_wait() > queue_budget:
+                raise self._shed("deadline")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=max(queue_budget, 0.0))
+            except TimeoutError:
+                raise self._shed("queue_timeout") from None
+            finally:
+                self.waiting -= 1
+
+        self.active += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            self.service_seconds = (
+                elapsed
+                if not self.service_seconds
+                else self.SMOOTHING * elapsed + (1 - self.SMOOTHING) * self.service_seconds
+            )
+            self.active -= 1
+            self._slots.release()
+
+
+class AdmissionController:
+    """Per-process gates, one per provider, created on first use."""
+
+    def __init__(
+        self,
+        concurrency: dict[str, int] | None = None,
+        default_concurrency: int | None = None,
+        max_queue: int | None = None,
+    ) -> None:
+        self.concurrency = concurrency if concurrency is not None else settings.admission_provider_concurrency
+        self.default_concurrency = default_concurrency or settings.admission_default_concurrency
+        self.max_queue = max_queue if max_queue is not None else settings.admission_max_queue
+        self._gates: dict[str, ProviderGate] = {}
+
+    def gate(self, provider: str) -> ProviderGate:
+        if provider not in self._gates:
+            limit = self.concurrency.get(provider, self.default_concurrency)
+            self._gates[provider] = ProviderGate(provider, limit, self.max_queue)
+        return self._gates[provider]
+
+    @asynccontextmanager
+    async def admit(self, providers: Iterable[str], timeout: float | None = None) -> AsyncIterator[None]:
+        """Hold a slot on every provider the request will call, all under one deadline.
+
+        Gates are entered in sorted order so two multi-provider requests can never
+        each hold a slot the other is waiting for.
+        """
+        deadline = time.monotonic() + (timeout if timeout is not None else settings.admission_deadline_seconds)
+        async with AsyncExitStack() as stack:
+            for provider in sorted(set(providers)):
+                await stack.enter_async_context(self.gate(provider).slot(deadline))
+            yield
+
+
+def retry_after_header(exc: Overloaded) -> dict[str, str]:
+    return {"Retry-After": str(math.ceil(exc.retry_after))}
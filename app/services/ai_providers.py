@@ -1,16 +1,19 @@
 """AI Provider abstraction layer supporting multiple LLM providers."""
 from __future__ import annotations
 
+import time
 from abc import ABC, abstractmethod
 from typing import Any
 
 import anthropic
 import google.generativeai as genai
+import structlog
 from pydantic import BaseModel
 
 from app.config import get_settings
 
 settings = get_settings()
+logger = structlog.get_logger()
 
 
 class AIResponse(BaseModel):
@@ -19,6 +22,9 @@ class AIResponse(BaseModel):
     provider: str
     model: str
     metadata: dict[str, Any] = {}
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms: float = 0.0
 
 
 class AIProvider(ABC):
@@ -42,7 +48,7 @@ class ClaudeProvider(AIProvider):
         self.client = None
         if settings.anthropic_api_key:
             self.client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
-        self.model = "claude-3-5-sonnet-20240620"
+        self.model = settings.claude_model
     
     def is_available(self) -> bool:
         return self.client is not None
@@ -52,19 +58,24 @@ class ClaudeProvider(AIProvider):
             raise ValueError("Claude API key not configured")
         
         model_name = model or self.model
+        started = time.perf_counter()
         message = self.client.messages.create(
             model=model_name,
             max_tokens=max_tokens,
             messages=[{"role": "user", "content": prompt}],
             **kwargs
         )
+        latency_ms = (time.perf_counter() - started) * 1000
         
         text = message.content[0].text if message.content else ""
+        usage = getattr(message, "usage", None)
         return AIResponse(
             content=text,
             provider="claude",
             model=model_name,
-            metadata={"usage": getattr(message, "usage", {})}
+            input_tokens=getattr(usage, "input_tokens", 0) or 0,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+            latency_ms=latency_ms,
         )
 
 
@@ -76,7 +87,7 @@ class GeminiProvider(AIProvider):
         if settings.google_api_key:
             genai.configure(api_key=settings.google_api_key)
             self.client = genai
-        self.default_model = "gemini-1.5-pro"
+        self.default_model = settings.gemini_model
     
     def is_available(self) -> bool:
         return self.client is not None
@@ -90,21 +101,29 @@ class GeminiProvider(AIProvider):
         # Try gemini-3-pro-preview first, fallback to gemini-1.5-pro
         try:
             genai_model = self.client.GenerativeModel(model_name)
-        except Exception:
-            # Fallback to default if model not available
-            genai_model = self.client.GenerativeModel(self.default_model)
+        except Exception as exc:
+            # Fallback to default if model not available; report the model actually used
+            logger.warning("gemini.model_fallback", requested=model_name, used=self.default_model, error=str(exc))
+            model_name = self.default_model
+            genai_model = self.client.GenerativeModel(model_name)
         
+        started = time.perf_counter()
         response = genai_model.generate_content(
             prompt,
             generation_config=kwargs.get("generation_config"),
         )
+        latency_ms = (time.perf_counter() - started) * 1000
         
         text = response.text or ""
+        usage = getattr(response, "usage_metadata", None)
         return AIResponse(
             content=text,
             provider="gemini",
             model=model_name,
-            metadata={"candidates": len(response.candidates) if hasattr(response, "candidates") else 0}
+            metadata={"candidates": len(response.candidates) if hasattr(response, "candidates") else 0},
+            input_tokens=getattr(usage, "prompt_token_count", 0) or 0,
+            output_tokens=getattr(usage, "candidates_token_count", 0) or 0,
+            latency_ms=latency_ms,
         )
 
 
@@ -0,0 +1,94 @@
+"""Filtered, keyset-paginated reads of alert_events."""
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Any
+
+import orjson
+from sqlalchemy import func, text, tuple_
+from sqlmodel import Session, col, select
+
+from app.models.report import AlertEvent
+from app.schemas.alerts import AlertResponse
+
+# Only what AlertResponse needs; the model is never materialized.
+ALERT_COLUMNS = ("id", "account_id", "alert_type", "severity", "message", "alert_metadata", "created_at")
+
+
+def encode_cursor(created_at: datetime, alert_id: int) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps([created_at.isoformat(), alert_id])).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, alert_id = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(alert_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+class AlertQueryService:
+    """Newest-first pages ordered by ``(created_at, id)``, served by the composite indexes on AlertEvent."""
+
+    def __init__(self, count_cap: int = 10_000) -> None:
+        self.count_cap = count_cap
+
+    @staticmethod
+    def _filtered(
+        statement: Any,
+        account_ids: list[str] | None = None,
+        severities: list[str] | None = None,
+        alert_types: list[str] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Any:
+        if account_ids:
+            statement = statement.where(col(AlertEvent.account_id).in_(account_ids))
+        if severities:
+            statement = statement.where(col(AlertEvent.severity).in_(severities))
+        if alert_types:
+            statement = statement.where(col(AlertEvent.alert_type).in_(alert_types))
+        if since is not None:
+            statement = statement.where(AlertEvent.created_at >= since)
+        if until is not None:
+            statement = statement.where(AlertEvent.created_at < until)
+        return statement
+
+    def list_alerts(
+        self,
+        db: Session,
+        *,
+        limit: int = 50,
+        cursor: str | None = None,
+        **filters: Any,
+    ) -> tuple[list[AlertResponse], str | None]:
+        """Return one page and the cursor for the next one (None on the last page)."""
+        statement = self._filtered(select(*[getattr(AlertEvent, column) for column in ALERT_COLUMNS]), **filters)
+        if cursor:
+            created_at, alert_id = decode_cursor(cursor)
+            statement = statement.where(tuple_(AlertEvent.created_at, AlertEvent.id) < (created_at, alert_id))
+        statement = statement.order_by(col(AlertEvent.created_at).desc(), col(AlertEvent.id).desc()).limit(limit + 1)
+
+        rows = db.execute(statement).all()
+        items = []
+        for row in rows[:limit]:
+            values = dict(zip(ALERT_COLUMNS, row))
+            values["metadata"] = values.pop("alert_metadata") or {}
+            items.append(AlertResponse.model_construct(**values))
+        next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+        return items, next_cursor
+
+    def estimate_total(self, db: Session, **filters: Any) -> tuple[int, bool]:
+        """Approximate number of matching alerts, and whether it is exact.
+
+        On Postgres this is the planner's row estimate (no scan at all). Elsewhere the
+        count stops at ``count_cap`` rows, so it is exact only below the cap.
+        """
+        statement = self._filtered(select(AlertEvent.id), **filters)
+        if db.get_bind().dialect.name == "postgresql":
+            compiled = statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True})
+            plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar_one()
+            return int(plan[0]["Plan"]["Plan Rows"]), False
+        count = db.execute(select(func.count()).select_from(statement.limit(self.count_cap).subquery())).scalar_one()
+        return count, count < self.count_cap
@@ -1,39 +1,238 @@
 from __future__ import annotations
 
 import json
+from collections import Counter
+from collections.abc import Callable
 from typing import Any
 
-import httpx
+import orjson
+import redis
+import structlog
 from sqlmodel import Session
 
 from app.config import get_settings
 from app.models.report import AlertEvent
+from app.services.email_service import EmailService
+from app.services.event_bus import EventPublisher
+from app.services.http_clients import http_clients, run_sync
 
 settings = get_settings()
+logger = structlog.get_logger()
+
+# Severities that differ only in wording share a bucket, so "warning" then "medium"
+# is one ongoing problem; moving to a higher bucket is a new alert.
+SEVERITY_BUCKETS = {
+    "info": "low",
+    "low": "low",
+    "warning": "medium",
+    "medium": "medium",
+    "high": "high",
+    "critical": "high",
+}
+
+
+def alert_fingerprint(account_id: str, alert_type: str, severity: str) -> str:
+    bucket = SEVERITY_BUCKETS.get(severity.lower(), severity.lower())
+    return f"{account_id}:{alert_type}:{bucket}"
+
+
+def _enqueue_email(subject: str, body: str, recipients: list[str]) -> None:
+    from app.tasks.alerts import enqueue_alert_email
+
+    enqueue_alert_email(subject, body, recipients)
+
+
+def digest_text(digest: dict[str, Any]) -> str:
+    lines = [digest["text"], ""]
+    lines += [
+        f"[{alert['severity']}] {alert['alert_type']} for {alert['account_id']}: {alert['message']}"
+        for alert in digest["alerts"]
+    ]
+    if digest["suppressed"]:
+        lines += ["", "Suppressed repeats:"]
+        lines += [f"{fingerprint}: {count}" for fingerprint, count in sorted(digest["suppressed"].items())]
+    return "\n".join(lines)
 
 
 class AlertService:
-    def __init__(self) -> None:
+    SUPPRESS_PREFIX = "alert:suppress"
+    SUPPRESSED_KEY = "alert:suppressed"
+    DIGEST_KEY = "alert:digest"
+
+    def __init__(
+        self,
+        client: redis.Redis | None = None,
+        email_dispatcher: Callable[[str, str, list[str]], None] | None = None,
+        publisher: EventPublisher | None = None,
+    ) -> None:
         self.webhook_url = settings.alert_webhook_url
+        self._client = client
+        # Emails are handed to a Celery task so SMTP never runs on the refresh path.
+        self.email_dispatcher = email_dispatcher or _enqueue_email
+        self.publisher = publisher or EventPublisher()
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        return self._client
+
+    def raise_alert(self, db: Session, payload: dict[str, Any]) -> AlertEvent | None:
+        """Persist and deliver an alert unless the same one fired within the suppression window.
+
+        Repeats are only counted (reported in the next digest), so a persistent anomaly costs
+        one row and one notification per window rather than one per refresh. Delivered alerts
+        are queued for the digest when digests are enabled, otherwise sent straight away.
+        """
+        fingerprint = alert_fingerprint(payload["account_id"], payload["alert_type"], payload["severity"])
+        if self._suppressed(fingerprint):
+            return None
+
+        payload = dict(payload)
+        payload["metadata"] = {**payload.get("metadata", {}), "fingerprint": fingerprint}
+        try:
+            alert = self.persist_alert(db, payload)
+            self.publisher.publish(
+                "alert.created", alert.account_id, alert_id=alert.id, alert_type=alert.alert_type, severity=alert.severity
+            )
+        except Exception:
+            # The alert was never stored; a retry must not be suppressed as its repeat.
+            self._release(fingerprint)
+            raise
+        if not (settings.alert_digest_enabled and self._queue_for_digest(alert)):
+            self.send_webhook(alert)
+            self.send_email(
+                f"[{alert.severity}] {alert.alert_type} for {alert.account_id}", alert.message or alert.alert_type
+            )
+        return alert
+
+    def _suppressed(self, fingerprint: str) -> bool:
+        try:
+            first = self.client.set(
+                f"{self.SUPPRESS_PREFIX}:{fingerprint}", 1, nx=True, ex=settings.alert_suppression_seconds
+            )
+            if first:
+                return False
+            self.client.hincrby(self.SUPPRESSED_KEY, fingerprint, 1)
+            return True
+        except redis.RedisError as exc:
+            # Fail open: a duplicate alert is better than a lost one.
+            logger.warning("alerts.dedupe_unavailable", fingerprint=fingerprint, error=str(exc))
+            return False
+
+    def _release(self, fingerprint: str) -> None:
+        try:
+            self.client.delete(f"{self.SUPPRESS_PREFIX}:{fingerprint}")
+        except redis.RedisError as exc:
+            logger.warning("alerts.dedupe_unavailable", fingerprint=fingerprint, error=str(exc))
+
+    def _queue_for_digest(self, alert: AlertEvent) -> bool:
+        entry = {
+            "id": alert.id,
+            "account_id": alert.account_id,
+            "alert_type": alert.alert_type,
+            "severity": alert.severity,
+            "message": alert.message,
+            "created_at": alert.created_at.isoformat(),
+        }
+        try:
+            self.client.rpush(self.DIGEST_KEY, orjson.dumps(entry))
+            return True
+        except redis.RedisError as exc:
+            logger.warning("alerts.digest_unavailable", alert_id=alert.id, error=str(exc))
+            return False
 
     def persist_alert(self, db: Session, payload: dict[str, Any]) -> AlertEvent:
+        payload = dict(payload)
+        if "metadata" in payload:
+            payload["alert_metadata"] = payload.pop("metadata")
         alert = AlertEvent(**payload)
         db.add(alert)
         db.commit()
         db.refresh(alert)
         return alert
 
+    def build_digest(self, max_items: int | None = None) -> dict[str, Any] | None:
+        """Drain queued alerts and suppression counts into one digest body, or None if empty."""
+        max_items = max_items or settings.alert_digest_max_items
+        # One transaction so alerts queued meanwhile are kept for the next digest, not lost.
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(self.DIGEST_KEY, 0, max_items - 1)
+        pipe.ltrim(self.DIGEST_KEY, max_items, -1)
+        pipe.hgetall(self.SUPPRESSED_KEY)
+        pipe.delete(self.SUPPRESSED_KEY)
+        raw_items, _, suppressed, _ = pipe.execute()
+
+        alerts = [orjson.loads(item) for item in raw_items]
+        suppressed = {fingerprint: int(count) for fingerprint, count in suppressed.items()}
+        if not alerts and not suppressed:
+            return None
+
+        severities = Counter(SEVERITY_BUCKETS.get(alert["severity"].lower(), alert["severity"]) for alert in alerts)
+        accounts = {alert["account_id"] for alert in alerts}
+        return {
+            "text": (
+                f"{len(alerts)} new alerts across {len(accounts)} accounts"
+                f" ({sum(suppressed.values())} repeats suppressed)"
+            ),
+            "severity_counts": dict(severities),
+            "alerts": alerts,
+            "suppressed": suppressed,
+        }
+
+    def requeue_digest(self, digest: dict[str, Any]) -> None:
+        """Put a drained digest back at the head of the queue for the next attempt."""
+        pipe = self.client.pipeline(transaction=True)
+        if digest["alerts"]:
+            pipe.lpush(self.DIGEST_KEY, *[orjson.dumps(alert) for alert in reversed(digest["alerts"])])
+        for fingerprint, count in digest["suppressed"].items():
+            pipe.hincrby(self.SUPPRESSED_KEY, fingerprint, count)
+        pipe.execute()
+
+    def send_digest(self) -> int:
+        """Send one notification covering every alert since the last digest. Returns the alert count.
+
+        If the webhook fails the digest is requeued and the error re-raised, so the task retries.
+        """
+        digest = self.build_digest()
+        if digest is None:
+            return 0
+        if self.webhook_url:
+            try:
+                run_sync(self._post_webhook(digest))
+            except Exception as exc:
+                logger.warning("alerts.digest_failed", alerts=len(digest["alerts"]), error=str(exc))
+                self.requeue_digest(digest)
+                raise
+        self.send_email(f"Alert digest: {digest['text']}", digest_text(digest))
+        logger.info("alerts.digest_sent", alerts=len(digest["alerts"]), suppressed=sum(digest["suppressed"].values()))
+        return len(digest["alerts"])
+
+    def send_email(self, subject: str, body: str) -> None:
+        recipients = EmailService.recipients()
+        if not (settings.smtp_host and recipients):
+            return
+        try:
+            self.email_dispatcher(subject, body, recipients)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("alerts.email_enqueue_failed", error=str(exc))
+
     def send_webhook(self, alert: AlertEvent) -> None:
         if not self.webhook_url:
             return
         body = {
             "text": f"[{alert.severity}] {alert.alert_type} for {alert.account_id}",
             "details": alert.message,
-            "metadata": alert.metadata,
+            "metadata": alert.alert_metadata,
         }
         try:
-            httpx.post(self.webhook_url, data=json.dumps(body), headers={"Content-Type": "application/json"})
-        except Exception:
+            run_sync(self._post_webhook(body))
+        except Exception as exc:  # noqa: BLE001
             # Avoid crashing worker if Slack/webhook is down.
-            pass
+            logger.warning("alerts.webhook_failed", alert_type=alert.alert_type, error=str(exc))
 
+    async def _post_webhook(self, body: dict[str, Any]) -> None:
+        resp = await http_clients.get("webhook").post(
+            self.webhook_url, content=json.dumps(body), headers={"Content-Type": "application/json"}
+        )
+        resp.raise_for_status()
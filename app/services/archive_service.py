@@ -0,0 +1,202 @@
+"""Columnar archive for aged report runs.
+
+Runs older than the retention window are written to Parquet files partitioned by
+``date`` and ``account_id`` (hive layout). The database row is kept as a pointer:
+payload columns are emptied and ``archive_path`` records where the data went.
+"""
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import orjson
+import structlog
+from sqlmodel import Session, col, select
+
+from app.config import get_settings
+from app.models.report import ReportRun
+
+try:
+    import pyarrow as pa  # type: ignore[import-untyped]
+    import pyarrow.dataset as ds  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    ds = None
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+PARTITION_COLUMNS = ["date", "account_id"]
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow is required for report archiving; install the 'archive' extra")
+
+
+def _metric(payload: dict[str, Any], key: str) -> float | None:
+    value = payload.get(key)
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ReportArchiveService:
+    def __init__(self, base_path: str | None = None, batch_size: int = 1000) -> None:
+        self.base_path = Path(base_path or settings.archive_path)
+        self.batch_size = batch_size
+
+    @staticmethod
+    def schema() -> pa.Schema:
+        _require_pyarrow()
+        return pa.schema(
+            [
+                ("id", pa.int64()),
+                ("account_id", pa.string()),
+                ("date", pa.string()),
+                ("timeframe", pa.string()),
+                ("created_at", pa.timestamp("us", tz="UTC")),
+                ("spend", pa.float64()),
+                ("purchase_roas", pa.float64()),
+                ("meta_payload", pa.string()),
+                ("competitor_payload", pa.string()),
+                ("insight_text", pa.string()),
+                ("insight_metadata", pa.string()),
+                ("insight_structured", pa.string()),
+            ]
+        )
+
+    def _to_table(self, runs: list[ReportRun]) -> pa.Table:
+        rows = []
+        for run in runs:
+            created_at = run.created_at if run.created_at.tzinfo else run.created_at.replace(tzinfo=UTC)
+            rows.append(
+                {
+                    "id": run.id,
+                    "account_id": run.account_id,
+                    "date": created_at.strftime("%Y-%m-%d"),
+                    "timeframe": run.timeframe,
+                    "created_at": created_at,
+                    "spend": _metric(run.meta_payload, "spend"),
+                    "purchase_roas": _metric(run.meta_payload, "purchase_roas"),
+                    "meta_payload": orjson.dumps(run.meta_payload).decode(),
+                    "competitor_payload": orjson.dumps(run.competitor_payload).decode(),
+                    "insight_text": run.insight_text,
+                    "insight_metadata": orjson.dumps(run.insight_metadata).decode(),
+                    "insight_structured": orjson.dumps(run.insight_structured).decode(),
+                }
+            )
+        return pa.Table.from_pylist(rows, schema=self.schema())
+
+    def _partition_path(self, run: ReportRun) -> str:
+        created_at = run.created_at if run.created_at.tzinfo else run.created_at.replace(tzinfo=UTC)
+        return str(self.base_path / f"date={created_at:%Y-%m-%d}" / f"account_id={run.account_id}")
+
+    def _claim(self, db: Session, runs: list[ReportRun]) -> list[ReportRun]:
+        """Give unkeyed runs a batch key and return every unarchived run of the batches involved.
+
+        The key is committed before any file is written, so a rerun after a failed pointer
+        commit rewrites the same files even if some of the batch's rows were deleted since.
+        A batch is always written whole, so a rerun never overwrites its file with part of it.
+        """
+        batch = uuid4().hex
+        for run in runs:
+            if run.archive_batch is None:
+                run.archive_batch = batch
+                db.add(run)
+        db.commit()
+        keys = {run.archive_batch for run in runs}
+        statement = (
+            select(ReportRun)
+            .where(col(ReportRun.archive_batch).in_(keys))
+            .where(col(ReportRun.archive_path).is_(None))
+            .order_by(col(ReportRun.id))
+        )
+        return list(db.exec(statement))
+
+    def archive_older_than(self, db: Session, days: int | None = None) -> int:
+        """Move runs older than ``days`` into the archive, one bounded batch at a time."""
+        _require_pyarrow()
+        days = days if days is not None else settings.archive_after_days
+        cutoff = datetime.now(UTC) - timedelta(days=days)
+        archived = 0
+        last_id = 0
+        run_id = col(ReportRun.id)
+
+        while True:
+            statement = (
+                select(ReportRun)
+                .where(col(ReportRun.created_at) < cutoff)
+                .where(col(ReportRun.archive_path).is_(None))
+                .where(run_id > last_id)
+                .order_by(run_id)
+                .limit(self.batch_size)
+            )
+            runs = list(db.exec(statement))
+            if not runs:
+                break
+            last_id = runs[-1].id or 0
+            runs = self._claim(db, runs)
+
+            # Files are named after the batch key and overwritten on a rerun, so a batch
+            # whose commit below failed is rewritten in place rather than duplicated.
+            for key in dict.fromkeys(run.archive_batch for run in runs):
+                ds.write_dataset(
+                    self._to_table([run for run in runs if run.archive_batch == key]),
+                    self.base_path,
+                    format="parquet",
+                    partitioning=PARTITION_COLUMNS,
+                    partitioning_flavor="hive",
+                    basename_template=f"part-{key}-{{i}}.parquet",
+                    existing_data_behavior="overwrite_or_ignore",
+                )
+
+            for run in runs:
+                run.archive_path = self._partition_path(run)
+                run.meta_payload = {}
+                run.competitor_payload = {}
+                run.insight_text = ""
+                run.insight_structured = {}
+                db.add(run)
+            db.commit()
+
+            archived += len(runs)
+            logger.info("archive.batch_written", runs=len(runs), last_id=last_id)
+
+        return archived
+
+    def query(
+        self,
+        columns: list[str] | None = None,
+        account_ids: list[str] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        filter: ds.Expression | None = None,
+    ) -> pa.Table:
+        """Scan the archive with column and predicate pushdown.
+
+        Account and date bounds prune whole partitions before any file is opened;
+        ``filter`` accepts an arbitrary pyarrow expression, e.g. ``ds.field("spend") > 1000``.
+        """
+        _require_pyarrow()
+        if not self.base_path.exists():
+            return self.schema().empty_table().select(columns) if columns else self.schema().empty_table()
+
+        dataset = ds.dataset(self.base_path, format="parquet", partitioning="hive", schema=self.schema())
+        expression = filter
+        if account_ids:
+            expression = self._and(expression, ds.field("account_id").isin(account_ids))
+        if since is not None:
+            expression = self._and(expression, ds.field("date") >= f"{since:%Y-%m-%d}")
+            expression = self._and(expression, ds.field("created_at") >= pa.scalar(since, pa.timestamp("us", tz="UTC")))
+        if until is not None:
+            expression = self._and(expression, ds.field("date") <= f"{until:%Y-%m-%d}")
+            expression = self._and(expression, ds.field("created_at") < pa.scalar(until, pa.timestamp("us", tz="UTC")))
+        return dataset.to_table(columns=columns, filter=expression)
+
+    @staticmethod
+    def _and(left: ds.Expression | None, right: ds.Expression) -> ds.Expression:
+        return right if left is None else left & right
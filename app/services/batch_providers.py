@@ -0,0 +1,217 @@
+"""Batch LLM submission layer for non-interactive insight generation."""
+from __future__ import annotations
+
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from typing import ClassVar
+
+import anthropic
+from anthropic.types import TextBlock
+from anthropic.types.messages import MessageBatchSucceededResult
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.services.ai_providers import AIProviderFactory
+
+settings = get_settings()
+
+
+class BatchRequest(BaseModel):
+    """A single prompt submitted as part of a batch."""
+    custom_id: str
+    prompt: str
+    model: str | None = None
+    max_tokens: int = 2000
+
+
+class BatchResult(BaseModel):
+    """Outcome of one batch request, matched back by ``custom_id``."""
+    custom_id: str
+    content: str = ""
+    provider: str
+    model: str
+    error: str | None = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+class BatchProvider(ABC):
+    """Base class for providers that accept asynchronous batches of prompts."""
+
+    name: str = ""
+
+    @abstractmethod
+    def submit(self, requests: list[BatchRequest]) -> str:
+        """Submit a batch and return the provider batch ID."""
+
+    @abstractmethod
+    def is_complete(self, batch_id: str) -> bool:
+        """Return True once every request in the batch has finished."""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> list[BatchResult]:
+        """Fetch results for a completed batch."""
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Check if the provider is configured and available."""
+
+
+class ClaudeBatchProvider(BatchProvider):
+    """Anthropic Message Batches API."""
+
+    name = "claude"
+
+    def __init__(self) -> None:
+        self._client: anthropic.Anthropic | None = None
+        if settings.anthropic_api_key:
+            self._client = anthropic.Anthropic(api_key=settings.anthropic_api_key)
+        self.model = settings.claude_model
+
+    def is_available(self) -> bool:
+        return self._client is not None
+
+    @property
+    def client(self) -> anthropic.Anthropic:
+        if self._client is None:
+            raise ValueError("Claude API key not configured")
+        return self._client
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        batch = self.client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": request.custom_id,
+                    "params": {
+                        "model": request.model or self.model,
+                        "max_tokens": request.max_tokens,
+                        "messages": [{"role": "user", "content": request.prompt}],
+                    },
+                }
+                for request in requests
+            ]
+        )
+        return batch.id
+
+    def is_complete(self, batch_id: str) -> bool:
+        batch = self.client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    def results(self, batch_id: str) -> list[BatchResult]:
+        results = []
+        for entry in self.client.messages.batches.results(batch_id):
+            if isinstance(entry.result, MessageBatchSucceededResult):
+                message = entry.result.message
+                results.append(
+                    BatchResult(
+                        custom_id=entry.custom_id,
+                        content="".join(block.text for block in message.content if isinstance(block, TextBlock)),
+                        provider=self.name,
+                        model=message.model,
+                        input_tokens=message.usage.input_tokens,
+                        output_tokens=message.usage.output_tokens,
+                    )
+                )
+            else:
+                results.append(
+                    BatchResult(
+                        custom_id=entry.custom_id,
+                        provider=self.name,
+                        model=self.model,
+                        error=entry.result.type,
+                    )
+                )
+        return results
+
+
+class LocalBatchProvider(BatchProvider):
+    """In-process stand-in that runs each prompt synchronously on submit.
+
+    Used for local development and tests, and for providers without a batch API.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        generate: Callable[[BatchRequest], BatchResult] | None = None,
+        provider_name: str | None = None,
+    ) -> None:
+        self.provider_name = provider_name or settings.llm_provider.lower()
+        self._generate = generate or self._generate_with_provider
+        self._batches: dict[str, list[BatchResult]] = {}
+
+    def is_available(self) -> bool:
+        return True
+
+    def _generate_with_provider(self, request: BatchRequest) -> BatchResult:
+        ai_provider = AIProviderFactory.get_provider(self.provider_name)
+        response = ai_provider.generate(request.prompt, model=request.model, max_tokens=request.max_tokens)
+        return BatchResult(
+            custom_id=request.custom_id,
+            content=response.content,
+            provider=response.provider,
+            model=response.model,
+            input_tokens=response.input_tokens,
+            output_tokens=response.output_tokens,
+        )
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        batch_id = f"local-{uuid.uuid4().hex}"
+        results = []
+        for request in requests:
+            try:
+                results.append(self._generate(request))
+            except Exception as exc:  # noqa: BLE001
+                results.append(
+                    BatchResult(
+                        custom_id=request.custom_id,
+                        provider=self.provider_name,
+                        model=request.model or "default",
+                        error=str(exc),
+                    )
+                )
+        self._batches[batch_id] = results
+        return batch_id
+
+    def is_complete(self, batch_id: str) -> bool:
+        return batch_id in self._batches
+
+    def results(self, batch_id: str) -> list[BatchResult]:
+        # Kept readable, as on a real batch API, so a failed collect can be retried.
+        return self._batches.get(batch_id, [])
+
+
+class BatchProviderFactory:
+    """Factory for batch-capable providers."""
+
+    _providers: ClassVar[dict[str, BatchProvider]] = {}
+
+    @classmethod
+    def get_provider(cls, provider_name: str) -> BatchProvider:
+        provider_name = provider_name.lower()
+
+        if provider_name not in cls._providers:
+            if provider_name == "claude":
+                cls._providers[provider_name] = ClaudeBatchProvider()
+            elif provider_name == "local":
+                cls._providers[provider_name] = LocalBatchProvider()
+            else:
+                raise ValueError(f"Unknown batch provider: {provider_name}")
+
+        provider = cls._providers[provider_name]
+        if not provider.is_available():
+            raise ValueError(f"Batch provider {provider_name} is not configured")
+
+        return provider
+
+    @classmethod
+    def register(cls, provider_name: str, provider: BatchProvider) -> None:
+        """Register a custom batch provider, e.g. a local stand-in."""
+        cls._providers[provider_name.lower()] = provider
+
@@ -0,0 +1,154 @@
+"""Binary codecs and compression for cached snapshots.
+
+Encoded values start with a 5 byte header: ``MG`` magic, format version, codec ID and
+compression ID. Values without the header are legacy ``json.dumps`` strings.
+"""
+from __future__ import annotations
+
+import json
+import zlib
+from typing import Any
+
+import orjson
+
+try:
+    import msgpack  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+MAGIC = b"MG"
+FORMAT_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 3
+
+CODEC_IDS = {"orjson": 1, "msgpack": 2}
+COMPRESSION_IDS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+
+
+def _msgpack_default(value: Any) -> Any:
+    """Encode types msgpack lacks (datetimes, UUIDs, enums, ...) exactly as orjson does.
+
+    Snapshots then decode to the same values whichever codec wrote them; types orjson
+    rejects raise ``TypeError`` here too instead of being silently stringified.
+    """
+    return orjson.loads(orjson.dumps(value))
+
+
+def _encode_body(codec: str, payload: Any) -> bytes:
+    if codec == "orjson":
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    if codec == "msgpack":
+        return msgpack.packb(payload, use_bin_type=True, default=_msgpack_default)
+    raise ValueError(f"Unknown cache codec: {codec}")
+
+
+def _decode_body(codec_id: int, body: bytes) -> Any:
+    if codec_id == CODEC_IDS["orjson"]:
+        return orjson.loads(body)
+    if codec_id == CODEC_IDS["msgpack"]:
+        if msgpack is None:
+            raise ValueError("msgpack is required to decode this cache entry")
+        return msgpack.unpackb(body, raw=False)
+    raise ValueError(f"Unknown cache codec id: {codec_id}")
+
+
+def _compress(compression: str, body: bytes) -> bytes:
+    if compression == "zlib":
+        return zlib.compress(body, 3)
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    if compression == "lz4":
+        return lz4_frame.compress(body)
+    raise ValueError(f"Unknown cache compression: {compression}")
+
+
+def _decompress(compression_id: int, body: bytes) -> bytes:
+    if compression_id == COMPRESSION_IDS["none"]:
+        return body
+    if compression_id == COMPRESSION_IDS["zlib"]:
+        return zlib.decompress(body)
+    if compression_id == COMPRESSION_IDS["zstd"]:
+        if zstandard is None:
+            raise ValueError("zstandard is required to decode this cache entry")
+        return zstandard.ZstdDecompressor().decompress(body)
+    if compression_id == COMPRESSION_IDS["lz4"]:
+        if lz4_frame is None:
+            raise ValueError("lz4 is required to decode this cache entry")
+        return lz4_frame.decompress(body)
+    raise ValueError(f"Unknown cache compression id: {compression_id}")
+
+
+def available_compression(preferred: str) -> str:
+    """Return ``preferred`` if its library is installed, otherwise fall back to zlib."""
+    if preferred == "zstd" and zstandard is None:
+        return "zlib"
+    if preferred == "lz4" and lz4_frame is None:
+        return "zlib"
+    return preferred
+
+
+class SnapshotCodec:
+    """Serializes snapshots with a versioned header and size-thresholded compression."""
+
+    def __init__(self, codec: str = "orjson", compression: str = "zlib", compress_min_bytes: int = 1024) -> None:
+        if codec not in CODEC_IDS:
+            raise ValueError(f"Unknown cache codec: {codec}")
+        if codec == "msgpack" and msgpack is None:
+            codec = "orjson"
+        compression = available_compression(compression)
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+
+        self.codec = codec
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+        self.stats = {"encoded": 0, "decoded": 0, "raw_bytes": 0, "stored_bytes": 0, "legacy_reads": 0}
+
+    def encode(self, payload: Any) -> bytes:
+        body = _encode_body(self.codec, payload)
+        raw_size = len(body)
+
+        compression = "none"
+        if self.compression != "none" and raw_size >= self.compress_min_bytes:
+            compressed = _compress(self.compression, body)
+            if len(compressed) < raw_size:
+                body = compressed
+                compression = self.compression
+
+        header = MAGIC + bytes([FORMAT_VERSION, CODEC_IDS[self.codec], COMPRESSION_IDS[compression]])
+        value = header + body
+
+        self.stats["encoded"] += 1
+        self.stats["raw_bytes"] += raw_size
+        self.stats["stored_bytes"] += len(value)
+        return value
+
+    def decode(self, value: bytes | str) -> Any:
+        self.stats["decoded"] += 1
+        if isinstance(value, str) or not value.startswith(MAGIC):
+            # Entries written before the codec layer existed.
+            self.stats["legacy_reads"] += 1
+            return json.loads(value)
+
+        version, codec_id, compression_id = value[len(MAGIC):HEADER_SIZE]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache format version: {version}")
+        return _decode_body(codec_id, _decompress(compression_id, value[HEADER_SIZE:]))
+
+    def size_stats(self) -> dict[str, float]:
+        """Byte-size stats for values encoded by this codec instance."""
+        raw = self.stats["raw_bytes"]
+        stored = self.stats["stored_bytes"]
+        return {
+            **self.stats,
+            "compression_ratio": round(raw / stored, 3) if stored else 0.0,
+        }
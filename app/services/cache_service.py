@@ -1,24 +1,39 @@
-import json
-from typing import Any, Optional
+from typing import Any
 
 import redis
 
 from app.config import get_settings
+from app.services.cache_codec import SnapshotCodec
 
 settings = get_settings()
 
 
 class CacheService:
     def __init__(self) -> None:
-        self.client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        # Binary client: snapshots are stored in the codec's framed format.
+        self.client = redis.Redis.from_url(settings.redis_url, decode_responses=False)
+        self.codec = SnapshotCodec(
+            codec=settings.cache_codec,
+            compression=settings.cache_compression,
+            compress_min_bytes=settings.cache_compress_min_bytes,
+        )
 
     def set_snapshot(self, key: str, payload: dict[str, Any], ttl_seconds: int = 3600) -> None:
-        serialized = json.dumps(payload)
+        serialized = self.codec.encode(payload)
         self.client.setex(key, ttl_seconds, serialized)
 
-    def get_snapshot(self, key: str) -> Optional[dict[str, Any]]:
+    def get_snapshot(self, key: str) -> dict[str, Any] | None:
         value = self.client.get(key)
         if not value:
             return None
-        return json.loads(value)
+        return self.codec.decode(value)
 
+    def get_snapshots(self, keys: list[str]) -> list[dict[str, Any] | None]:
+        """Fetch many snapshots in a single MGET round-trip, preserving key order."""
+        if not keys:
+            return []
+        values = self.client.mget(keys)
+        return [self.codec.decode(value) if value else None for value in values]
+
+    def stats(self) -> dict[str, float]:
+        return self.codec.size_stats()
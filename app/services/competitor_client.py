@@ -1,58 +1,92 @@
 from __future__ import annotations
 
+import asyncio
 from typing import Any
 
 import httpx
 
 from app.config import get_settings
+from app.services.http_clients import client_or_shared
 from app.services.traffic_service import TrafficAnalysisService
 
 settings = get_settings()
 
 
 class CompetitorIntelClient:
-    def __init__(self, api_key: str | None = None) -> None:
+    MARKET_SHARE_URL = "https://api.trafficintel.com/v1/market-share"
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        traffic_service: TrafficAnalysisService | None = None,
+        max_concurrency: int = 10,
+    ) -> None:
         self.api_key = api_key or settings.comp_intel_api_key
-        self.session = httpx.Client(timeout=30)
-        self.traffic_service = TrafficAnalysisService()
+        self._client = client
+        self.traffic_service = traffic_service or TrafficAnalysisService()
+        self.max_concurrency = max_concurrency
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        return client_or_shared(self._client, "trafficintel")
 
     def _headers(self) -> dict[str, str]:
         return {"Authorization": f"Bearer {self.api_key}"}
 
-    async def fetch_market_share(self, domain: str) -> dict[str, Any]:
-        """Fetch market share data, including traffic analysis from RapidAPI."""
+    async def _fetch_market_data(self, domain: str) -> dict[str, Any] | None:
         try:
-            # Try original API first
-            resp = self.session.get(
-                "https://api.trafficintel.com/v1/market-share",
+            resp = await self.session.get(
+                self.MARKET_SHARE_URL,
                 headers=self._headers(),
                 params={"domain": domain},
             )
             resp.raise_for_status()
-            market_data = resp.json()
-            
-            # Enhance with RapidAPI traffic data
-            traffic_data = await self.traffic_service.get_traffic_data(domain)
-            market_data["traffic"] = traffic_data
-            
-            return market_data
+            return resp.json()
         except Exception:
-            # Fallback: use RapidAPI traffic data only
-            traffic_data = await self.traffic_service.get_traffic_data(domain)
-            return {
-                "domain": domain,
-                "traffic_share": 0.23,
-                "top_channels": [
-                    {"channel": "Paid Social", "share": 0.45},
-                    {"channel": "Organic Search", "share": 0.25},
-                    {"channel": "Affiliate", "share": 0.12},
-                ],
-                "benchmark_ctr": 0.065,
-                "benchmark_cpc": 0.38,
-                "traffic": traffic_data,  # Include RapidAPI traffic data
-            }
-    
+            return None
+
+    @staticmethod
+    def _fallback_market_share(domain: str) -> dict[str, Any]:
+        return {
+            "domain": domain,
+            "traffic_share": 0.23,
+            "top_channels": [
+                {"channel": "Paid Social", "share": 0.45},
+                {"channel": "Organic Search", "share": 0.25},
+                {"channel": "Affiliate", "share": 0.12},
+            ],
+            "benchmark_ctr": 0.065,
+            "benchmark_cpc": 0.38,
+        }
+
+    async def fetch_market_share(self, domain: str) -> dict[str, Any]:
+        """Fetch market share data, including traffic analysis from RapidAPI.
+
+        Market share and traffic are requested concurrently; the one traffic result is
+        attached to either the upstream market data or the fallback benchmarks.
+        """
+        market_data, traffic_data = await asyncio.gather(
+            self._fetch_market_data(domain),
+            self.traffic_service.get_traffic_data(domain),
+        )
+        if market_data is None:
+            market_data = self._fallback_market_share(domain)
+        market_data["traffic"] = traffic_data
+        return market_data
+
+    async def fetch_market_share_many(self, domains: list[str]) -> dict[str, dict[str, Any]]:
+        """Fetch market share for many competitor domains over the shared connection pool."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(domain: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self.fetch_market_share(domain)
+
+        domains = list(dict.fromkeys(domains))
+        results = await asyncio.gather(*[bounded(domain) for domain in domains])
+        return dict(zip(domains, results))
+
     async def fetch_traffic_for_competitors(self, domains: list[str]) -> dict[str, dict[str, Any]]:
         """Fetch traffic data for multiple competitor domains using RapidAPI."""
         return await self.traffic_service.get_multiple_domains(domains)
-
@@ -0,0 +1,171 @@
+"""Alert email delivery over a small pool of persistent SMTP connections."""
+from __future__ import annotations
+
+import queue
+import smtplib
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage
+
+import structlog
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+
+class SMTPPool:
+    """Hands out at most ``size`` SMTP connections, reusing them across sends.
+
+    Connections are opened lazily, so a pool created before a Celery worker forks holds
+    no sockets. Connections idle for longer than ``idle_check_seconds`` are checked with
+    NOOP before reuse, and any connection that errors is dropped instead of returned.
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool | None = None,
+        size: int | None = None,
+        timeout: float | None = None,
+        idle_check_seconds: float = 30.0,
+        smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP,
+    ) -> None:
+        self.host = host if host is not None else settings.smtp_host
+        self.port = port or settings.smtp_port
+        self.username = username if username is not None else settings.smtp_username
+        self.password = password if password is not None else settings.smtp_password
+        self.use_tls = settings.smtp_use_tls if use_tls is None else use_tls
+        self.size = size or settings.smtp_pool_size
+        self.timeout = timeout or settings.smtp_timeout_seconds
+        self.idle_check_seconds = idle_check_seconds
+        self.smtp_factory = smtp_factory
+        self._idle: queue.LifoQueue[tuple[smtplib.SMTP, float]] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _open(self) -> smtplib.SMTP:
+        conn = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                conn.starttls()
+            if self.username:
+                conn.login(self.username, self.password)
+        except BaseException:
+            # A failed handshake or bad credential must not leak the socket.
+            conn.close()
+            raise
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                conn, released_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if time.monotonic() - released_at < self.idle_check_seconds:
+                return conn
+            try:
+                if conn.noop()[0] == 250:
+                    return conn
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(conn)
+
+    @staticmethod
+    def _discard(conn: smtplib.SMTP) -> None:
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+    @contextmanager
+    def connection(self) -> Iterator[smtplib.SMTP]:
+        with self._slots:
+            conn = self._checkout()
+            try:
+                yield conn
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException):
+                # The session state is unknown after these; start fresh next time.
+                self._discard(conn)
+                raise
+            except smtplib.SMTPException:
+                # e.g. refused recipients: smtplib has already reset the transaction.
+                self._idle.put((conn, time.monotonic()))
+                raise
+            except OSError:
+                self._discard(conn)
+                raise
+            else:
+                self._idle.put((conn, time.monotonic()))
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+
+class EmailService:
+    def __init__(self, pool: SMTPPool | None = None, sender: str | None = None) -> None:
+        self._pool = pool
+        self.sender = sender or settings.smtp_sender
+
+    @property
+    def pool(self) -> SMTPPool:
+        if self._pool is None:
+            self._pool = SMTPPool()
+        return self._pool
+
+    @staticmethod
+    def recipients() -> list[str]:
+        return [address.strip() for address in settings.alert_emails.split(",") if address.strip()]
+
+    @property
+    def enabled(self) -> bool:
+        return bool(settings.smtp_host and self.recipients())
+
+    def build_message(self, recipient: str, subject: str, body: str) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient
+        message["Subject"] = subject
+        message.set_content(body)
+        return message
+
+    def _send_one(self, recipient: str, subject: str, body: str) -> str | None:
+        """Send to one recipient; return the address if it should be retried."""
+        try:
+            with self.pool.connection() as smtp:
+                smtp.send_message(self.build_message(recipient, subject, body))
+            return None
+        except smtplib.SMTPRecipientsRefused as exc:
+            # Permanent (5xx) rejections are not retried; greylisting (4xx) is.
+            logger.warning("alerts.email_refused", recipient=recipient, error=str(exc.recipients))
+            return recipient if any(code < 500 for code, _ in exc.recipients.values()) else None
+        except (smtplib.SMTPException, OSError) as exc:
+            logger.warning("alerts.email_failed", recipient=recipient, error=str(exc))
+            return recipient
+
+    def send(self, recipients: list[str], subject: str, body: str) -> list[str]:
+        """Send one message per recipient over the pooled connections.
+
+        Returns the recipients that failed transiently, for the caller to retry.
+        """
+        with ThreadPoolExecutor(max_workers=min(self.pool.size, max(len(recipients), 1))) as executor:
+            results = executor.map(lambda recipient: self._send_one(recipient, subject, body), recipients)
+            failed = [recipient for recipient in results if recipient]
+        logger.info("alerts.email_sent", recipients=len(recipients) - len(failed), failed=len(failed))
+        return failed
@@ -0,0 +1,156 @@
+"""Change events (new reports, new alerts) over Redis pub/sub, fanned out to push clients.
+
+Workers publish to ``events:{account_id}``. Each API process holds a single pattern
+subscription and hands events to its connected clients, so Redis sees one subscriber
+per process no matter how many tabs are open.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any
+
+import orjson
+import redis
+import redis.asyncio as aioredis
+import structlog
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+CHANNEL_PREFIX = "events"
+
+
+class EventPublisher:
+    def __init__(self, client: redis.Redis | None = None) -> None:
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis.from_url(settings.redis_url)
+        return self._client
+
+    def publish(self, event_type: str, account_id: str, **data: Any) -> None:
+        """Best effort: clients fall back to polling, so a lost event only delays an update."""
+        event = {"type": event_type, "account_id": account_id, "at": datetime.now(UTC).isoformat(), **data}
+        try:
+            self.client.publish(f"{CHANNEL_PREFIX}:{account_id}", orjson.dumps(event, default=str))
+        except redis.RedisError as exc:
+            logger.warning("events.publish_failed", event_type=event_type, account_id=account_id, error=str(exc))
+
+
+class EventSubscription:
+    """One connected client: an account filter and a bounded queue."""
+
+    def __init__(self, account_ids: set[str] | None, max_queue: int) -> None:
+        self.account_ids = account_ids
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def wants(self, event: dict[str, Any]) -> bool:
+        return not self.account_ids or event.get("account_id") in self.account_ids
+
+    def offer(self, event: dict[str, Any]) -> None:
+        # Never block the fan-out on a slow client; it is told how much it missed instead.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def next(self, timeout: float) -> dict[str, Any] | None:
+        """The next event, a ``lagged`` notice after drops, or None when a heartbeat is due."""
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            return {"type": "lagged", "dropped": dropped}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class EventBroker:
+    def __init__(self, client: aioredis.Redis | None = None, max_queue: int | None = None) -> None:
+        self._client = client
+        self.max_queue = max_queue or settings.event_queue_size
+        self._subscriptions: set[EventSubscription] = set()
+        self._task: asyncio.Task[None] | None = None
+        self._ready: asyncio.Event | None = None
+
+    @property
+    def client(self) -> aioredis.Redis:
+        if self._client is None:
+            self._client = aioredis.Redis.from_url(settings.redis_url)
+        return self._client
+
+    async def _start(self) -> None:
+        if self._task is None or self._task.done():
+            self._ready = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        await self._ready.wait()  # type: ignore[union-attr]
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        try:
+            event = orjson.loads(message["data"])
+        except orjson.JSONDecodeError as exc:
+            logger.warning("events.bad_payload", channel=message.get("channel"), error=str(exc))
+            return
+        if not isinstance(event, dict):
+            logger.warning("events.bad_payload", channel=message.get("channel"), error="not an object")
+            return
+        for subscription in list(self._subscriptions):
+            if subscription.wants(event):
+                subscription.offer(event)
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}:*")
+                self._ready.set()  # type: ignore[union-attr]
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    # One bad message must not take the listener (and every client) down with it.
+                    try:
+                        self._dispatch(message)
+                    except Exception:
+                        logger.exception("events.dispatch_failed", channel=message.get("channel"))
+            except (redis.RedisError, OSError) as exc:
+                logger.warning("events.subscription_lost", error=str(exc))
+            except Exception:
+                logger.exception("events.listener_failed")
+            finally:
+                # types-redis predates aclose(); redis-py >= 5 has it.
+                await pubsub.aclose()  # type: ignore[attr-defined]
+            self._ready.set()  # type: ignore[union-attr]
+            await asyncio.sleep(1)
+
+    @asynccontextmanager
+    async def subscribe(self, account_ids: list[str] | None = None) -> AsyncIterator[EventSubscription]:
+        await self._start()
+        subscription = EventSubscription(set(account_ids) if account_ids else None, self.max_queue)
+        self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscriptions.discard(subscription)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()  # type: ignore[attr-defined]
+            self._client = None
+
+
+event_broker = EventBroker()
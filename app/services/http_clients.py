@@ -0,0 +1,118 @@
+"""Application-wide registry of pooled async HTTP clients, one per upstream.
+
+httpx async pools are bound to the event loop that created them, so clients are
+kept per loop. The API uses its single server loop; Celery workers and scripts run
+coroutines through ``run_sync`` on a long-lived per-thread loop so that pools are
+reused across tasks instead of rebuilt on every ``asyncio.run``.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from collections.abc import Awaitable
+from typing import TypeVar
+
+import httpx
+import structlog
+
+from app.config import get_settings
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+# One pooled client per upstream host; services ask for them by name.
+UPSTREAMS = ("meta", "rapidapi", "trafficintel", "webhook")
+
+
+class HTTPClientRegistry:
+    def __init__(self) -> None:
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @staticmethod
+    def _build(name: str) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_keepalive_connections,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            ),
+            http2=settings.http2_enabled and HTTP2_AVAILABLE,
+            headers={"User-Agent": f"meta-growth-agent/{name}"},
+        )
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the shared client for ``name`` on the running event loop."""
+        if name not in UPSTREAMS:
+            raise ValueError(f"Unknown upstream: {name}")
+        loop = asyncio.get_running_loop()
+        clients = self._clients.setdefault(loop, {})
+        client = clients.get(name)
+        if client is None or client.is_closed:
+            client = clients[name] = self._build(name)
+        return client
+
+    async def start(self) -> None:
+        """Create every upstream client up front on the running loop."""
+        for name in UPSTREAMS:
+            self.get(name)
+        logger.info("http_clients.started", upstreams=list(UPSTREAMS), http2=settings.http2_enabled and HTTP2_AVAILABLE)
+
+    async def aclose(self) -> None:
+        """Close the clients that belong to the running loop."""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+        if clients:
+            logger.info("http_clients.closed", upstreams=list(clients))
+
+
+http_clients = HTTPClientRegistry()
+
+_thread_state = threading.local()
+
+
+def _sync_loop() -> asyncio.AbstractEventLoop:
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _thread_state.loop = asyncio.new_event_loop()
+    return loop
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    """Run a coroutine from synchronous code on this thread's persistent loop.
+
+    Must not be called from inside a running event loop (e.g. an async route handler);
+    await the coroutine there instead.
+    """
+    return _sync_loop().run_until_complete(awaitable)
+
+
+def start_sync_clients() -> None:
+    run_sync(http_clients.start())
+
+
+def close_sync_clients() -> None:
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        return
+    loop.run_until_complete(http_clients.aclose())
+    loop.close()
+
+
+def client_or_shared(client: httpx.AsyncClient | None, name: str) -> httpx.AsyncClient:
+    """Injected client (tests, stand-ins) if given, otherwise the shared pool for ``name``."""
+    return client if client is not None else http_clients.get(name)
+
@@ -0,0 +1,245 @@
+"""Batch-mode insight generation for scheduled refresh cycles."""
+from __future__ import annotations
+
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+import structlog
+from pydantic import BaseModel, Field
+from sqlmodel import Session
+
+from app.config import get_settings
+from app.models.report import ReportRun
+from app.services.batch_providers import BatchProvider, BatchProviderFactory, BatchRequest
+from app.services.meta_quota import MetaThrottled
+from app.services.report_service import ReportService
+from app.services.usage_service import LLMUsageRecord, UsageService
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+
+class PendingInsightJob(BaseModel):
+    """Everything needed to write a ReportRun once the batch result arrives."""
+    account_id: str
+    domain: str
+    timeframe: str
+    meta: dict[str, Any]
+    competitor: dict[str, Any]
+
+
+class PendingInsightBatch(BaseModel):
+    """A submitted batch; serializable so it can be passed between Celery tasks."""
+    batch_id: str
+    provider: str
+    jobs: dict[str, PendingInsightJob] = Field(default_factory=dict)
+    submitted_at: float = Field(default_factory=time.time)
+    deferred: list[dict[str, str]] = Field(
+        default_factory=list, description="Accounts left out because their Meta quota is exhausted"
+    )
+    retry_after: float = 0.0
+
+
+class InsightBatchService:
+    """Collects rendered INSIGHT_TEMPLATE prompts for a refresh cycle and runs them as one batch."""
+
+    def __init__(
+        self,
+        report_service: ReportService | None = None,
+        provider: BatchProvider | None = None,
+        usage_service: UsageService | None = None,
+    ) -> None:
+        self.report_service = report_service or ReportService()
+        self._provider = provider
+        self.usage_service = usage_service or UsageService()
+
+    @property
+    def provider(self) -> BatchProvider:
+        if self._provider is None:
+            self._provider = BatchProviderFactory.get_provider(settings.insight_batch_provider)
+        return self._provider
+
+    def submit(self, accounts: list[dict[str, str]], timeframe: str = "last_7d") -> PendingInsightBatch:
+        """Fetch data for each account and submit all insight prompts in one batch.
+
+        Args:
+            accounts: List of {"account_id": ..., "domain": ...} dicts
+            timeframe: Report timeframe recorded on every run
+
+        Returns:
+            PendingInsightBatch to hand to ``collect``. Accounts whose Meta quota is
+            exhausted are listed in ``deferred`` for the caller to reschedule; if every
+            account is throttled, ``MetaThrottled`` is raised instead.
+        """
+        insight_service = self.report_service.insight_service
+        jobs: dict[str, PendingInsightJob] = {}
+        requests: list[BatchRequest] = []
+        deferred: list[dict[str, str]] = []
+        retry_after = 0.0
+
+        def defer(throttled: set[str], exc: MetaThrottled) -> None:
+            nonlocal accounts, retry_after
+            deferred.extend(account for account in accounts if account["account_id"] in throttled)
+            accounts = [account for account in accounts if account["account_id"] not in throttled]
+            retry_after = max(retry_after, exc.retry_after)
+            logger.info("insight_batch.accounts_deferred", accounts=sorted(throttled), retry_after=exc.retry_after)
+
+        def domain_of(account: dict[str, str]) -> str:
+            return account.get("domain", "example.com")
+
+        # Overviews go through Graph API batch requests and async breakdown jobs are
+        # multiplexed, so the whole cycle costs a handful of Meta round-trips. A throttle
+        # at any step defers the accounts it names (all of them when it names none).
+        try:
+            overviews = self.report_service.fetch_overviews([account["account_id"] for account in accounts])
+        except MetaThrottled as exc:
+            if not exc.partial:
+                raise
+            defer(set(exc.account_ids), exc)
+            overviews = exc.partial
+        try:
+            breakdowns = self.report_service.fetch_breakdowns([account["account_id"] for account in accounts])
+        except MetaThrottled as exc:
+            defer(set(exc.account_ids) or {account["account_id"] for account in accounts}, exc)
+            breakdowns = exc.partial
+        try:
+            competitors = self.report_service.fetch_competitors([domain_of(account) for account in accounts])
+        except MetaThrottled as exc:
+            domains = set(exc.account_ids) or {domain_of(account) for account in accounts}
+            defer({account["account_id"] for account in accounts if domain_of(account) in domains}, exc)
+            competitors = exc.partial
+
+        for index, account in enumerate(list(accounts)):
+            account_id = account["account_id"]
+            domain = domain_of(account)
+            try:
+                meta, competitor = self.report_service.fetch_data(
+                    account_id,
+                    domain,
+                    breakdowns=breakdowns.get(account_id),
+                    meta=overviews.get(account_id),
+                    competitor=competitors.get(domain),
+                )
+            except MetaThrottled as exc:
+                defer({account_id}, exc)
+                continue
+
+            custom_id = f"{account_id}-{index}"
+            jobs[custom_id] = PendingInsightJob(
+                account_id=account_id,
+                domain=domain,
+                timeframe=timeframe,
+                meta=meta,
+                competitor=competitor,
+            )
+            requests.append(
+                BatchRequest(custom_id=custom_id, prompt=insight_service.render_prompt(meta, competitor))
+            )
+
+        if deferred and not requests:
+            raise MetaThrottled(
+                retry_after, scope="account", account_ids=[account["account_id"] for account in deferred]
+            )
+        batch_id = self.provider.submit(requests)
+        logger.info("insight_batch.submitted", batch_id=batch_id, provider=self.provider.name, size=len(requests))
+        return PendingInsightBatch(
+            batch_id=batch_id, provider=self.provider.name, jobs=jobs, deferred=deferred, retry_after=retry_after
+        )
+
+    def collect(self, db: Session, pending: PendingInsightBatch) -> list[ReportRun] | None:
+        """Write ReportRuns for a finished batch.
+
+        Returns None while the batch is still processing. Requests that failed inside
+        the batch fall back to a synchronous ``InsightService.generate`` call.
+
+        Safe to call again after a partial failure: entries that already have a
+        ReportRun (tagged with the batch and custom ID) are skipped, and usage is
+        recorded only once an entry's run is saved.
+        """
+        provider = self._provider or BatchProviderFactory.get_provider(pending.provider)
+        if not provider.is_complete(pending.batch_id):
+            return None
+
+        results = {result.custom_id: result for result in provider.results(pending.batch_id)}
+        saved = self.report_service.saved_batch_entries(
+            db,
+            pending.batch_id,
+            sorted({job.account_id for job in pending.jobs.values()}),
+            # Margin for clock skew between the submitting and collecting workers.
+            since=datetime.fromtimestamp(pending.submitted_at - 300, UTC),
+        )
+        runs = []
+        for custom_id, job in pending.jobs.items():
+            if custom_id in saved:
+                continue
+            result = results.get(custom_id)
+            if result is not None and result.succeeded:
+                insight = {
+                    "text": result.content,
+                    "provider": result.provider,
+                    "model": result.model,
+                    "usage": {"input_tokens": result.input_tokens, "output_tokens": result.output_tokens},
+                }
+            else:
+                logger.warning(
+                    "insight_batch.request_failed",
+                    batch_id=pending.batch_id,
+                    account_id=job.account_id,
+                    error=result.error if result else "missing",
+                )
+                insight = self.report_service.insight_service.generate(
+                    job.meta, job.competitor, account_id=job.account_id
+                )
+
+            runs.append(
+                self.report_service.save_report(
+                    db,
+                    account_id=job.account_id,
+                    timeframe=job.timeframe,
+                    meta=job.meta,
+                    competitor=job.competitor,
+                    insight=insight,
+                    batch={"batch_id": pending.batch_id, "custom_id": custom_id},
+                )
+            )
+            if result is not None:
+                # Batch calls have no per-request latency; only tokens are accounted.
+                self.usage_service.record(
+                    LLMUsageRecord(
+                        account_id=job.account_id,
+                        task="insight_batch",
+                        provider=result.provider,
+                        model=result.model,
+                        input_tokens=result.input_tokens,
+                        output_tokens=result.output_tokens,
+                        error=not result.succeeded,
+                    )
+                )
+
+        logger.info(
+            "insight_batch.collected", batch_id=pending.batch_id, runs=len(runs), already_saved=len(saved)
+        )
+        return runs
+
+    def run(
+        self,
+        db: Session,
+        accounts: list[dict[str, str]],
+        timeframe: str = "last_7d",
+        poll_seconds: float | None = None,
+        timeout_seconds: float | None = None,
+    ) -> list[ReportRun]:
+        """Submit and block until the batch completes. Intended for scripts, not workers."""
+        poll_seconds = poll_seconds if poll_seconds is not None else settings.insight_batch_poll_seconds
+        timeout_seconds = timeout_seconds if timeout_seconds is not None else settings.insight_batch_timeout_seconds
+
+        pending = self.submit(accounts, timeframe=timeframe)
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            runs = self.collect(db, pending)
+            if runs is not None:
+                return runs
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Insight batch {pending.batch_id} did not finish in {timeout_seconds}s")
+            time.sleep(poll_seconds)
@@ -0,0 +1,189 @@
+"""Parse LLM output once, at generation time, into validated structured sections."""
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterable
+from typing import Any
+
+import structlog
+from pydantic import AliasChoices, BaseModel, Field, ValidationError, field_validator
+
+logger = structlog.get_logger()
+
+NO_INSIGHT = "No insight generated."
+
+# Heading keywords -> section; checked in order so "defensive" wins over "summary" etc.
+SECTION_KEYWORDS = (
+    ("defensive_moves", ("defensive", "defence", "defense", "counter-move", "competitive response")),
+    ("recommendations", ("optimization", "optimisation", "recommendation", "action")),
+    ("summary", ("summary", "insight", "key finding", "overview")),
+)
+
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_MARKUP_RE = re.compile(r"^#+\s*|\*\*|__")
+_FENCE_RE = re.compile(r"^```[a-zA-Z]*\s*$|^```\s*$", re.MULTILINE)
+_TRAILING_COMMA_RE = re.compile(r",\s*([\]}])")
+_URL_RE = re.compile(r"(https?://[^\s,)\]]+|(?:www\.)?[a-z0-9-]+\.[a-z]{2,}(?:/[^\s,)\]]*)?)", re.IGNORECASE)
+
+
+def _clean(line: str) -> str:
+    return _MARKUP_RE.sub("", _BULLET_RE.sub("", line)).strip().strip("*_").strip()
+
+
+class StructuredInsight(BaseModel):
+    """Sections of an INSIGHT_TEMPLATE answer."""
+    summary: str
+    recommendations: list[str] = Field(default_factory=list)
+    defensive_moves: list[str] = Field(default_factory=list)
+
+    @field_validator("recommendations", "defensive_moves")
+    @classmethod
+    def _drop_blank_items(cls, items: list[str]) -> list[str]:
+        return [item.strip() for item in items if item and item.strip()]
+
+    @field_validator("summary")
+    @classmethod
+    def _summary_required(cls, summary: str) -> str:
+        if not summary.strip():
+            raise ValueError("summary is empty")
+        return summary.strip()
+
+
+class CompetitorEntry(BaseModel):
+    name: str = Field(min_length=1)
+    url: str | None = Field(default=None, validation_alias=AliasChoices("url", "URL", "website", "domain"))
+    key_strength: str | None = Field(
+        default=None, validation_alias=AliasChoices("key_strength", "keyStrength", "strength", "key strength")
+    )
+
+
+def _heading(line: str) -> tuple[str | None, str]:
+    """Return (section, trailing text) when ``line`` is a section heading."""
+    text = _clean(line)
+    head, sep, rest = text.partition(":")
+    candidate = head if sep else text
+    lowered = candidate.lower()
+    stripped = line.strip()
+    marked = stripped.startswith("#") or (stripped.startswith("**") and stripped.rstrip(":").endswith("**"))
+    # Plain headings are short; list items that merely mention "optimization" are not.
+    if not marked and len(lowered.split()) > 6:
+        return None, ""
+    for section, keywords in SECTION_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return section, rest.strip()
+    return None, ""
+
+
+def _repair(text: str, taken: Iterable[str] = ()) -> dict[str, Any]:
+    """No usable summary: first paragraph is the summary, remaining list items are recommendations.
+
+    Heading lines and items already parsed into a section (``taken``) are skipped, and the
+    summary is never empty.
+    """
+    skip = set(taken)
+
+    def content(block: str, bullets_only: bool = False) -> list[str]:
+        return [
+            _clean(line)
+            for line in block.splitlines()
+            if _clean(line)
+            and _clean(line) not in skip
+            and _heading(line)[0] is None
+            and (not bullets_only or _BULLET_RE.match(line))
+        ]
+
+    paragraphs = [block for block in re.split(r"\n\s*\n", text.strip()) if content(block)]
+    if not paragraphs:
+        return {"summary": NO_INSIGHT, "recommendations": []}
+    recommendations = [item for block in paragraphs[1:] for item in content(block, bullets_only=True)]
+    return {"summary": "\n".join(content(paragraphs[0])), "recommendations": recommendations}
+
+
+def parse_insight(text: str) -> StructuredInsight:
+    """Split an insight answer into summary / recommendations / defensive moves.
+
+    Headings may be markdown (``## Summary``), bold, numbered (``1. 3 bullet insight summary``)
+    or colon-terminated (``Optimizations:``). Blank lines and headings never become items.
+    """
+    sections: dict[str, list[str]] = {"summary": [], "recommendations": [], "defensive_moves": []}
+    current: str | None = None
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        section, rest = _heading(line)
+        if section is not None:
+            current = section
+            if rest:
+                sections[current].append(rest)
+            continue
+        if current is not None and _clean(line):
+            sections[current].append(_clean(line))
+
+    data: dict[str, Any] = {
+        "summary": "\n".join(sections["summary"]),
+        "recommendations": sections["recommendations"],
+        "defensive_moves": sections["defensive_moves"],
+    }
+    if not data["summary"] and not data["recommendations"]:
+        data = {**data, **_repair(text, taken=data["defensive_moves"])}
+    try:
+        return StructuredInsight(**data)
+    except ValidationError:
+        logger.warning("insight.parse_repaired", reason="empty summary")
+        repaired = _repair(text, taken=data["recommendations"] + data["defensive_moves"])
+        return StructuredInsight(**{**data, "summary": repaired["summary"] or NO_INSIGHT})
+
+
+def _json_array(text: str) -> list[Any] | None:
+    body = _FENCE_RE.sub("", text)
+    start, end = body.find("["), body.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    candidate = body[start : end + 1]
+    attempts = [candidate, _TRAILING_COMMA_RE.sub(r"\1", candidate)]
+    if '"' not in candidate:
+        attempts.append(_TRAILING_COMMA_RE.sub(r"\1", candidate.replace("'", '"')))
+    for attempt in attempts:
+        try:
+            value = json.loads(attempt)
+        except json.JSONDecodeError:
+            continue
+        return value if isinstance(value, list) else None
+    return None
+
+
+def parse_competitors(text: str) -> list[CompetitorEntry]:
+    """Parse the competitor-identification answer (asked for as a JSON array).
+
+    Repairs code fences, trailing commas and single quotes; falls back to reading a
+    bullet list when the model ignored the JSON instruction.
+    """
+    items = _json_array(text)
+    competitors = []
+    if items is not None:
+        for item in items:
+            try:
+                competitors.append(
+                    CompetitorEntry(name=item) if isinstance(item, str) else CompetitorEntry.model_validate(item)
+                )
+            except ValidationError:
+                continue
+        if competitors:
+            return competitors
+
+    logger.info("insight.competitors_repaired", parsed_json=items is not None)
+    for line in text.splitlines():
+        if not _BULLET_RE.match(line):
+            continue
+        # e.g. "Acme (acme.com) - fast shipping" or "Acme: acme.com: fast shipping"
+        parts = [part.strip(" ()") for part in re.split(r"\s[-–]\s|:\s", _clean(line)) if part.strip(" ()")]
+        if not parts:
+            continue
+        url_match = _URL_RE.search(_clean(line))
+        name = _URL_RE.sub("", parts[0]).strip(" ()") or parts[0]
+        strength = parts[-1] if len(parts) > 1 and not _URL_RE.fullmatch(parts[-1]) else None
+        competitors.append(
+            CompetitorEntry(name=name, url=url_match.group(0) if url_match else None, key_strength=strength)
+        )
+    return competitors
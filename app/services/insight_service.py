@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Any
 
 import anthropic
 import google.generativeai as genai
+import structlog
 from jinja2 import Template
 
 from app.config import get_settings
 from app.services.ai_providers import AIProviderFactory
+from app.services.model_router import ModelRouter
+from app.services.usage_service import LLMUsageRecord, UsageService, usage_summary
 
 settings = get_settings()
+logger = structlog.get_logger()
 
 INSIGHT_TEMPLATE = Template(
     """You are an e-commerce growth strategist.
@@ -29,7 +36,11 @@ Keep tone actionable.
 
 
 class InsightService:
-    def __init__(self) -> None:
+    def __init__(self, usage_service: UsageService | None = None, router: ModelRouter | None = None) -> None:
+        self.usage_service = usage_service or UsageService()
+        if router is None and settings.model_routing_enabled:
+            router = ModelRouter(usage_service=self.usage_service)
+        self.router = router
         self._anthropic = anthropic.Anthropic(api_key=settings.anthropic_api_key) if settings.anthropic_api_key else None
         if settings.google_api_key:
             genai.configure(api_key=settings.google_api_key)
@@ -40,27 +51,74 @@ class InsightService:
     def render_prompt(self, meta: dict[str, Any], competitor: dict[str, Any]) -> str:
         return INSIGHT_TEMPLATE.render(meta=meta, competitor=competitor)
 
-    def generate(self, meta: dict[str, Any], competitor: dict[str, Any], provider: str | None = None, model: str | None = None) -> dict[str, Any]:
+    @contextmanager
+    def _legacy_usage(self, provider: str, model: str, account_id: str | None) -> Iterator[LLMUsageRecord]:
+        """Record a direct SDK call in llm_usage_hourly; the caller fills in the token counts."""
+        record = LLMUsageRecord(account_id=account_id or "", task="insight", provider=provider, model=model)
+        started = time.perf_counter()
+        try:
+            yield record
+        except Exception:
+            record.error = True
+            raise
+        finally:
+            record.latency_ms = (time.perf_counter() - started) * 1000
+            self.usage_service.record(record)
+
+    def generate(
+        self,
+        meta: dict[str, Any],
+        competitor: dict[str, Any],
+        provider: str | None = None,
+        model: str | None = None,
+        account_id: str | None = None,
+    ) -> dict[str, Any]:
         prompt = self.render_prompt(meta, competitor)
         provider_name = provider or settings.llm_provider.lower()
+        if self.router and not (provider or model):
+            decision = self.router.route("insight", prompt, default_provider=provider_name, account_id=account_id)
+            provider_name, model = decision.provider, decision.model
         
         # Use new AI provider system if available
         try:
             ai_provider = AIProviderFactory.get_provider(provider_name)
-            response = ai_provider.generate(prompt, model=model, max_tokens=2000)
-            return {"text": response.content, "provider": response.provider, "model": response.model}
-        except (ValueError, Exception):
-            # Fallback to old system
-            pass
+        except ValueError:
+            ai_provider = None  # unknown or unconfigured; the legacy clients below may still work
+        if ai_provider is not None:
+            try:
+                response = ai_provider.generate(prompt, model=model, max_tokens=2000)
+            except Exception as exc:  # noqa: BLE001
+                # Counted in llm_usage_hourly so the model router sees the provider's error rate.
+                logger.warning("insight.provider_failed", provider=provider_name, model=model, error=str(exc))
+                self.usage_service.record(
+                    LLMUsageRecord(
+                        account_id=account_id or "",
+                        task="insight",
+                        provider=provider_name,
+                        model=model or "default",
+                        error=True,
+                    )
+                )
+            else:
+                self.usage_service.record_response(response, task="insight", account_id=account_id)
+                return {
+                    "text": response.content,
+                    "provider": response.provider,
+                    "model": response.model,
+                    "usage": usage_summary(response),
+                }
         
         # Legacy fallback
         if provider_name == "claude" and self._anthropic:
             model_name = model or "claude-3-5-sonnet-20240620"
-            message = self._anthropic.messages.create(
-                model=model_name,
-                max_tokens=800,
-                messages=[{"role": "user", "content": prompt}],
-            )
+            with self._legacy_usage(provider_name, model_name, account_id) as usage:
+                message = self._anthropic.messages.create(
+                    model=model_name,
+                    max_tokens=800,
+                    messages=[{"role": "user", "content": prompt}],
+                )
+                usage.input_tokens = message.usage.input_tokens
+                usage.output_tokens = message.usage.output_tokens
             text = message.content[0].text if message.content else ""
         elif provider_name == "gemini" and self._gemini:
             # Support Gemini 3 models
@@ -69,7 +127,11 @@ class InsightService:
                 genai_model = genai.GenerativeModel(model_name)
             except Exception:
                 genai_model = self._gemini
-            resp = genai_model.generate_content(prompt)
+            with self._legacy_usage(provider_name, model_name, account_id) as usage:
+                resp = genai_model.generate_content(prompt)
+                metadata = getattr(resp, "usage_metadata", None)
+                usage.input_tokens = getattr(metadata, "prompt_token_count", 0) or 0
+                usage.output_tokens = getattr(metadata, "candidates_token_count", 0) or 0
             text = resp.text or ""
         else:
             text = (
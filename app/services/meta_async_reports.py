@@ -0,0 +1,198 @@
+"""Meta async insights report runs for large accounts and breakdown levels."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import httpx
+import orjson
+import structlog
+from pydantic import BaseModel, Field
+
+from app.config import get_settings
+from app.services.http_clients import client_or_shared
+from app.services.meta_client import MetaAdsClient
+from app.services.meta_quota import MetaQuotaGovernor, MetaThrottled
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+INSIGHT_FIELDS = [
+    "spend",
+    "impressions",
+    "clicks",
+    "actions",
+    "cpc",
+    "cpm",
+    "ctr",
+    "purchase_roas",
+]
+LEVEL_ID_FIELDS = {
+    "account": ["account_id"],
+    "campaign": ["campaign_id", "campaign_name"],
+    "adset": ["adset_id", "adset_name"],
+    "ad": ["ad_id", "ad_name"],
+}
+TERMINAL_FAILURES = {"Job Failed", "Job Skipped"}
+
+
+class MetaReportJobError(RuntimeError):
+    """Raised when Meta reports an async job as failed or it never completes."""
+
+
+class AsyncReportJob(BaseModel):
+    account_id: str
+    level: str = "campaign"
+    breakdowns: list[str] = Field(default_factory=list)
+    time_range: dict[str, str] = Field(default_factory=lambda: {"since": "2024-01-01", "until": "2024-01-07"})
+
+
+class AsyncReportResult(BaseModel):
+    job: AsyncReportJob
+    report_run_id: str | None = None
+    rows: list[dict[str, Any]] = Field(default_factory=list)
+    error: str | None = None
+
+
+class MetaAsyncReportClient:
+    """Submits insights jobs with ``async=true``, polls ``async_status`` and pages the results."""
+
+    def __init__(
+        self,
+        token: str | None = None,
+        base_url: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        max_concurrent_jobs: int | None = None,
+        poll_initial_seconds: float = 1.0,
+        poll_max_seconds: float = 30.0,
+        job_timeout_seconds: float | None = None,
+        page_size: int = 500,
+        governor: MetaQuotaGovernor | None = None,
+    ) -> None:
+        self.token = token or settings.meta_ads_token
+        self.base_url = (base_url or settings.meta_graph_url or MetaAdsClient.BASE_URL).rstrip("/")
+        self._client = client
+        self.max_concurrent_jobs = max_concurrent_jobs or settings.meta_async_max_jobs
+        self.poll_initial_seconds = poll_initial_seconds
+        self.poll_max_seconds = poll_max_seconds
+        self.job_timeout_seconds = job_timeout_seconds or settings.meta_async_job_timeout_seconds
+        self.page_size = page_size
+        self.governor = governor or MetaQuotaGovernor()
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        return client_or_shared(self._client, "meta")
+
+    def _headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def submit(self, job: AsyncReportJob) -> str:
+        """Start an async report run and return its ``report_run_id``."""
+        data: dict[str, Any] = {
+            "level": job.level,
+            "fields": ",".join(LEVEL_ID_FIELDS.get(job.level, []) + INSIGHT_FIELDS),
+            "time_range": orjson.dumps(job.time_range).decode(),
+            "async": "true",
+        }
+        if job.breakdowns:
+            data["breakdowns"] = ",".join(job.breakdowns)
+
+        await self.governor.throttle(job.account_id)
+        resp = await self.session.post(
+            f"{self.base_url}/act_{job.account_id}/insights",
+            headers=self._headers(),
+            data=data,
+        )
+        self.governor.check_response(resp, job.account_id)
+        resp.raise_for_status()
+        return str(resp.json()["report_run_id"])
+
+    async def wait(self, report_run_id: str, account_id: str | None = None) -> None:
+        """Poll the report run with exponential backoff until it completes."""
+        delay = self.poll_initial_seconds
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.job_timeout_seconds
+
+        while True:
+            await self.governor.throttle(account_id)
+            resp = await self.session.get(
+                f"{self.base_url}/{report_run_id}",
+                headers=self._headers(),
+                params={"fields": "async_status,async_percent_completion"},
+            )
+            self.governor.check_response(resp, account_id)
+            resp.raise_for_status()
+            status = resp.json().get("async_status")
+            if status == "Job Completed":
+                return
+            if status in TERMINAL_FAILURES:
+                raise MetaReportJobError(f"Report run {report_run_id} ended with status {status!r}")
+            if loop.time() + delay > deadline:
+                raise MetaReportJobError(f"Report run {report_run_id} timed out in status {status!r}")
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.poll_max_seconds)
+
+    async def iter_results(
+        self, report_run_id: str, account_id: str | None = None
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yield result pages, following ``paging.next`` cursors."""
+        url: str | None = f"{self.base_url}/{report_run_id}/insights"
+        params: dict[str, Any] | None = {"limit": self.page_size}
+
+        while url:
+            await self.governor.throttle(account_id)
+            resp = await self.session.get(url, headers=self._headers(), params=params)
+            self.governor.check_response(resp, account_id)
+            resp.raise_for_status()
+            body = resp.json()
+            yield body.get("data", [])
+            url = body.get("paging", {}).get("next")
+            params = None  # the next URL already carries the cursor and limit
+
+    async def run(self, job: AsyncReportJob) -> AsyncReportResult:
+        """Submit, wait for and download a single job. Errors are captured on the result.
+
+        A throttled account is recorded as an error too: breakdowns are optional, so the
+        report goes ahead without them rather than waiting out the quota.
+        """
+        result = AsyncReportResult(job=job)
+        try:
+            result.report_run_id = await self.submit(job)
+            await self.wait(result.report_run_id, job.account_id)
+            async for page in self.iter_results(result.report_run_id, job.account_id):
+                result.rows.extend(page)
+        except (httpx.HTTPError, MetaReportJobError, MetaThrottled, KeyError) as exc:
+            logger.warning(
+                "meta_async.job_failed",
+                account_id=job.account_id,
+                level=job.level,
+                report_run_id=result.report_run_id,
+                error=str(exc),
+            )
+            result.error = str(exc)
+        return result
+
+    async def run_many(self, jobs: list[AsyncReportJob]) -> AsyncIterator[AsyncReportResult]:
+        """Multiplex many jobs concurrently and yield each result as soon as it finishes."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_jobs)
+
+        async def bounded(job: AsyncReportJob) -> AsyncReportResult:
+            async with semaphore:
+                return await self.run(job)
+
+        for finished in asyncio.as_completed([bounded(job) for job in jobs]):
+            yield await finished
+
+    async def fetch_breakdowns(
+        self, account_ids: list[str], levels: list[str]
+    ) -> dict[str, dict[str, list[dict[str, Any]]]]:
+        """Collect rows for every (account, level) pair, keyed by account then level."""
+        jobs = [AsyncReportJob(account_id=account_id, level=level) for account_id in account_ids for level in levels]
+        breakdowns: dict[str, dict[str, list[dict[str, Any]]]] = {account_id: {} for account_id in account_ids}
+        async for result in self.run_many(jobs):
+            if result.error is None:
+                breakdowns[result.job.account_id][result.job.level] = result.rows
+        return breakdowns
+
@@ -1,63 +1,213 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from typing import Any
+from urllib.parse import urlencode
 
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.config import get_settings
+from app.services.http_clients import client_or_shared
+from app.services.meta_quota import THROTTLE_ERROR_CODES, MetaQuotaGovernor, MetaThrottled
 
 settings = get_settings()
 
+OVERVIEW_FIELDS = [
+    "spend",
+    "impressions",
+    "clicks",
+    "actions",
+    "cpc",
+    "cpm",
+    "ctr",
+    "purchase_roas",
+]
+OVERVIEW_TIME_RANGE = {"since": "2024-01-01", "until": "2024-01-07"}
+
+# Graph API batch limits and sub-request errors worth retrying. Rate-limit codes are
+# not retried here; they are handed to the quota governor and the account is deferred.
+MAX_BATCH_SIZE = 50
+RETRYABLE_STATUS = {500, 502, 503, 504}
+RETRYABLE_ERROR_CODES = {1, 2}
+
 
 class MetaAdsClient:
     BASE_URL = "https://graph.facebook.com/v18.0"
 
-    def __init__(self, token: str | None = None) -> None:
+    def __init__(
+        self,
+        token: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        governor: MetaQuotaGovernor | None = None,
+    ) -> None:
         self.token = token or settings.meta_ads_token
-        self.session = httpx.Client(timeout=30)
+        self.base_url = (settings.meta_graph_url or self.BASE_URL).rstrip("/")
+        self._client = client
+        self.governor = governor or MetaQuotaGovernor()
+
+    @property
+    def session(self) -> httpx.AsyncClient:
+        return client_or_shared(self._client, "meta")
 
     def _headers(self) -> dict[str, str]:
         return {"Authorization": f"Bearer {self.token}"}
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    def fetch_account_overview(self, account_id: str) -> dict[str, Any]:
-        """Call Meta Ads insights API. Placeholder returns mock structure when offline."""
+    def _overview_params(self) -> dict[str, str]:
+        return {
+            "fields": ",".join(OVERVIEW_FIELDS),
+            "time_range": json.dumps(OVERVIEW_TIME_RANGE),
+        }
+
+    @staticmethod
+    def _fallback_overview() -> dict[str, Any]:
+        # Provide deterministic fallback for local development/testing.
+        return {
+            "spend": 12500,
+            "impressions": 1_500_000,
+            "clicks": 120_000,
+            "ctr": 0.08,
+            "cpc": 0.45,
+            "cpm": 8.2,
+            "purchase_roas": 4.5,
+        }
+
+    @staticmethod
+    def _first_row(data: dict[str, Any]) -> dict[str, Any]:
+        if "data" in data:
+            return data["data"][0]
+        return data
+
+    async def fetch_account_overview(self, account_id: str) -> dict[str, Any]:
+        """Call Meta Ads insights API. Placeholder returns mock structure when offline.
+
+        Raises ``MetaThrottled`` when the shared quota says to defer this account.
+        """
+        await self.governor.throttle(account_id)
         try:
-            params = {
-                "fields": ",".join(
-                    [
-                        "spend",
-                        "impressions",
-                        "clicks",
-                        "actions",
-                        "cpc",
-                        "cpm",
-                        "ctr",
-                        "purchase_roas",
-                    ]
-                ),
-                "time_range": {"since": "2024-01-01", "until": "2024-01-07"},
-            }
-            resp = self.session.get(
-                f"{self.BASE_URL}/act_{account_id}/insights",
+            resp = await self.session.get(
+                f"{self.base_url}/act_{account_id}/insights",
                 headers=self._headers(),
-                params=params,
+                params=self._overview_params(),
             )
+            self.governor.check_response(resp, account_id)
             resp.raise_for_status()
-            data = resp.json()
-            if "data" in data:
-                return data["data"][0]
-            return data
+            return self._first_row(resp.json())
+        except MetaThrottled:
+            raise
         except Exception:
-            # Provide deterministic fallback for local development/testing.
-            return {
-                "spend": 12500,
-                "impressions": 1_500_000,
-                "clicks": 120_000,
-                "ctr": 0.08,
-                "cpc": 0.45,
-                "cpm": 8.2,
-                "purchase_roas": 4.5,
-            }
+            return self._fallback_overview()
+
+    async def fetch_account_overviews(self, account_ids: list[str], max_attempts: int = 3) -> dict[str, dict[str, Any]]:
+        """Fetch overviews for many accounts through the Graph API batch endpoint.
+
+        Requests are grouped into batches of up to 50 sub-requests. Only sub-requests that
+        failed with a transient error are retried; accounts that still fail get the same
+        deterministic fallback as ``fetch_account_overview``.
+
+        Accounts that hit a rate limit are not retried. If any remain, ``MetaThrottled``
+        is raised carrying those account IDs and the overviews that did arrive.
+        """
+        account_ids = list(dict.fromkeys(account_ids))
+        overviews: dict[str, dict[str, Any]] = {}
+        throttled: dict[str, int] = {}
+        pending = account_ids
+        query = urlencode(self._overview_params())
+
+        for attempt in range(max_attempts):
+            if attempt:
+                await asyncio.sleep(min(2 ** attempt, 10))
+
+            retry_ids: list[str] = []
+            for start in range(0, len(pending), MAX_BATCH_SIZE):
+                chunk = pending[start:start + MAX_BATCH_SIZE]
+                try:
+                    await self.governor.throttle()
+                    responses = await self._post_batch(
+                        [f"act_{account_id}/insights?{query}" for account_id in chunk]
+                    )
+                except MetaThrottled as exc:
+                    # App-wide limit: nothing else in this call can go through.
+                    exc.account_ids = [a for a in account_ids if a not in overviews]
+                    exc.partial = overviews
+                    raise
+                except (httpx.HTTPError, ValueError):
+                    # Transport errors and non-JSON bodies: retry the whole chunk.
+                    retry_ids.extend(chunk)
+                    continue
+
+                for account_id, response in zip(chunk, responses):
+                    if (code := self._throttle_code(response)) is not None:
+                        throttled[account_id] = code
+                        continue
+                    outcome = self._parse_sub_response(response)
+                    if outcome is None:
+                        retry_ids.append(account_id)
+                    else:
+                        overviews[account_id] = outcome
+
+            pending = retry_ids
+            if not pending:
+                break
+
+        for account_id in pending:
+            overviews[account_id] = self._fallback_overview()
+        if throttled:
+            retry_after = 0.0
+            for account_id, code in throttled.items():
+                try:
+                    self.governor.throttled(code, account_id)
+                except MetaThrottled as exc:
+                    retry_after = max(retry_after, exc.retry_after)
+            raise MetaThrottled(
+                retry_after,
+                scope="account",
+                account_ids=list(throttled),
+                partial={a: overviews[a] for a in account_ids if a in overviews},
+            )
+        return {account_id: overviews[account_id] for account_id in account_ids}
+
+    async def _post_batch(self, relative_urls: list[str]) -> list[dict[str, Any] | None]:
+        batch = [{"method": "GET", "relative_url": url} for url in relative_urls]
+        resp = await self.session.post(
+            f"{self.base_url}/",
+            headers=self._headers(),
+            data={"batch": json.dumps(batch), "include_headers": "false"},
+        )
+        self.governor.check_response(resp)
+        resp.raise_for_status()
+        return resp.json()
+
+    @staticmethod
+    def _throttle_code(response: dict[str, Any] | None) -> int | None:
+        """The rate-limit error code of a sub-response, if it was throttled."""
+        if not response or response.get("code") == 200:
+            return None
+        try:
+            code = json.loads(response.get("body") or "{}").get("error", {}).get("code")
+        except ValueError:
+            return None
+        return code if code in THROTTLE_ERROR_CODES else None
+
+    def _parse_sub_response(self, response: dict[str, Any] | None) -> dict[str, Any] | None:
+        """Return the overview for a sub-response, or None if it should be retried.
+
+        Meta returns ``null`` for sub-requests it did not get to before timing out.
+        """
+        if response is None:
+            return None
+        try:
+            body = json.loads(response.get("body") or "{}")
+        except ValueError:
+            body = {}
 
+        code = response.get("code", 500)
+        if code == 200:
+            try:
+                return self._first_row(body)
+            except (IndexError, KeyError):
+                return self._fallback_overview()
+        error_code = body.get("error", {}).get("code")
+        if code in RETRYABLE_STATUS or error_code in RETRYABLE_ERROR_CODES:
+            return None
+        return self._fallback_overview()
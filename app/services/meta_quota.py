@@ -0,0 +1,220 @@
+"""Meta Graph API quota governor shared by every worker through Redis.
+
+Meta reports rate-limit consumption in response headers as percentages of the
+current window:
+
+- ``x-app-usage``: app-wide ``call_count`` / ``total_time`` / ``total_cputime``
+- ``x-business-use-case-usage``: per business and use case, with
+  ``estimated_time_to_regain_access`` (minutes) once throttled
+- ``x-ad-account-usage``: ``acc_id_util_pct`` and ``reset_time_duration`` (seconds)
+
+Every response updates the shared readings. Before each request, workers pace
+themselves once usage passes the soft threshold. Above the hard threshold, or while
+a scope is blocked, they defer: short waits are slept inline, and longer ones raise
+``MetaThrottled`` so the Celery task can be rescheduled instead of retrying.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Mapping
+from typing import Any
+
+import orjson
+import redis
+import structlog
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+# Graph API error codes that mean "rate limited" rather than "bad request".
+THROTTLE_ERROR_CODES = {4, 17, 32, 613, *range(80000, 80015)}
+
+
+class MetaThrottled(Exception):
+    """Raised instead of calling Meta while a quota is exhausted."""
+
+    def __init__(
+        self,
+        retry_after: float,
+        scope: str = "app",
+        account_ids: list[str] | None = None,
+        partial: dict[str, Any] | None = None,
+    ) -> None:
+        super().__init__(f"Meta quota exhausted for {scope}; retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+        self.scope = scope
+        # For batch calls: the accounts that were throttled and the results that did arrive.
+        self.account_ids = account_ids or []
+        self.partial = partial or {}
+
+
+def _json_header(headers: Mapping[str, str], name: str) -> Any:
+    value = headers.get(name)
+    if not value:
+        return None
+    try:
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        return None
+
+
+def _pct(values: dict[str, Any], *keys: str) -> float:
+    return max((float(values.get(key) or 0) for key in keys), default=0.0)
+
+
+def parse_usage_headers(headers: Mapping[str, str], account_id: str | None = None) -> dict[str, tuple[float, float]]:
+    """Return ``{scope: (usage_pct, regain_seconds)}`` for every usage header present.
+
+    Business use-case usage is also attributed to the ad account the request was for,
+    since that is the scope the next request will be checked against.
+    """
+    readings: dict[str, tuple[float, float]] = {}
+
+    app_usage = _json_header(headers, "x-app-usage")
+    if isinstance(app_usage, dict):
+        readings["app"] = (_pct(app_usage, "call_count", "total_time", "total_cputime"), 0.0)
+
+    business_usage = _json_header(headers, "x-business-use-case-usage")
+    if isinstance(business_usage, dict):
+        for business_id, entries in business_usage.items():
+            pct, regain = 0.0, 0.0
+            for entry in entries if isinstance(entries, list) else []:
+                pct = max(pct, _pct(entry, "call_count", "total_time", "total_cputime"))
+                regain = max(regain, float(entry.get("estimated_time_to_regain_access") or 0) * 60)
+            readings[f"business:{business_id}"] = (pct, regain)
+            if account_id:
+                previous = readings.get(f"account:{account_id}", (0.0, 0.0))
+                readings[f"account:{account_id}"] = (max(previous[0], pct), max(previous[1], regain))
+
+    account_usage = _json_header(headers, "x-ad-account-usage")
+    if isinstance(account_usage, dict) and account_id:
+        pct = float(account_usage.get("acc_id_util_pct") or 0)
+        regain = float(account_usage.get("reset_time_duration") or 0) if pct >= 100 else 0.0
+        previous = readings.get(f"account:{account_id}", (0.0, 0.0))
+        readings[f"account:{account_id}"] = (max(previous[0], pct), max(previous[1], regain))
+
+    return readings
+
+
+class MetaQuotaGovernor:
+    KEY_PREFIX = "meta_quota"
+
+    def __init__(
+        self,
+        client: redis.Redis | None = None,
+        soft_pct: float | None = None,
+        hard_pct: float | None = None,
+    ) -> None:
+        self._client = client
+        self.soft_pct = soft_pct if soft_pct is not None else settings.meta_quota_soft_pct
+        self.hard_pct = hard_pct if hard_pct is not None else settings.meta_quota_hard_pct
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        return self._client
+
+    def key(self, scope: str) -> str:
+        return f"{self.KEY_PREFIX}:{scope}"
+
+    def record(self, headers: Mapping[str, str], account_id: str | None = None) -> None:
+        """Store the usage readings from one response."""
+        readings = parse_usage_headers(headers, account_id)
+        if not readings:
+            return
+        now = time.time()
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for scope, (pct, regain) in readings.items():
+                key = self.key(scope)
+                pipe.hset(key, mapping={"usage_pct": pct, "updated_at": now})
+                if regain > 0:
+                    pipe.hset(key, "blocked_until", now + regain)
+                # Readings describe a rolling window; stale ones must not block forever.
+                pipe.expire(key, int(max(regain, settings.meta_quota_window_seconds)))
+            pipe.execute()
+        except redis.RedisError as exc:
+            logger.warning("meta_quota.record_failed", error=str(exc))
+            return
+        for scope, (pct, regain) in readings.items():
+            if pct >= self.soft_pct or regain:
+                logger.info("meta_quota.high_usage", scope=scope, usage_pct=pct, regain_seconds=regain)
+
+    def block(self, scope: str, seconds: float) -> None:
+        """Mark a scope as throttled for every worker, e.g. after a rate-limit error code."""
+        try:
+            key = self.key(scope)
+            now = time.time()
+            self.client.hset(key, mapping={"blocked_until": now + seconds, "usage_pct": 100, "updated_at": now})
+            self.client.expire(key, int(max(seconds, 1)))
+        except redis.RedisError as exc:
+            logger.warning("meta_quota.block_failed", scope=scope, error=str(exc))
+
+    def delay_for(self, account_id: str | None = None) -> tuple[float, str]:
+        """Seconds to hold off before the next request, and the scope that requires it."""
+        scopes = ["app"] + ([f"account:{account_id}"] if account_id else [])
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for scope in scopes:
+                pipe.hgetall(self.key(scope))
+            states = pipe.execute()
+        except redis.RedisError as exc:
+            # Fail open: an unavailable governor must not stop refreshes.
+            logger.warning("meta_quota.read_failed", error=str(exc))
+            return 0.0, "app"
+
+        now = time.time()
+        delay, limiting = 0.0, "app"
+        for scope, state in zip(scopes, states):
+            if not state:
+                continue
+            pct = float(state.get("usage_pct", 0))
+            blocked_until = float(state.get("blocked_until", 0))
+            updated_at = float(state.get("updated_at", now))
+            if blocked_until > now:
+                wait = blocked_until - now
+            elif pct >= self.hard_pct:
+                # Hold off for a cooldown after the reading, then let a request through to refresh it.
+                wait = max(updated_at + settings.meta_quota_cooldown_seconds - now, 0.0)
+            elif pct >= self.soft_pct:
+                # Spread requests out more the closer usage gets to the hard limit.
+                wait = settings.meta_quota_pace_seconds * (pct - self.soft_pct) / (self.hard_pct - self.soft_pct)
+            else:
+                wait = 0.0
+            if wait > delay:
+                delay, limiting = wait, scope
+        return delay, limiting
+
+    async def throttle(self, account_id: str | None = None) -> None:
+        """Pace or defer one request. Raises ``MetaThrottled`` when the wait is too long to sleep."""
+        delay, scope = self.delay_for(account_id)
+        if delay <= 0:
+            return
+        if delay > settings.meta_quota_max_inline_wait_seconds:
+            raise MetaThrottled(delay, scope=scope, account_ids=[account_id] if account_id else None)
+        await asyncio.sleep(delay)
+
+    def check_response(self, response: Any, account_id: str | None = None) -> None:
+        """Record usage headers and convert a rate-limit error into ``MetaThrottled``."""
+        self.record(response.headers, account_id)
+        if response.status_code not in (400, 403, 429):
+            return
+        try:
+            code = response.json().get("error", {}).get("code")
+        except ValueError:
+            return
+        if code in THROTTLE_ERROR_CODES:
+            self.throttled(code, account_id)
+
+    def throttled(self, error_code: int | None, account_id: str | None = None) -> None:
+        """Block the scope an error code refers to and raise ``MetaThrottled``."""
+        scope = "app" if error_code in (4, 17, 32) or not account_id else f"account:{account_id}"
+        delay, _ = self.delay_for(account_id)
+        # Prefer Meta's own regain estimate (just recorded from the headers) over the default.
+        retry_after = delay if delay > 0 else settings.meta_quota_cooldown_seconds
+        self.block(scope, retry_after)
+        raise MetaThrottled(retry_after, scope=scope, account_ids=[account_id] if account_id else None)
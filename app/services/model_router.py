@@ -0,0 +1,201 @@
+"""Per-call provider/model routing from task, prompt size, observed latency/errors and tenant budgets."""
+from __future__ import annotations
+
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import structlog
+from pydantic import BaseModel, Field
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import get_settings
+from app.services.ai_providers import AIProviderFactory
+from app.services.usage_service import UsageService
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+DIAGNOSTIC_TASKS = ["competitor_identification", "traffic_analysis", "meta_ads_diagnostic", "insight"]
+SUMMARY_TASKS = ["strategic_recommendations", "executive_summary"]
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Rough token count (~4 characters per token); good enough for routing thresholds."""
+    return len(prompt) // 4 + 1
+
+
+class RoutingRule(BaseModel):
+    """A candidate route; rules are tried in order and the first healthy match wins."""
+    name: str
+    provider: str
+    model: str
+    tasks: list[str] = Field(default_factory=list, description="Empty matches every task")
+    min_prompt_tokens: int = 0
+    max_prompt_tokens: int | None = None
+    tier: str = Field(default="standard", description="fast, standard or heavy; heavy routes are skipped over budget")
+    max_latency_ms: float | None = Field(default=None, description="Skip while the recent average latency exceeds this")
+
+    def matches(self, task: str, prompt_tokens: int) -> bool:
+        if self.tasks and task not in self.tasks:
+            return False
+        if prompt_tokens < self.min_prompt_tokens:
+            return False
+        return self.max_prompt_tokens is None or prompt_tokens <= self.max_prompt_tokens
+
+
+DEFAULT_ROUTING_RULES = [
+    RoutingRule(name="long-context", provider="gemini", model="gemini-1.5-pro", min_prompt_tokens=100_000, tier="heavy"),
+    RoutingRule(
+        name="fast-diagnostics",
+        provider="gemini",
+        model="gemini-1.5-flash",
+        tasks=DIAGNOSTIC_TASKS,
+        max_prompt_tokens=8_000,
+        tier="fast",
+        max_latency_ms=5_000,
+    ),
+    RoutingRule(
+        name="fast-diagnostics-claude",
+        provider="claude",
+        model="claude-3-5-haiku-20241022",
+        tasks=DIAGNOSTIC_TASKS,
+        max_prompt_tokens=8_000,
+        tier="fast",
+        max_latency_ms=5_000,
+    ),
+    RoutingRule(name="heavy-summaries", provider="claude", model=settings.claude_model, tasks=SUMMARY_TASKS, tier="heavy"),
+]
+
+
+class RoutingDecision(BaseModel):
+    provider: str
+    model: str | None = None
+    rule: str | None = Field(default=None, description="Matching rule, or None when the default route is used")
+    prompt_tokens: int
+    applied: bool = True
+    would_choose: dict[str, Any] | None = Field(default=None, description="The routed choice when running in dry-run mode")
+    skipped: list[str] = Field(default_factory=list)
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        rules: list[RoutingRule] | None = None,
+        usage_service: UsageService | None = None,
+        budgets: dict[str, dict[str, float]] | None = None,
+        dry_run: bool | None = None,
+    ) -> None:
+        if rules is None:
+            rules = [RoutingRule(**rule) for rule in settings.model_routing_rules] or DEFAULT_ROUTING_RULES
+        self.rules = rules
+        self.usage_service = usage_service or UsageService()
+        self.budgets = budgets if budgets is not None else settings.llm_tenant_budgets
+        self.dry_run = settings.model_routing_dry_run if dry_run is None else dry_run
+        self.max_error_rate = settings.model_routing_max_error_rate
+        self._cache: dict[str, tuple[float, Any]] = {}
+
+    def _cached(self, key: str, load) -> Any:  # type: ignore[no-untyped-def]
+        now = time.monotonic()
+        hit = self._cache.get(key)
+        if hit and now - hit[0] < settings.model_routing_stats_ttl_seconds:
+            return hit[1]
+        try:
+            value = load()
+        except SQLAlchemyError as exc:
+            logger.warning("routing.stats_unavailable", key=key, error=str(exc))
+            value = {}
+        self._cache[key] = (now, value)
+        return value
+
+    def _route_stats(self) -> dict[tuple[str, str], dict[str, Any]]:
+        """Recent calls/errors/latency per (provider, model) from the hourly usage table."""
+
+        def load() -> dict[tuple[str, str], dict[str, Any]]:
+            since = datetime.now(UTC) - timedelta(minutes=settings.model_routing_stats_window_minutes)
+            with self.usage_service.session_factory() as db:
+                rows = self.usage_service.query(db, group_by=["provider", "model"], since=since.replace(minute=0, second=0, microsecond=0))
+            return {(row["provider"], row["model"]): row for row in rows}
+
+        return self._cached("routes", load)
+
+    def _tokens_this_hour(self, account_id: str) -> int:
+        def load() -> int:
+            since = datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+            with self.usage_service.session_factory() as db:
+                rows = self.usage_service.query(db, group_by=[], since=since, account_id=account_id)
+            return sum(row["input_tokens"] + row["output_tokens"] for row in rows)
+
+        return self._cached(f"tokens:{account_id}", load) or 0
+
+    def _choose(
+        self, task: str, prompt_tokens: int, account_id: str | None
+    ) -> tuple[RoutingRule | None, list[str]]:
+        budget = self.budgets.get(account_id or "", {})
+        token_budget = budget.get("max_tokens_per_hour")
+        over_budget = bool(token_budget and self._tokens_this_hour(account_id or "") >= token_budget)
+        available = set(AIProviderFactory.list_available_providers())
+        stats = self._route_stats()
+
+        skipped = []
+        for rule in self.rules:
+            if not rule.matches(task, prompt_tokens):
+                continue
+            if rule.provider not in available:
+                skipped.append(f"{rule.name}: provider unavailable")
+                continue
+            if over_budget and rule.tier == "heavy":
+                skipped.append(f"{rule.name}: tenant over token budget")
+                continue
+            recent = stats.get((rule.provider, rule.model))
+            if recent:
+                if recent["errors"] / recent["calls"] > self.max_error_rate:
+                    skipped.append(f"{rule.name}: error rate {recent['errors']}/{recent['calls']}")
+                    continue
+                limits = [limit for limit in (rule.max_latency_ms, budget.get("max_latency_ms")) if limit]
+                if limits and recent["avg_latency_ms"] > min(limits):
+                    skipped.append(f"{rule.name}: avg latency {recent['avg_latency_ms']}ms")
+                    continue
+            return rule, skipped
+        return None, skipped
+
+    def route(
+        self,
+        task: str,
+        prompt: str,
+        default_provider: str,
+        account_id: str | None = None,
+        prompt_tokens: int | None = None,
+        preview: bool = False,
+    ) -> RoutingDecision:
+        """Pick a provider and model for one call.
+
+        Falls back to ``default_provider`` (with its default model) when no rule matches.
+        In dry-run mode the default is used and the routed choice is only reported; with
+        ``preview`` the routed choice is returned regardless.
+        """
+        prompt_tokens = prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt)
+        rule, skipped = self._choose(task, prompt_tokens, account_id)
+        decision = RoutingDecision(
+            provider=rule.provider if rule else default_provider,
+            model=rule.model if rule else None,
+            rule=rule.name if rule else None,
+            prompt_tokens=prompt_tokens,
+            skipped=skipped,
+        )
+        if self.dry_run and not preview:
+            logger.info(
+                "routing.dry_run",
+                task=task,
+                account_id=account_id,
+                would_choose=decision.model_dump(include={"provider", "model", "rule"}),
+                default_provider=default_provider,
+            )
+            return RoutingDecision(
+                provider=default_provider,
+                prompt_tokens=prompt_tokens,
+                applied=False,
+                would_choose=decision.model_dump(include={"provider", "model", "rule"}),
+                skipped=skipped,
+            )
+        return decision
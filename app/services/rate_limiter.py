@@ -0,0 +1,91 @@
+"""Per-tenant token buckets in Redis for endpoints that fan out to LLMs and paid upstreams."""
+from __future__ import annotations
+
+import math
+import time
+from typing import cast
+
+import redis
+import structlog
+from pydantic import BaseModel, Field
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+
+class BucketLimit(BaseModel):
+    capacity: float = Field(gt=0)
+    per_minute: float = Field(gt=0)
+
+    @property
+    def rate(self) -> float:
+        return self.per_minute / 60
+
+
+class RateDecision(BaseModel):
+    allowed: bool
+    remaining: float
+    retry_after: float = 0.0
+
+
+class TokenBucketLimiter:
+    KEY_PREFIX = "ratelimit"
+
+    def __init__(self, client: redis.Redis | None = None) -> None:
+        self._client = client
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+        return self._client
+
+    @staticmethod
+    def limit_for(tenant: str, bucket: str) -> BucketLimit | None:
+        override = settings.rate_limit_overrides.get(tenant, {}).get(bucket)
+        limit = override or settings.rate_limits.get(bucket)
+        return BucketLimit(**limit) if limit else None
+
+    def take(self, tenant: str, bucket: str, cost: float = 1.0) -> RateDecision:
+        """Refill the bucket for the time elapsed, then try to spend ``cost`` tokens.
+
+        The read-refill-write runs in a WATCH/MULTI transaction, so concurrent API
+        processes never spend the same tokens twice. Unconfigured buckets and Redis
+        outages allow the request.
+        """
+        limit = self.limit_for(tenant, bucket)
+        if limit is None:
+            return RateDecision(allowed=True, remaining=math.inf)
+        # A request larger than the whole bucket (a big traffic batch) drains it rather than never fitting.
+        cost = min(cost, limit.capacity)
+        key = f"{self.KEY_PREFIX}:{bucket}:{tenant}"
+        decision: list[RateDecision] = []
+
+        def spend(pipe: redis.client.Pipeline) -> None:
+            decision.clear()
+            # Before multi() a WATCHing pipeline runs commands immediately and returns their results.
+            stored_tokens, stored_at = cast(list[str | None], pipe.hmget(key, "tokens", "ts"))
+            now = time.time()
+            tokens = limit.capacity
+            if stored_tokens is not None:
+                tokens = min(limit.capacity, float(stored_tokens) + (now - float(stored_at or now)) * limit.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            pipe.multi()
+            pipe.hset(key, mapping={"tokens": tokens, "ts": now})
+            # An idle bucket is full again after capacity / rate seconds; drop it then.
+            pipe.expire(key, math.ceil(limit.capacity / limit.rate) + 1)
+            retry_after = 0.0 if allowed else (cost - tokens) / limit.rate
+            decision.append(RateDecision(allowed=allowed, remaining=tokens, retry_after=retry_after))
+
+        try:
+            self.client.transaction(spend, key)
+        except redis.RedisError as exc:
+            logger.warning("ratelimit.unavailable", bucket=bucket, tenant=tenant, error=str(exc))
+            return RateDecision(allowed=True, remaining=math.inf)
+        if not decision[0].allowed:
+            logger.info("ratelimit.rejected", bucket=bucket, tenant=tenant, retry_after=decision[0].retry_after)
+        return decision[0]
@@ -0,0 +1,123 @@
+"""Streaming export of historical report runs."""
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any
+
+import orjson
+from sqlmodel import col, select
+
+from app.db import get_session
+from app.models.report import ReportRun
+
+EXPORT_COLUMNS = (
+    "id",
+    "account_id",
+    "timeframe",
+    "meta_payload",
+    "competitor_payload",
+    "insight_text",
+    "insight_metadata",
+    "insight_structured",
+    "artifacts_path",
+    "archive_path",
+    "created_at",
+)
+JSON_COLUMNS = {"meta_payload", "competitor_payload", "insight_metadata", "insight_structured"}
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class ReportExportService:
+    """Streams ReportRun rows through a server-side cursor with keyset pagination."""
+
+    def __init__(self, yield_per: int = 500) -> None:
+        self.yield_per = yield_per
+
+    def resolve_columns(self, fields: str | None) -> list[str]:
+        """Parse a comma-separated projection; ``id`` is always included as the keyset cursor."""
+        if not fields:
+            return list(EXPORT_COLUMNS)
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in EXPORT_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {unknown}. Valid fields: {list(EXPORT_COLUMNS)}")
+        return ["id", *[field for field in dict.fromkeys(requested) if field != "id"]]
+
+    def iter_rows(
+        self,
+        *,
+        columns: list[str],
+        account_ids: list[str] | None = None,
+        after_id: int | None = None,
+        before_id: int | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        descending: bool = False,
+        limit: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield rows as dicts. Only the projected columns are read from the database."""
+        statement = select(*[getattr(ReportRun, column) for column in columns])
+        run_id = col(ReportRun.id)
+        if account_ids:
+            statement = statement.where(col(ReportRun.account_id).in_(account_ids))
+        if after_id is not None:
+            statement = statement.where(run_id > after_id)
+        if before_id is not None:
+            statement = statement.where(run_id < before_id)
+        if since is not None:
+            statement = statement.where(col(ReportRun.created_at) >= since)
+        if until is not None:
+            statement = statement.where(col(ReportRun.created_at) < until)
+        statement = statement.order_by(run_id.desc() if descending else run_id.asc())
+        if limit is not None:
+            statement = statement.limit(limit)
+
+        # The session is owned by the generator so it outlives the request handler
+        # and is released only once the response body has been fully streamed.
+        with get_session() as session:
+            result = session.execute(statement.execution_options(yield_per=self.yield_per))
+            for row in result:
+                yield dict(zip(columns, row))
+
+    def stream(self, rows: Iterator[dict[str, Any]], columns: list[str], fmt: str) -> Iterator[bytes]:
+        if fmt == "ndjson":
+            return self._stream_ndjson(rows)
+        if fmt == "csv":
+            return self._stream_csv(rows, columns)
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    def _stream_ndjson(self, rows: Iterator[dict[str, Any]]) -> Iterator[bytes]:
+        chunk: list[bytes] = []
+        for row in rows:
+            chunk.append(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NAIVE_UTC))
+            if len(chunk) >= self.yield_per:
+                yield b"".join(chunk)
+                chunk = []
+        if chunk:
+            yield b"".join(chunk)
+
+    def _stream_csv(self, rows: Iterator[dict[str, Any]], columns: list[str]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for count, row in enumerate(rows, start=1):
+            writer.writerow([self._csv_value(column, row[column]) for column in columns])
+            if count % self.yield_per == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    @staticmethod
+    def _csv_value(column: str, value: Any) -> Any:
+        if value is None:
+            return ""
+        if column in JSON_COLUMNS:
+            return orjson.dumps(value).decode()
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
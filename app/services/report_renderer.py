@@ -0,0 +1,175 @@
+"""HTML/PDF rendering of stored reports, run in a bounded process pool.
+
+Rendering (and PDF layout in particular) is CPU-bound, so it never runs on the API
+event loop or in refresh workers. Artifacts are rendered on first download, written
+next to the markdown artifacts and served from disk afterwards; report runs are
+immutable, so a rendered file never goes stale. Archived runs have no payloads left
+to render and are refused rather than rendered blank.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import structlog
+from jinja2 import Environment
+
+from app.config import get_settings
+from app.models.report import ReportRun
+from app.services.insight_parser import parse_insight
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+RENDER_FORMATS = {"html": "text/html", "pdf": "application/pdf"}
+HEADLINE_KPIS = ("spend", "impressions", "clicks", "ctr", "cpc", "cpm", "purchase_roas")
+
+# Compiled once at import, i.e. once per pool process, not per render.
+REPORT_HTML_TEMPLATE = Environment(autoescape=True).from_string(
+    """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Growth report {{ account_id }} ({{ timeframe }})</title>
+<style>
+  body { font-family: Helvetica, Arial, sans-serif; color: #1f2933; margin: 2rem; }
+  h1 { font-size: 1.5rem; margin-bottom: 0.25rem; }
+  .meta { color: #616e7c; font-size: 0.85rem; }
+  table.kpis { border-collapse: collapse; margin: 1rem 0; }
+  table.kpis td, table.kpis th { border: 1px solid #cbd2d9; padding: 0.35rem 0.75rem; text-align: left; }
+  h2 { font-size: 1.1rem; margin-top: 1.5rem; border-bottom: 1px solid #e4e7eb; }
+</style>
+</head>
+<body>
+<h1>Growth report &middot; {{ account_id }}</h1>
+<p class="meta">{{ timeframe }} &middot; generated {{ created_at }} &middot; {{ provider }}</p>
+{% if kpis %}
+<table class="kpis">
+  <tr>{% for name in kpis %}<th>{{ name }}</th>{% endfor %}</tr>
+  <tr>{% for value in kpis.values() %}<td>{{ value }}</td>{% endfor %}</tr>
+</table>
+{% endif %}
+<h2>Summary</h2>
+{% for line in insight.summary.splitlines() %}<p>{{ line }}</p>{% endfor %}
+{% if insight.recommendations %}
+<h2>Recommendations</h2>
+<ul>{% for item in insight.recommendations %}<li>{{ item }}</li>{% endfor %}</ul>
+{% endif %}
+{% if insight.defensive_moves %}
+<h2>Defensive moves</h2>
+<ul>{% for item in insight.defensive_moves %}<li>{{ item }}</li>{% endfor %}</ul>
+{% endif %}
+{% if competitor %}
+<h2>Competitor snapshot</h2>
+<table class="kpis">{% for name, value in competitor.items() %}<tr><th>{{ name }}</th><td>{{ value }}</td></tr>{% endfor %}</table>
+{% endif %}
+</body>
+</html>
+"""
+)
+
+
+class RenderUnavailable(RuntimeError):
+    """Raised when a format's renderer (WeasyPrint for PDF) is not installed."""
+
+
+class ReportArchived(LookupError):
+    """Raised for runs whose payloads were moved to the Parquet archive."""
+
+
+def render_context(run: ReportRun) -> dict[str, Any]:
+    """Plain, picklable data for the template; only headline values, never raw payloads."""
+    meta = run.meta_payload or {}
+    return {
+        "account_id": run.account_id,
+        "timeframe": run.timeframe,
+        "created_at": run.created_at.isoformat(timespec="minutes"),
+        "provider": (run.insight_metadata or {}).get("provider", ""),
+        "kpis": {name: meta[name] for name in HEADLINE_KPIS if meta.get(name) is not None},
+        "competitor": {
+            name: value
+            for name, value in (run.competitor_payload or {}).items()
+            if isinstance(value, (str, int, float)) and not isinstance(value, bool)
+        },
+        "insight": run.insight_structured or parse_insight(run.insight_text).model_dump(),
+    }
+
+
+def render_artifact(context: dict[str, Any], fmt: str) -> bytes:
+    """Render one artifact. Module-level so it can be sent to a worker process."""
+    html = REPORT_HTML_TEMPLATE.render(**context)
+    if fmt == "html":
+        return html.encode()
+    if fmt == "pdf":
+        try:
+            from weasyprint import HTML  # type: ignore[import-untyped]
+        except (ImportError, OSError) as exc:  # OSError: missing system libraries (pango)
+            raise RenderUnavailable(f"PDF rendering unavailable: {exc}") from exc
+        return HTML(string=html).write_pdf()
+    raise ValueError(f"Unknown render format: {fmt}")
+
+
+class ReportRenderer:
+    def __init__(self, output_dir: str | Path | None = None, max_workers: int | None = None) -> None:
+        self.output_dir = Path(output_dir or Path(settings.report_bucket_path) / "rendered")
+        self.max_workers = max_workers or settings.render_pool_size
+        self._pool: ProcessPoolExecutor | None = None
+        # Bounds queued renders as well as running ones; further downloads wait here.
+        self._slots = asyncio.Semaphore(self.max_workers * 2)
+        self._inflight: dict[Path, asyncio.Future[Path]] = {}
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: the parent is an event loop with open sockets and threads.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def artifact_path(self, run: ReportRun, fmt: str) -> Path:
+        return self.output_dir / run.account_id / f"{run.id}.{fmt}"
+
+    async def get_or_render(self, run: ReportRun, fmt: str) -> Path:
+        """Return the cached artifact, rendering it in the process pool on first request."""
+        if fmt not in RENDER_FORMATS:
+            raise ValueError(f"Unknown render format: {fmt}")
+        if run.archive_path:
+            raise ReportArchived(f"Report {run.id} has been archived")
+        path = self.artifact_path(run, fmt)
+        if path.exists():
+            return path
+        # Concurrent downloads of the same artifact share one render.
+        if path in self._inflight:
+            return await asyncio.shield(self._inflight[path])
+
+        future: asyncio.Future[Path] = asyncio.get_running_loop().create_future()
+        self._inflight[path] = future
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                body = await loop.run_in_executor(self.pool, render_artifact, render_context(run), fmt)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)  # atomic, so other processes never serve a partial file
+            logger.info("render.completed", account_id=run.account_id, report_id=run.id, format=fmt, bytes=len(body))
+            future.set_result(path)
+            return path
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(path, None)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
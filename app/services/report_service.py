@@ -1,25 +1,80 @@
 from __future__ import annotations
 
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
 import pendulum
-from sqlmodel import Session
+import redis
+import structlog
+from sqlalchemy import func
+from sqlmodel import Session, col, select
 
 from app.config import get_settings
 from app.models.report import ReportRun
 from app.schemas.reports import InsightPayload, ReportSummary
 from app.services.cache_service import CacheService
 from app.services.competitor_client import CompetitorIntelClient
+from app.services.http_clients import run_sync
+from app.services.insight_parser import parse_insight
 from app.services.insight_service import InsightService
+from app.services.meta_async_reports import MetaAsyncReportClient
 from app.services.meta_client import MetaAdsClient
+from app.services.meta_quota import MetaQuotaGovernor
 
 settings = get_settings()
+logger = structlog.get_logger()
+
+# Always returned so a projected report can still be identified.
+REPORT_KEY_FIELDS = ("account_id", "created_at")
+
+
+def report_field_spec(fields: str | None) -> dict[str, Any] | None:
+    """Turn ``fields=insight,meta.spend,meta.purchase_roas`` into a ``model_dump`` include spec.
+
+    Top-level names must be ReportSummary fields; dotted paths select keys inside the
+    ``meta``/``competitor``/``insight`` sections. Returns None (everything) when empty.
+    """
+    if not fields:
+        return None
+    spec: dict[str, Any] = {field: True for field in REPORT_KEY_FIELDS}
+    for path in (item.strip() for item in fields.split(",")):
+        if not path:
+            continue
+        *parents, leaf = path.split(".")
+        head = parents[0] if parents else leaf
+        if head not in ReportSummary.model_fields:
+            raise ValueError(f"Unknown field {head!r}. Valid fields: {list(ReportSummary.model_fields)}")
+        node = spec
+        for part in parents:
+            node = node.setdefault(part, {})
+            if node is True:
+                break  # the whole section is already requested
+        else:
+            node[leaf] = True
+    return spec
+
+
+def _spend(row: dict[str, Any]) -> float:
+    try:
+        return float(row.get("spend") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def top_breakdown_rows(
+    breakdowns: dict[str, list[dict[str, Any]]], limit: int
+) -> dict[str, list[dict[str, Any]]]:
+    """Keep the ``limit`` highest-spend rows per level; ad-level rows grow with account size."""
+    return {level: sorted(rows, key=_spend, reverse=True)[:limit] for level, rows in breakdowns.items()}
 
 
 class ReportService:
     def __init__(self) -> None:
-        self.meta_client = MetaAdsClient()
+        # One governor (and Redis pool) paces both Meta clients against the same quota.
+        self.quota_governor = MetaQuotaGovernor()
+        self.meta_client = MetaAdsClient(governor=self.quota_governor)
+        self.async_reports = MetaAsyncReportClient(governor=self.quota_governor)
         self.competitor_client = CompetitorIntelClient()
         self.insight_service = InsightService()
         self.cache = CacheService()
@@ -30,11 +85,42 @@ class ReportService:
         current_hour = pendulum.now("UTC").format("YYYYMMDDHH")
         return f"report:{account_id}:{current_hour}"
 
-    def fetch_data(self, account_id: str, domain: str) -> tuple[dict[str, Any], dict[str, Any]]:
-        meta = self.meta_client.fetch_account_overview(account_id)
-        competitor = self.competitor_client.fetch_market_share(domain)
+    def fetch_data(
+        self,
+        account_id: str,
+        domain: str,
+        breakdowns: dict[str, list[dict[str, Any]]] | None = None,
+        meta: dict[str, Any] | None = None,
+        competitor: dict[str, Any] | None = None,
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        if meta is None:
+            meta = run_sync(self.meta_client.fetch_account_overview(account_id))
+        if breakdowns is None and self.breakdown_levels:
+            breakdowns = self.fetch_breakdowns([account_id])[account_id]
+        if breakdowns:
+            meta = {**meta, "breakdowns": top_breakdown_rows(breakdowns, settings.meta_breakdown_max_rows)}
+        if competitor is None:
+            competitor = self.fetch_competitors([domain])[domain]
         return meta, competitor
 
+    def fetch_overviews(self, account_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """Fetch account overviews through Graph API batch requests."""
+        return run_sync(self.meta_client.fetch_account_overviews(account_ids))
+
+    def fetch_competitors(self, domains: list[str]) -> dict[str, dict[str, Any]]:
+        """Fetch market share and traffic for every domain concurrently."""
+        return run_sync(self.competitor_client.fetch_market_share_many(domains))
+
+    @property
+    def breakdown_levels(self) -> list[str]:
+        return [level.strip() for level in settings.meta_breakdown_levels.split(",") if level.strip()]
+
+    def fetch_breakdowns(self, account_ids: list[str]) -> dict[str, dict[str, list[dict[str, Any]]]]:
+        """Run async insights jobs for every account and configured level concurrently."""
+        if not self.breakdown_levels:
+            return {account_id: {} for account_id in account_ids}
+        return run_sync(self.async_reports.fetch_breakdowns(account_ids, self.breakdown_levels))
+
     def generate_report(
         self,
         db: Session,
@@ -44,8 +130,30 @@ class ReportService:
         timeframe: str,
     ) -> ReportRun:
         meta, competitor = self.fetch_data(account_id, domain)
-        insight = self.insight_service.generate(meta, competitor)
+        insight = self.insight_service.generate(meta, competitor, account_id=account_id)
+        return self.save_report(
+            db,
+            account_id=account_id,
+            timeframe=timeframe,
+            meta=meta,
+            competitor=competitor,
+            insight=insight,
+        )
+
+    def save_report(
+        self,
+        db: Session,
+        *,
+        account_id: str,
+        timeframe: str,
+        meta: dict[str, Any],
+        competitor: dict[str, Any],
+        insight: dict[str, Any],
+        batch: dict[str, str] | None = None,
+    ) -> ReportRun:
         artifact_path = self.persist_artifact(account_id, insight["text"])
+        # Parsed once here so every read is a plain copy of the stored sections.
+        structured = parse_insight(insight["text"]).model_dump()
 
         run = ReportRun(
             account_id=account_id,
@@ -53,7 +161,13 @@ class ReportService:
             meta_payload=meta,
             competitor_payload=competitor,
             insight_text=insight["text"],
-            insight_metadata={"provider": insight["provider"]},
+            insight_structured=structured,
+            insight_metadata={
+                "provider": insight["provider"],
+                "model": insight.get("model"),
+                **({"usage": insight["usage"]} if insight.get("usage") else {}),
+                **({"batch": batch} if batch else {}),
+            },
             artifacts_path=artifact_path,
         )
         db.add(run)
@@ -68,24 +182,48 @@ class ReportService:
                 "timeframe": timeframe,
                 "meta": meta,
                 "competitor": competitor,
-                "insight": insight,
+                "insight": {**insight, "structured": structured},
                 "artifacts_path": artifact_path,
                 "created_at": run.created_at.isoformat(),
             },
         )
         return run
 
+    def saved_batch_entries(
+        self, db: Session, batch_id: str, account_ids: list[str], since: datetime
+    ) -> set[str]:
+        """``custom_id``s of a batch that already have a ReportRun, so re-collection skips them."""
+        statement = select(ReportRun.insight_metadata).where(
+            col(ReportRun.account_id).in_(account_ids),
+            col(ReportRun.created_at) >= since,
+        )
+        saved = set()
+        for metadata in db.exec(statement):
+            batch = (metadata or {}).get("batch") or {}
+            if batch.get("batch_id") == batch_id:
+                saved.add(batch["custom_id"])
+        return saved
+
     def persist_artifact(self, account_id: str, content: str) -> str:
         filename = self.bucket / f"{account_id}-{pendulum.now('UTC').int_timestamp}.md"
         filename.write_text(content)
         return str(filename)
 
+    @staticmethod
+    def _insight_payload(
+        structured: dict[str, Any] | None, text: str, anomalies: list[dict[str, Any]], provider: str
+    ) -> InsightPayload:
+        if not structured:
+            # Rows written before insights were stored parsed.
+            structured = parse_insight(text).model_dump()
+        return InsightPayload.model_construct(**structured, anomalies=anomalies, llm_provider=provider)
+
     def transform_run_to_summary(self, run: ReportRun) -> ReportSummary:
-        insight = InsightPayload(
-            summary=run.insight_text.split("\n\n")[0],
-            recommendations=run.insight_text.split("\n"),
+        insight = self._insight_payload(
+            run.insight_structured,
+            run.insight_text,
             anomalies=run.insight_metadata.get("anomalies", []),
-            llm_provider=run.insight_metadata.get("provider", "claude"),
+            provider=run.insight_metadata.get("provider", "claude"),
         )
         return ReportSummary(
             account_id=run.account_id,
@@ -97,3 +235,48 @@ class ReportService:
             created_at=run.created_at,
         )
 
+    def transform_snapshot_to_summary(self, snapshot: dict[str, Any]) -> ReportSummary:
+        insight = self._insight_payload(
+            snapshot["insight"].get("structured"),
+            snapshot["insight"]["text"],
+            anomalies=snapshot["insight"].get("anomalies", []),
+            provider=snapshot["insight"].get("provider", "claude"),
+        )
+        return ReportSummary(
+            account_id=snapshot["account_id"],
+            timeframe=snapshot["timeframe"],
+            meta=snapshot["meta"],
+            competitor=snapshot["competitor"],
+            insight=insight,
+            artifacts_path=snapshot.get("artifacts_path"),
+            created_at=datetime.fromisoformat(snapshot["created_at"]),
+        )
+
+    def get_latest_summaries(self, db: Session, account_ids: list[str]) -> dict[str, ReportSummary]:
+        """Latest report per account: one MGET for cached snapshots, one IN query for misses."""
+        account_ids = list(dict.fromkeys(account_ids))
+        summaries: dict[str, ReportSummary] = {}
+
+        try:
+            snapshots = self.cache.get_snapshots([self.build_cache_key(account_id) for account_id in account_ids])
+        except redis.RedisError as exc:
+            logger.warning("reports.batch_cache_unavailable", error=str(exc))
+            snapshots = [None] * len(account_ids)
+
+        misses = []
+        for account_id, snapshot in zip(account_ids, snapshots):
+            if snapshot is None:
+                misses.append(account_id)
+            else:
+                summaries[account_id] = self.transform_snapshot_to_summary(snapshot)
+
+        if misses:
+            latest_ids = (
+                select(func.max(ReportRun.id))
+                .where(col(ReportRun.account_id).in_(misses))
+                .group_by(ReportRun.account_id)
+            )
+            for run in db.exec(select(ReportRun).where(col(ReportRun.id).in_(latest_ids))):
+                summaries[run.account_id] = self.transform_run_to_summary(run)
+
+        return {account_id: summaries[account_id] for account_id in account_ids if account_id in summaries}
@@ -0,0 +1,221 @@
+"""Retention and rollup compaction for report_runs, alert_events and workflow_step_results."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import structlog
+from pydantic import BaseModel
+from sqlalchemy import delete, func, update
+from sqlmodel import Session, col, select
+
+from app.config import get_settings
+from app.models.report import AlertEvent, ReportDailySummary, ReportRun
+from app.models.workflow import WorkflowStepResult
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+
+class RetentionPolicy(BaseModel):
+    rollup_after_days: int = settings.retention_rollup_after_days
+    prune_after_days: int = settings.retention_prune_after_days
+    alert_retention_days: int = settings.alert_retention_days
+
+
+def _metric(payload: Mapping[str, Any], key: str) -> float | None:
+    try:
+        return float(payload[key])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _average(values: list[float | None]) -> float | None:
+    present = [value for value in values if value is not None]
+    return sum(present) / len(present) if present else None
+
+
+def _weighted(old: float | None, old_count: int, new: float | None, new_count: int) -> float | None:
+    if old is None or not old_count:
+        return new
+    if new is None or not new_count:
+        return old
+    return (old * old_count + new * new_count) / (old_count + new_count)
+
+
+class RetentionService:
+    """Applies per-account retention policies in small transactions so no lock is held for long."""
+
+    def __init__(
+        self,
+        policies: dict[str, dict[str, int]] | None = None,
+        batch_size: int | None = None,
+    ) -> None:
+        self.policies = policies if policies is not None else settings.retention_policies
+        self.batch_size = batch_size or settings.retention_batch_size
+
+    def policy_for(self, account_id: str) -> RetentionPolicy:
+        return RetentionPolicy(**self.policies.get(account_id, {}))
+
+    def compact(self, db: Session, now: datetime | None = None) -> dict[str, int]:
+        """Run every compaction step for every account and return row counts."""
+        now = now or datetime.now(UTC)
+        stats = {"rolled_up_days": 0, "deleted_runs": 0, "pruned_runs": 0, "deleted_alerts": 0, "deleted_steps": 0}
+
+        for account_id in db.exec(select(ReportRun.account_id).distinct()).all():
+            policy = self.policy_for(account_id)
+            days, deleted = self.rollup_runs(db, account_id, now - timedelta(days=policy.rollup_after_days))
+            stats["rolled_up_days"] += days
+            stats["deleted_runs"] += deleted
+            stats["pruned_runs"] += self.prune_redundant_insights(
+                db, account_id, now - timedelta(days=policy.prune_after_days)
+            )
+
+        for account_id in db.exec(select(AlertEvent.account_id).distinct()).all():
+            policy = self.policy_for(account_id)
+            stats["deleted_alerts"] += self.delete_alerts(
+                db, account_id, now - timedelta(days=policy.alert_retention_days)
+            )
+
+        stats["deleted_steps"] = self.delete_step_results(
+            db, now - timedelta(days=settings.workflow_step_retention_days)
+        )
+
+        logger.info("retention.completed", **stats)
+        return stats
+
+    def rollup_runs(self, db: Session, account_id: str, cutoff: datetime) -> tuple[int, int]:
+        """Collapse each day of hourly runs older than ``cutoff`` into a daily summary.
+
+        The last run of the day is kept as the representative; the others are deleted.
+        Each day is its own transaction.
+        """
+        day_column = func.date(ReportRun.created_at)
+        groups = db.exec(
+            select(day_column, func.count(col(ReportRun.id)))
+            .where(ReportRun.account_id == account_id)
+            .where(ReportRun.created_at < cutoff)
+            .group_by(day_column)
+            .having(func.count(col(ReportRun.id)) > 1)
+        ).all()
+
+        deleted_total = 0
+        for day, _ in groups:
+            rows = db.exec(
+                select(ReportRun.id, ReportRun.meta_payload, ReportRun.artifacts_path)
+                .where(ReportRun.account_id == account_id)
+                .where(ReportRun.created_at < cutoff)
+                .where(day_column == day)
+                .order_by(col(ReportRun.id))
+            ).all()
+            ids = [row[0] for row in rows]
+            keep_id = ids[-1]
+            day_value = day if not isinstance(day, str) else datetime.strptime(day, "%Y-%m-%d").date()
+
+            summary = db.exec(
+                select(ReportDailySummary)
+                .where(ReportDailySummary.account_id == account_id)
+                .where(ReportDailySummary.day == day_value)
+            ).first()
+            spend = _average([_metric(row[1] or {}, "spend") for row in rows])
+            roas = _average([_metric(row[1] or {}, "purchase_roas") for row in rows])
+
+            if summary is None:
+                summary = ReportDailySummary(account_id=account_id, day=day_value, run_count=len(ids))
+                summary.avg_spend, summary.avg_purchase_roas = spend, roas
+            else:
+                # The previously kept representative is part of this group again.
+                previous = summary.run_count - (1 if summary.last_run_id in ids else 0)
+                summary.avg_spend = _weighted(summary.avg_spend, previous, spend, len(ids))
+                summary.avg_purchase_roas = _weighted(summary.avg_purchase_roas, previous, roas, len(ids))
+                summary.run_count = previous + len(ids)
+            summary.last_run_id = keep_id
+            db.add(summary)
+
+            to_delete = [row for row in rows if row[0] != keep_id]
+            db.execute(delete(ReportRun).where(col(ReportRun.id).in_([row[0] for row in to_delete])))
+            db.commit()
+            deleted_total += len(to_delete)
+
+            for row in to_delete:
+                if row[2]:
+                    Path(row[2]).unlink(missing_ok=True)
+
+        return len(groups), deleted_total
+
+    def prune_redundant_insights(self, db: Session, account_id: str, cutoff: datetime) -> int:
+        """Clear insight_text/artifacts_path on runs that repeat the previous run's insight verbatim.
+
+        Only runs with parsed ``insight_structured`` sections are pruned; readers fall back to
+        ``insight_text`` for older runs, so their text is their only copy of the insight.
+        """
+        pruned = 0
+        last_id: int | None = 0
+        previous_text: str | None = None
+
+        while True:
+            rows = db.exec(
+                select(ReportRun.id, ReportRun.insight_text, ReportRun.artifacts_path, ReportRun.insight_structured)
+                .where(ReportRun.account_id == account_id)
+                .where(ReportRun.created_at < cutoff)
+                .where(ReportRun.insight_text != "")
+                .where(col(ReportRun.id) > last_id)
+                .order_by(col(ReportRun.id))
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                return pruned
+
+            redundant = []
+            for run_id, text, artifacts_path, structured in rows:
+                if text == previous_text and structured:
+                    redundant.append((run_id, artifacts_path))
+                previous_text = text
+
+            if redundant:
+                db.execute(
+                    update(ReportRun)
+                    .where(col(ReportRun.id).in_([run_id for run_id, _ in redundant]))
+                    .values(insight_text="", artifacts_path=None)
+                )
+                db.commit()
+                for _, artifacts_path in redundant:
+                    if artifacts_path:
+                        Path(artifacts_path).unlink(missing_ok=True)
+                pruned += len(redundant)
+            last_id = rows[-1][0]
+
+    def delete_alerts(self, db: Session, account_id: str, cutoff: datetime) -> int:
+        """Delete aged alerts ``batch_size`` rows per transaction."""
+        deleted = 0
+        while True:
+            ids = db.exec(
+                select(AlertEvent.id)
+                .where(AlertEvent.account_id == account_id)
+                .where(AlertEvent.created_at < cutoff)
+                .order_by(col(AlertEvent.id))
+                .limit(self.batch_size)
+            ).all()
+            if not ids:
+                return deleted
+            db.execute(delete(AlertEvent).where(col(AlertEvent.id).in_(ids)))
+            db.commit()
+            deleted += len(ids)
+
+    def delete_step_results(self, db: Session, cutoff: datetime) -> int:
+        """Delete workflow step results older than ``cutoff``, ``batch_size`` rows per transaction."""
+        deleted = 0
+        while True:
+            ids = db.exec(
+                select(WorkflowStepResult.id)
+                .where(WorkflowStepResult.created_at < cutoff)
+                .order_by(col(WorkflowStepResult.id))
+                .limit(self.batch_size)
+            ).all()
+            if not ids:
+                return deleted
+            db.execute(delete(WorkflowStepResult).where(col(WorkflowStepResult.id).in_(ids)))
+            db.commit()
+            deleted += len(ids)
@@ -1,11 +1,15 @@
 """Traffic analysis service using RapidAPI."""
 from __future__ import annotations
 
+import asyncio
+import time
 from typing import Any
 
 import httpx
 
 from app.config import get_settings
+from app.services.http_clients import client_or_shared
+from app.services.traffic_snapshot import TrafficRawStore, TrafficSnapshot
 
 settings = get_settings()
 
@@ -13,11 +17,22 @@ settings = get_settings()
 class TrafficAnalysisService:
     """Service for fetching traffic data from RapidAPI."""
     
-    def __init__(self, api_key: str | None = None, host: str | None = None) -> None:
+    def __init__(
+        self,
+        api_key: str | None = None,
+        host: str | None = None,
+        raw_store: TrafficRawStore | None = None,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
         self.api_key = api_key or settings.rapidapi_key
         self.host = host or settings.rapidapi_host
-        self.session = httpx.AsyncClient(timeout=30.0)
+        self._client = client
+        self.raw_store = raw_store or TrafficRawStore()
     
+    @property
+    def session(self) -> httpx.AsyncClient:
+        return client_or_shared(self._client, "rapidapi")
+
     def _headers(self) -> dict[str, str]:
         """Get RapidAPI headers."""
         return {
@@ -36,8 +51,12 @@ class TrafficAnalysisService:
             domain: Domain name (e.g., "example.com")
         
         Returns:
-            Dictionary with traffic metrics
+            Numeric snapshot dict (see ``TrafficSnapshot.to_dict``)
         """
+        return (await self.get_snapshot(domain)).to_dict()
+    
+    async def get_snapshot(self, domain: str) -> TrafficSnapshot:
+        """Fetch a typed traffic snapshot; the raw upstream payload goes to the raw store."""
         if not self.api_key:
             return self._fallback_data(domain)
         
@@ -49,6 +68,7 @@ class TrafficAnalysisService:
                 f"https://{self.host}/traffic",
                 f"https://{self.host}/domain-traffic",
                 f"https://{self.host}/website-traffic",
+                f"https://{self.host}/v1/traffic",
             ]
             
             for endpoint in endpoints:
@@ -60,121 +80,54 @@ class TrafficAnalysisService:
                     )
                     
                     if response.status_code == 200:
-                        data = response.json()
-                        return self._normalize_traffic_data(data, clean_domain)
+                        return await self._build_snapshot(response.json(), clean_domain)
                 except Exception:
                     continue
-            
-            # If all endpoints fail, try generic RapidAPI search
-            return await self._try_generic_search(clean_domain)
-            
-        except Exception as e:
-            # Return fallback data on error
-            return self._fallback_data(clean_domain)
-    
-    async def _try_generic_search(self, domain: str) -> dict[str, Any]:
-        """Try generic RapidAPI search for traffic data."""
-        try:
-            # Common RapidAPI traffic endpoints
-            response = await self.session.get(
-                f"https://{self.host}/v1/traffic",
-                headers=self._headers(),
-                params={"domain": domain}
-            )
-            
-            if response.status_code == 200:
-                return self._normalize_traffic_data(response.json(), domain)
         except Exception:
             pass
         
-        return self._fallback_data(domain)
-    
-    def _normalize_traffic_data(self, data: dict[str, Any], domain: str) -> dict[str, Any]:
-        """Normalize traffic data from various API response formats."""
-        # Handle different response structures
-        monthly_visits = (
-            data.get("monthly_visits") or
-            data.get("visits") or
-            data.get("traffic") or
-            data.get("estimated_visits") or
-            "N/A"
-        )
-        
-        bounce_rate = (
-            data.get("bounce_rate") or
-            data.get("bounceRate") or
-            data.get("bounce") or
-            None
-        )
-        
-        avg_duration = (
-            data.get("avg_duration") or
-            data.get("avgDuration") or
-            data.get("avg_visit_duration") or
-            data.get("time_on_site") or
-            None
-        )
-        
-        device_split = (
-            data.get("device_split") or
-            data.get("deviceSplit") or
-            data.get("mobile_percentage") or
-            None
-        )
-        
-        return {
-            "domain": domain,
-            "monthly_visits": monthly_visits,
-            "bounce_rate": f"{bounce_rate * 100:.1f}%" if isinstance(bounce_rate, (int, float)) else bounce_rate or "N/A",
-            "avg_duration": self._format_duration(avg_duration) if avg_duration else "N/A",
-            "device_split": f"{device_split}% Mobile" if isinstance(device_split, (int, float)) else device_split or "N/A",
-            "raw_data": data  # Keep raw data for reference
-        }
+        # Return fallback data when every endpoint fails
+        return self._fallback_data(clean_domain)
     
-    def _format_duration(self, seconds: int | float | None) -> str:
-        """Format duration in seconds to readable format."""
-        if not seconds:
-            return "N/A"
-        
-        if isinstance(seconds, str):
-            return seconds
-        
-        mins = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{mins}m {secs}s"
+    async def _build_snapshot(self, data: dict[str, Any], domain: str) -> TrafficSnapshot:
+        snapshot = TrafficSnapshot.from_upstream(data, domain)
+        await asyncio.to_thread(self.raw_store.put, domain, snapshot.fetched_at, data)
+        return snapshot
     
-    def _fallback_data(self, domain: str) -> dict[str, Any]:
+    def _fallback_data(self, domain: str) -> TrafficSnapshot:
         """Generate fallback traffic data when API is unavailable."""
         # Generate realistic fallback data based on domain
         seed = len(domain)
-        visits = 50000 + (seed * 12000)
         
-        return {
-            "domain": domain,
-            "monthly_visits": f"{(visits / 1000):.1f}K",
-            "bounce_rate": f"{(40 + (seed % 20)):.1f}%",
-            "avg_duration": f"{2 + (seed % 3)}m {(seed * 4) % 60}s",
-            "device_split": f"{50 + (seed % 30)}% Mobile",
-            "source": "fallback"
-        }
+        return TrafficSnapshot(
+            domain=domain,
+            fetched_at=int(time.time()),
+            monthly_visits=float(50000 + (seed * 12000)),
+            bounce_rate=(40 + (seed % 20)) / 100,
+            avg_duration_seconds=float((2 + (seed % 3)) * 60 + (seed * 4) % 60),
+            mobile_share=(50 + (seed % 30)) / 100,
+            source="fallback",
+        )
     
-    async def get_multiple_domains(self, domains: list[str]) -> dict[str, dict[str, Any]]:
-        """Fetch traffic data for multiple domains concurrently."""
-        import asyncio
-        
-        tasks = [self.get_traffic_data(domain) for domain in domains]
+    async def get_snapshots(self, domains: list[str]) -> dict[str, TrafficSnapshot]:
+        """Fetch traffic snapshots for multiple domains concurrently."""
+        tasks = [self.get_snapshot(domain) for domain in domains]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        traffic_data = {}
+        snapshots = {}
         for domain, result in zip(domains, results):
-            if isinstance(result, Exception):
-                traffic_data[domain] = self._fallback_data(domain)
+            if isinstance(result, BaseException):
+                snapshots[domain] = self._fallback_data(domain)
             else:
-                traffic_data[domain] = result
+                snapshots[domain] = result
         
-        return traffic_data
+        return snapshots
     
-    async def close(self) -> None:
-        """Close the HTTP session."""
-        await self.session.aclose()
-
+    async def get_multiple_domains(self, domains: list[str]) -> dict[str, dict[str, Any]]:
+        """Fetch traffic data for multiple domains concurrently."""
+        snapshots = await self.get_snapshots(domains)
+        return {domain: snapshot.to_dict() for domain, snapshot in snapshots.items()}
+    
+    def get_raw_payload(self, domain: str, fetched_at: int) -> dict[str, Any] | None:
+        """Look up the raw upstream payload behind a snapshot."""
+        return self.raw_store.get(self._clean_domain(domain), fetched_at)
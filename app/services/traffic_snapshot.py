@@ -0,0 +1,168 @@
+"""Typed traffic snapshots and the on-demand store for raw upstream payloads."""
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import redis
+import structlog
+
+from app.services.cache_service import CacheService
+
+logger = structlog.get_logger()
+
+_SUFFIXES = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+_DURATION_RE = re.compile(r"(?:(\d+)h)?\s*(?:(\d+)m)?\s*(?:(\d+)s)?$")
+
+
+def parse_count(value: Any) -> float | None:
+    """Parse visit counts such as ``52000``, ``"52.0K"`` or ``"1,200,000"``."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    text = value.strip().lower().replace(",", "")
+    multiplier = _SUFFIXES.get(text[-1:], 1)
+    if multiplier != 1:
+        text = text[:-1]
+    try:
+        return float(text) * multiplier
+    except ValueError:
+        return None
+
+
+def parse_ratio(value: Any) -> float | None:
+    """Parse a share into a 0-1 fraction from ``0.45``, ``"0.45"``, ``45`` or ``"45.0%"``."""
+    if isinstance(value, str):
+        match = re.search(r"[\d.]+", value)
+        if not match:
+            return None
+        number = float(match.group())
+        return number / 100 if "%" in value or number > 1 else number
+    if isinstance(value, (int, float)):
+        return float(value) / 100 if value > 1 else float(value)
+    return None
+
+
+def _first(data: dict[str, Any], *keys: str) -> Any:
+    """The first of ``keys`` present in ``data``; a real ``0`` counts as present."""
+    for key in keys:
+        if data.get(key) is not None:
+            return data[key]
+    return None
+
+
+def parse_duration(value: Any) -> float | None:
+    """Parse a duration in seconds from ``125``, ``"2m 5s"`` or ``"00:02:05"``."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    text = value.strip()
+    if ":" in text:
+        seconds = 0.0
+        for part in text.split(":"):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    match = _DURATION_RE.match(text)
+    if not match or not any(match.groups()):
+        return None
+    hours, minutes, secs = (int(group or 0) for group in match.groups())
+    return float(hours * 3600 + minutes * 60 + secs)
+
+
+@dataclass(slots=True, frozen=True)
+class TrafficSnapshot:
+    """Numeric traffic metrics for one domain at one fetch time.
+
+    Ratios are 0-1 fractions and durations are seconds; ``display`` does the formatting.
+    """
+
+    domain: str
+    fetched_at: int
+    monthly_visits: float | None = None
+    bounce_rate: float | None = None
+    avg_duration_seconds: float | None = None
+    mobile_share: float | None = None
+    source: str = "rapidapi"
+
+    @classmethod
+    def from_upstream(cls, data: dict[str, Any], domain: str, fetched_at: int | None = None) -> TrafficSnapshot:
+        """Normalize the various RapidAPI response shapes."""
+        return cls(
+            domain=domain,
+            fetched_at=fetched_at or int(time.time()),
+            monthly_visits=parse_count(_first(data, "monthly_visits", "visits", "traffic", "estimated_visits")),
+            bounce_rate=parse_ratio(_first(data, "bounce_rate", "bounceRate", "bounce")),
+            avg_duration_seconds=parse_duration(
+                _first(data, "avg_duration", "avgDuration", "avg_visit_duration", "time_on_site")
+            ),
+            mobile_share=parse_ratio(_first(data, "device_split", "deviceSplit", "mobile_percentage")),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TrafficSnapshot:
+        return cls(**{field: data[field] for field in cls.__dataclass_fields__ if field in data})
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    def display(self) -> dict[str, str]:
+        """Human-readable strings for API responses and LLM prompts."""
+        return {
+            "domain": self.domain,
+            "monthly_visits": self._format_count(self.monthly_visits),
+            "bounce_rate": f"{self.bounce_rate * 100:.1f}%" if self.bounce_rate is not None else "N/A",
+            "avg_duration": self._format_duration(self.avg_duration_seconds),
+            "device_split": f"{self.mobile_share * 100:.0f}% Mobile" if self.mobile_share is not None else "N/A",
+        }
+
+    def summary_line(self) -> str:
+        shown = self.display()
+        return f"- {self.domain}: {shown['monthly_visits']} visits, {shown['bounce_rate']} bounce rate"
+
+    @staticmethod
+    def _format_count(value: float | None) -> str:
+        if value is None:
+            return "N/A"
+        if value >= 1_000_000:
+            return f"{value / 1_000_000:.1f}M"
+        if value >= 1_000:
+            return f"{value / 1_000:.1f}K"
+        return f"{value:.0f}"
+
+    @staticmethod
+    def _format_duration(seconds: float | None) -> str:
+        if not seconds:
+            return "N/A"
+        return f"{int(seconds // 60)}m {int(seconds % 60)}s"
+
+
+class TrafficRawStore:
+    """Keeps raw upstream traffic payloads out of snapshots, keyed by domain and fetch time."""
+
+    def __init__(self, cache: CacheService | None = None, ttl_seconds: int = 7 * 24 * 3600) -> None:
+        self._cache = cache
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def cache(self) -> CacheService:
+        if self._cache is None:
+            self._cache = CacheService()
+        return self._cache
+
+    @staticmethod
+    def key(domain: str, fetched_at: int) -> str:
+        return f"traffic_raw:{domain}:{fetched_at}"
+
+    def put(self, domain: str, fetched_at: int, payload: dict[str, Any]) -> None:
+        try:
+            self.cache.set_snapshot(self.key(domain, fetched_at), payload, ttl_seconds=self.ttl_seconds)
+        except redis.RedisError as exc:
+            # Raw payloads are for debugging only; never fail a fetch over them.
+            logger.warning("traffic.raw_store_failed", domain=domain, error=str(exc))
+
+    def get(self, domain: str, fetched_at: int) -> dict[str, Any] | None:
+        return self.cache.get_snapshot(self.key(domain, fetched_at))
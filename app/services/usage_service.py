@@ -0,0 +1,180 @@
+"""Per-account, per-task LLM token and latency accounting."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Any, cast
+
+import structlog
+from pydantic import BaseModel, Field
+from sqlalchemy import CursorResult, case, func, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlmodel import Session, col
+
+from app.db import get_session
+from app.models.report import utcnow
+from app.models.usage import LLMUsageHourly
+from app.services.ai_providers import AIResponse
+
+logger = structlog.get_logger()
+
+USAGE_DIMENSIONS = ("hour", "account_id", "task", "provider", "model")
+
+
+class LLMUsageRecord(BaseModel):
+    """One LLM call."""
+    account_id: str = ""
+    task: str
+    provider: str
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency_ms: float = 0.0
+    error: bool = False
+    at: datetime = Field(default_factory=utcnow)
+
+    @classmethod
+    def from_response(cls, response: AIResponse, *, task: str, account_id: str | None = None) -> LLMUsageRecord:
+        return cls(
+            account_id=account_id or "",
+            task=task,
+            provider=response.provider,
+            model=response.model,
+            input_tokens=response.input_tokens,
+            output_tokens=response.output_tokens,
+            latency_ms=response.latency_ms,
+        )
+
+
+def usage_summary(response: AIResponse) -> dict[str, Any]:
+    """The usage fields stored alongside an insight."""
+    return {
+        "input_tokens": response.input_tokens,
+        "output_tokens": response.output_tokens,
+        "latency_ms": round(response.latency_ms, 1),
+    }
+
+
+class UsageService:
+    """Folds each call into its hourly row with an atomic increment, so the table stays one row per bucket."""
+
+    def __init__(self, session_factory: Callable[[], AbstractContextManager[Session]] = get_session) -> None:
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _bucket(record: LLMUsageRecord) -> dict[str, Any]:
+        return {
+            "hour": record.at.replace(minute=0, second=0, microsecond=0),
+            "account_id": record.account_id,
+            "task": record.task,
+            "provider": record.provider,
+            "model": record.model,
+        }
+
+    @staticmethod
+    def _increment(db: Session, bucket: dict[str, Any], record: LLMUsageRecord) -> int:
+        statement = update(LLMUsageHourly).values(
+            calls=LLMUsageHourly.calls + 1,
+            errors=LLMUsageHourly.errors + int(record.error),
+            input_tokens=LLMUsageHourly.input_tokens + record.input_tokens,
+            output_tokens=LLMUsageHourly.output_tokens + record.output_tokens,
+            latency_ms_total=LLMUsageHourly.latency_ms_total + record.latency_ms,
+            latency_ms_max=case(
+                (col(LLMUsageHourly.latency_ms_max) < record.latency_ms, record.latency_ms),
+                else_=LLMUsageHourly.latency_ms_max,
+            ),
+            updated_at=utcnow(),
+        )
+        for column, value in bucket.items():
+            statement = statement.where(getattr(LLMUsageHourly, column) == value)
+        return cast(CursorResult[Any], db.execute(statement)).rowcount
+
+    def record(self, record: LLMUsageRecord) -> None:
+        """Add one call to its hourly bucket. Accounting failures never fail the LLM call."""
+        bucket = self._bucket(record)
+        try:
+            with self.session_factory() as db:
+                if not self._increment(db, bucket, record):
+                    db.add(
+                        LLMUsageHourly(
+                            **bucket,
+                            calls=1,
+                            errors=int(record.error),
+                            input_tokens=record.input_tokens,
+                            output_tokens=record.output_tokens,
+                            latency_ms_total=record.latency_ms,
+                            latency_ms_max=record.latency_ms,
+                        )
+                    )
+                    try:
+                        db.commit()
+                    except IntegrityError:
+                        # Another worker created the bucket first.
+                        db.rollback()
+                        self._increment(db, bucket, record)
+                        db.commit()
+                else:
+                    db.commit()
+        except SQLAlchemyError as exc:
+            logger.warning("usage.record_failed", task=record.task, account_id=record.account_id, error=str(exc))
+
+    def record_response(self, response: AIResponse, *, task: str, account_id: str | None = None) -> None:
+        self.record(LLMUsageRecord.from_response(response, task=task, account_id=account_id))
+
+    def query(
+        self,
+        db: Session,
+        *,
+        group_by: list[str],
+        since: datetime | None = None,
+        until: datetime | None = None,
+        account_id: str | None = None,
+        task: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Aggregate hourly rows over ``group_by``, heaviest token consumers first."""
+        unknown = [dimension for dimension in group_by if dimension not in USAGE_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown group_by: {unknown}. Valid dimensions: {list(USAGE_DIMENSIONS)}")
+
+        dimensions = [getattr(LLMUsageHourly, dimension) for dimension in group_by]
+        total_tokens = func.sum(LLMUsageHourly.input_tokens + LLMUsageHourly.output_tokens)
+        statement = select(
+            *dimensions,
+            func.sum(LLMUsageHourly.calls),
+            func.sum(LLMUsageHourly.errors),
+            func.sum(LLMUsageHourly.input_tokens),
+            func.sum(LLMUsageHourly.output_tokens),
+            func.sum(LLMUsageHourly.latency_ms_total),
+            func.max(LLMUsageHourly.latency_ms_max),
+        )
+        if since is not None:
+            statement = statement.where(col(LLMUsageHourly.hour) >= since)
+        if until is not None:
+            statement = statement.where(col(LLMUsageHourly.hour) < until)
+        if account_id is not None:
+            statement = statement.where(col(LLMUsageHourly.account_id) == account_id)
+        if task is not None:
+            statement = statement.where(col(LLMUsageHourly.task) == task)
+        if dimensions:
+            statement = statement.group_by(*dimensions)
+        statement = statement.order_by(total_tokens.desc())
+
+        rows = []
+        # A variable number of group-by columns needs SQLAlchemy's variadic select.
+        for row in db.execute(statement).all():
+            calls, errors, input_tokens, output_tokens, latency_total, latency_max = row[len(group_by):]
+            if not calls:
+                continue
+            rows.append(
+                {
+                    **dict(zip(group_by, row[: len(group_by)])),
+                    "calls": calls,
+                    "errors": errors,
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "avg_latency_ms": round(latency_total / calls, 1),
+                    "max_latency_ms": round(latency_max, 1),
+                }
+            )
+        return rows
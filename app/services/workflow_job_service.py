@@ -0,0 +1,153 @@
+"""Queued market-research workflow jobs: submission, status polling and execution."""
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from datetime import UTC, timedelta
+
+import structlog
+from sqlmodel import Session
+
+from app.config import get_settings
+from app.db import get_session
+from app.models.report import utcnow
+from app.models.workflow import WorkflowJob
+from app.schemas.workflow import WorkflowExecutionRequest, WorkflowResponse
+from app.services.http_clients import run_sync
+from app.services.workflow_service import (
+    WorkflowConfig,
+    WorkflowService,
+    extract_competitor_domains,
+)
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+
+class WorkflowJobService:
+    def __init__(
+        self,
+        workflow_service: WorkflowService | None = None,
+        session_factory: Callable[[], AbstractContextManager[Session]] = get_session,
+        poll_seconds: float | None = None,
+        time_limit_seconds: int | None = None,
+    ) -> None:
+        self._workflow_service = workflow_service
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds or settings.workflow_job_poll_seconds
+        self.time_limit_seconds = time_limit_seconds or settings.workflow_job_time_limit_seconds
+
+    @property
+    def workflow_service(self) -> WorkflowService:
+        # Built lazily: the API process only submits and polls jobs.
+        if self._workflow_service is None:
+            self._workflow_service = WorkflowService()
+        return self._workflow_service
+
+    def create(self, db: Session, request: WorkflowExecutionRequest, base_config: WorkflowConfig) -> WorkflowJob:
+        """Persist a queued job with the provider mapping it will run with."""
+        # Only explicit choices are snapshotted; other tasks keep the defaults (and model routing).
+        config = {
+            getattr(task, "value", task): provider
+            for task, provider in base_config.config.items()
+            if getattr(task, "value", task) in base_config.pinned
+        }
+        config.update(request.custom_config or {})
+        job = WorkflowJob(
+            id=uuid.uuid4().hex,
+            domain=request.domain,
+            request_payload=request.model_dump(mode="json"),
+            config=config,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    def get(self, job_id: str) -> WorkflowJob | None:
+        with self.session_factory() as db:
+            job = db.get(WorkflowJob, job_id)
+            if job is not None and self._is_stale(job):
+                # The worker was killed at the time limit (or died) without recording an outcome.
+                logger.warning("workflow.job_stale", job_id=job_id, started_at=str(job.started_at))
+                job.status, job.error, job.finished_at = "failed", "worker time limit exceeded", utcnow()
+                db.add(job)
+                db.commit()
+                db.refresh(job)
+            return job
+
+    def _is_stale(self, job: WorkflowJob) -> bool:
+        if job.status != "running" or job.started_at is None:
+            return False
+        # SQLite hands back naive datetimes; they were written as UTC.
+        started_at = job.started_at if job.started_at.tzinfo else job.started_at.replace(tzinfo=UTC)
+        return utcnow() - started_at > timedelta(seconds=self.time_limit_seconds)
+
+    async def wait(self, job_id: str, timeout: float) -> WorkflowJob | None:
+        """Long-poll: return once the job is finished or ``timeout`` seconds have passed.
+
+        Each status read runs in a worker thread so the event loop is never blocked on the database.
+        """
+        deadline = time.monotonic() + timeout
+        job = await asyncio.to_thread(self.get, job_id)
+        while job is not None and job.status not in TERMINAL_STATUSES and time.monotonic() < deadline:
+            await asyncio.sleep(min(self.poll_seconds, max(deadline - time.monotonic(), 0)))
+            job = await asyncio.to_thread(self.get, job_id)
+        return job
+
+    def mark_failed(self, job_id: str, error: str) -> None:
+        with self.session_factory() as db:
+            job = db.get(WorkflowJob, job_id)
+            if job is None:
+                return
+            job.status, job.error, job.finished_at = "failed", error, utcnow()
+            db.add(job)
+            db.commit()
+
+    def run(self, job_id: str) -> str:
+        """Execute a queued job in the worker and persist its result. Returns the final status."""
+        with self.session_factory() as db:
+            job = db.get(WorkflowJob, job_id)
+            if job is None:
+                raise ValueError(f"Unknown workflow job: {job_id}")
+            if job.status in TERMINAL_STATUSES:
+                # Redelivered message; the job already ran.
+                return job.status
+            job.status, job.started_at = "running", utcnow()
+            db.add(job)
+            db.commit()
+            request = WorkflowExecutionRequest.model_validate(job.request_payload)
+            config = dict(job.config)
+
+        try:
+            result = run_sync(
+                self.workflow_service.generate_market_research_report(
+                    domain=request.domain,
+                    meta_data=request.meta_data,
+                    competitor_data=request.competitor_data,
+                    custom_config=config,
+                    competitor_domains=extract_competitor_domains(request.competitor_data) or None,
+                    reuse=not request.force_refresh,
+                    account_id=request.account_id,
+                )
+            )
+            payload = WorkflowResponse(**result).model_dump(mode="json")
+        except Exception as exc:  # noqa: BLE001
+            logger.error("workflow.job_failed", job_id=job_id, error=str(exc))
+            self.mark_failed(job_id, str(exc))
+            return "failed"
+
+        with self.session_factory() as db:
+            job = db.get(WorkflowJob, job_id)
+            if job is None:
+                raise ValueError(f"Unknown workflow job: {job_id}")
+            job.status, job.result, job.finished_at = "succeeded", payload, utcnow()
+            db.add(job)
+            db.commit()
+        logger.info("workflow.job_completed", job_id=job_id, domain=request.domain)
+        return "succeeded"
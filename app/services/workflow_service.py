@@ -1,11 +1,24 @@
 """Workflow service for orchestrating multi-step market research tasks with different AI providers."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable, Iterable
+from contextlib import AbstractAsyncContextManager, nullcontext
 from enum import Enum
 from typing import Any
 
+from app.config import get_settings
 from app.services.ai_providers import AIProviderFactory, AIResponse
+from app.services.insight_parser import parse_competitors
+from app.services.model_router import ModelRouter
 from app.services.traffic_service import TrafficAnalysisService
+from app.services.usage_service import LLMUsageRecord, UsageService
+from app.services.workflow_step_store import WorkflowStepStore, step_fingerprint
+
+settings = get_settings()
+
+# (provider, model, routing rule) a step will be called with.
+StepRoute = tuple[str, str | None, str | None]
 
 
 class WorkflowTask(str, Enum):
@@ -19,6 +32,24 @@ class WorkflowTask(str, Enum):
     EXECUTIVE_SUMMARY = "executive_summary"
 
 
+# Steps that build on earlier analysis; when an upstream step re-runs, these re-run too.
+TASK_DEPENDENCIES: dict[WorkflowTask, tuple[WorkflowTask, ...]] = {
+    WorkflowTask.STRATEGIC_RECOMMENDATIONS: (
+        WorkflowTask.MARKET_GAP_ANALYSIS,
+        WorkflowTask.GROWTH_OPPORTUNITY_IDENTIFICATION,
+        WorkflowTask.META_ADS_DIAGNOSTIC,
+    ),
+    WorkflowTask.EXECUTIVE_SUMMARY: (
+        WorkflowTask.COMPETITOR_IDENTIFICATION,
+        WorkflowTask.TRAFFIC_ANALYSIS,
+        WorkflowTask.MARKET_GAP_ANALYSIS,
+        WorkflowTask.GROWTH_OPPORTUNITY_IDENTIFICATION,
+        WorkflowTask.META_ADS_DIAGNOSTIC,
+        WorkflowTask.STRATEGIC_RECOMMENDATIONS,
+    ),
+}
+
+
 class WorkflowConfig:
     """Configuration for which AI to use for each workflow task."""
     
@@ -40,29 +71,55 @@ class WorkflowConfig:
         }
         
         self.config = {**default_config, **(config or {})}
+        # Explicitly chosen tasks are never re-routed by the model router.
+        self.pinned = {getattr(task, "value", task) for task in (config or {})}
     
-    def get_provider_for_task(self, task: WorkflowTask) -> str:
+    def get_provider_for_task(self, task: WorkflowTask | str) -> str:
         """Get the AI provider for a specific task."""
         return self.config.get(task, "claude")
     
     def set_provider_for_task(self, task: WorkflowTask, provider: str) -> None:
         """Set the AI provider for a specific task."""
         self.config[task] = provider
+        self.pinned.add(getattr(task, "value", task))
+
+
+def extract_competitor_domains(competitor_data: dict[str, Any]) -> list[str]:
+    """Pull competitor URLs/domains out of free-form competitor data."""
+    competitor_domains = []
+    for value in competitor_data.values():
+        if isinstance(value, dict) and "url" in value:
+            competitor_domains.append(value["url"])
+        elif isinstance(value, str) and ("http" in value or "." in value):
+            competitor_domains.append(value)
+    return competitor_domains
 
 
 class WorkflowService:
     """Service for executing market research workflows with configurable AI providers."""
     
-    def __init__(self, workflow_config: WorkflowConfig | None = None):
+    def __init__(
+        self,
+        workflow_config: WorkflowConfig | None = None,
+        traffic_service: TrafficAnalysisService | None = None,
+        step_store: WorkflowStepStore | None = None,
+        usage_service: UsageService | None = None,
+        router: ModelRouter | None = None,
+    ):
         self.config = workflow_config or WorkflowConfig()
-        self.traffic_service = TrafficAnalysisService()
-        self.traffic_service = TrafficAnalysisService()
+        self.traffic_service = traffic_service or TrafficAnalysisService()
+        self.step_store = step_store or WorkflowStepStore()
+        self.usage_service = usage_service or UsageService()
+        if router is None and settings.model_routing_enabled:
+            router = ModelRouter(usage_service=self.usage_service)
+        self.router = router
     
     def execute_task(
         self,
         task: WorkflowTask,
         prompt: str,
         provider: str | None = None,
+        account_id: str | None = None,
         **kwargs: Any
     ) -> AIResponse:
         """Execute a single workflow task with the specified or configured AI provider.
@@ -71,6 +128,7 @@ class WorkflowService:
             task: The workflow task to execute
             prompt: The prompt for the AI
             provider: Override the configured provider for this task
+            account_id: Account the call's tokens and latency are attributed to
             **kwargs: Additional arguments to pass to the AI provider
         
         Returns:
@@ -84,25 +142,112 @@ class WorkflowService:
         if model_override:
             kwargs["model"] = model_override
         
-        return ai_provider.generate(prompt, **kwargs)
+        try:
+            response = ai_provider.generate(prompt, **kwargs)
+        except Exception:
+            self.usage_service.record(
+                LLMUsageRecord(
+                    account_id=account_id or "",
+                    task=task.value,
+                    provider=provider_name,
+                    model=model_override or "default",
+                    error=True,
+                )
+            )
+            raise
+        self.usage_service.record_response(response, task=task.value, account_id=account_id)
+        return response
     
+    def resolve_route(
+        self,
+        task: WorkflowTask,
+        prompt: str,
+        config: WorkflowConfig,
+        account_id: str | None = None,
+        provider_override: str | None = None,
+        model: str | None = None,
+    ) -> StepRoute:
+        """Provider, model and routing rule for one step; pinned tasks and overrides skip the router."""
+        provider_name = provider_override or config.get_provider_for_task(task)
+        if self.router and not (provider_override or model or task.value in config.pinned):
+            decision = self.router.route(task.value, prompt, default_provider=provider_name, account_id=account_id)
+            return decision.provider, decision.model, decision.rule
+        return provider_name, model, None
+
+    def plan_routes(
+        self,
+        tasks: list[tuple[WorkflowTask, str]],
+        workflow_config: WorkflowConfig | None = None,
+        account_id: str | None = None,
+    ) -> dict[WorkflowTask, StepRoute]:
+        """Resolve every step's route up front, e.g. to admit the run on the providers it will call."""
+        config = workflow_config or self.config
+        return {task: self.resolve_route(task, prompt, config, account_id) for task, prompt in tasks}
+
     def execute_workflow(
         self,
         tasks: list[tuple[WorkflowTask, str]],
+        domain: str | None = None,
+        reuse: bool = True,
+        workflow_config: WorkflowConfig | None = None,
+        account_id: str | None = None,
+        routes: dict[WorkflowTask, StepRoute] | None = None,
         **kwargs: Any
     ) -> dict[WorkflowTask, AIResponse]:
         """Execute multiple workflow tasks in sequence.
         
+        Each step is fingerprinted from its prompt, provider, model and the fingerprints
+        of the steps in ``TASK_DEPENDENCIES``. A step whose fingerprint has been stored
+        before is served from the step store instead of calling the AI provider.
+        
         Args:
-            tasks: List of (task, prompt) tuples
+            tasks: List of (task, prompt) tuples, upstream steps first
+            domain: Domain the steps belong to, recorded with stored results
+            reuse: Set False to recompute every step (results are still stored)
+            workflow_config: Provider mapping for this run; defaults to the service's config
+            account_id: Account LLM usage is attributed to; defaults to ``domain``
+            routes: Routes from ``plan_routes``; steps without one are routed here
             **kwargs: Additional arguments for all tasks
         
         Returns:
-            Dictionary mapping tasks to their responses
+            Dictionary mapping tasks to their responses; ``metadata["cached"]`` marks reused steps
         """
+        config = workflow_config or self.config
+        provider_override = kwargs.pop("provider", None)
         results = {}
+        fingerprints: dict[WorkflowTask, str] = {}
         for task, prompt in tasks:
-            results[task] = self.execute_task(task, prompt, **kwargs)
+            if routes and task in routes:
+                provider_name, model, rule = routes[task]
+            else:
+                provider_name, model, rule = self.resolve_route(
+                    task, prompt, config, account_id or domain, provider_override, kwargs.get("model")
+                )
+            call_kwargs = {**kwargs, "model": model} if model else kwargs
+
+            fingerprint = step_fingerprint(
+                task.value,
+                provider_name,
+                prompt,
+                model=model,
+                dependencies=[fingerprints[dep] for dep in TASK_DEPENDENCIES.get(task, ()) if dep in fingerprints],
+            )
+            fingerprints[task] = fingerprint
+
+            response = self.step_store.get(task.value, fingerprint) if reuse else None
+            cached = response is not None
+            if response is None:
+                response = self.execute_task(
+                    task, prompt, provider=provider_name, account_id=account_id or domain, **call_kwargs
+                )
+                self.step_store.put(task.value, fingerprint, domain or "", response)
+            response.metadata = {
+                **response.metadata,
+                "cached": cached,
+                "fingerprint": fingerprint,
+                "routing_rule": rule,
+            }
+            results[task] = response
         return results
     
     async def generate_market_research_report(
@@ -111,7 +256,10 @@ class WorkflowService:
         meta_data: dict[str, Any],
         competitor_data: dict[str, Any],
         custom_config: dict[str, str] | None = None,
-        competitor_domains: list[str] | None = None
+        competitor_domains: list[str] | None = None,
+        reuse: bool = True,
+        account_id: str | None = None,
+        admit: Callable[[Iterable[str]], AbstractAsyncContextManager[Any]] | None = None,
     ) -> dict[str, Any]:
         """Generate a complete market research report using the workflow.
         
@@ -120,26 +268,25 @@ class WorkflowService:
             meta_data: Meta Ads performance data
             competitor_data: Competitor intelligence data
             custom_config: Optional custom AI provider configuration
+            reuse: Serve unchanged steps from stored results (see ``execute_workflow``)
+            account_id: Account LLM usage is attributed to; defaults to ``domain``
+            admit: Entered around the provider calls with every provider the routed steps use
         
         Returns:
             Complete market research report with insights from each workflow step
         """
-        if custom_config:
-            workflow_config = WorkflowConfig(custom_config)
-            self.config = workflow_config
+        # A per-call config; the shared service config is never mutated by a run.
+        workflow_config = WorkflowConfig(custom_config) if custom_config else self.config
         
         # Fetch traffic data for competitors if domains provided
         competitor_traffic = {}
         if competitor_domains:
-            competitor_traffic = await self.traffic_service.get_multiple_domains(competitor_domains)
+            competitor_traffic = await self.traffic_service.get_snapshots(competitor_domains)
         
         # Step 1: Competitor Identification (Gemini 3 - web research)
         competitor_context = ""
         if competitor_traffic:
-            traffic_summary = "\n".join([
-                f"- {domain}: {data.get('monthly_visits', 'N/A')} visits, {data.get('bounce_rate', 'N/A')} bounce rate"
-                for domain, data in competitor_traffic.items()
-            ])
+            traffic_summary = "\n".join(snapshot.summary_line() for snapshot in competitor_traffic.values())
             competitor_context = f"\n\nTraffic data for identified competitors:\n{traffic_summary}"
         
         competitor_prompt = f"""
@@ -152,7 +299,7 @@ class WorkflowService:
         # Step 2: Traffic Analysis (using RapidAPI data)
         traffic_analysis = ""
         if competitor_traffic:
-            traffic_analysis = f"\n\nCompetitor Traffic Data (from RapidAPI):\n{competitor_traffic}"
+            traffic_analysis = f"\n\nCompetitor Traffic Data (from RapidAPI):\n{[snapshot.display() for snapshot in competitor_traffic.values()]}"
         
         # Step 3: Market Gap Analysis (Claude - strategic thinking)
         gap_prompt = f"""
@@ -207,23 +354,41 @@ class WorkflowService:
             (WorkflowTask.EXECUTIVE_SUMMARY, summary_prompt),
         ]
         
-        results = self.execute_workflow(tasks)
+        # Routing may read usage stats and provider calls block; both run off the event loop.
+        routes = await asyncio.to_thread(self.plan_routes, tasks, workflow_config, account_id or domain)
+        providers = {provider for provider, _, _ in routes.values()}
+        async with admit(providers) if admit else nullcontext():
+            results = await asyncio.to_thread(
+                self.execute_workflow,
+                tasks,
+                domain=domain,
+                reuse=reuse,
+                workflow_config=workflow_config,
+                account_id=account_id,
+                routes=routes,
+            )
         
         # Compile report
         return {
             "domain": domain,
             "executive_summary": results[WorkflowTask.EXECUTIVE_SUMMARY].content,
             "competitors": results[WorkflowTask.COMPETITOR_IDENTIFICATION].content,
+            "competitor_list": [
+                competitor.model_dump()
+                for competitor in parse_competitors(results[WorkflowTask.COMPETITOR_IDENTIFICATION].content)
+            ],
             "traffic_analysis": results.get(WorkflowTask.TRAFFIC_ANALYSIS, AIResponse(content="N/A", provider="none", model="none")).content if WorkflowTask.TRAFFIC_ANALYSIS in results else "N/A",
             "market_gap": results[WorkflowTask.MARKET_GAP_ANALYSIS].content,
             "growth_opportunities": results[WorkflowTask.GROWTH_OPPORTUNITY_IDENTIFICATION].content,
             "meta_diagnostic": results[WorkflowTask.META_ADS_DIAGNOSTIC].content,
             "recommendations": results[WorkflowTask.STRATEGIC_RECOMMENDATIONS].content,
-            "traffic_data": competitor_traffic,  # Include raw traffic data
+            "traffic_data": {domain: snapshot.to_dict() for domain, snapshot in competitor_traffic.items()},
             "workflow_metadata": {
                 task.value: {
                     "provider": results[task].provider,
                     "model": results[task].model,
+                    "cached": results[task].metadata.get("cached", False),
+                    "routing_rule": results[task].metadata.get("routing_rule"),
                 }
                 for task in results.keys()
             }
@@ -0,0 +1,107 @@
+"""Persistent per-step workflow results, keyed by input fingerprints."""
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable, Iterable
+from contextlib import AbstractContextManager
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import orjson
+import structlog
+from sqlalchemy import delete
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, col, select
+
+from app.config import get_settings
+from app.db import get_session
+from app.models.workflow import WorkflowStepResult
+from app.services.ai_providers import AIResponse
+
+settings = get_settings()
+logger = structlog.get_logger()
+
+
+def step_fingerprint(
+    task: str,
+    provider: str,
+    prompt: str,
+    model: str | None = None,
+    dependencies: Iterable[str] = (),
+) -> str:
+    """Hash everything a step consumes: its rendered prompt, who runs it, and its upstream steps.
+
+    Upstream fingerprints are folded in so a changed step invalidates every dependent.
+    """
+    digest = hashlib.sha256()
+    for part in (task, provider, model or "", prompt, *dependencies):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _json_safe(value: dict[str, Any]) -> dict[str, Any]:
+    # Provider metadata can carry SDK objects (e.g. Anthropic usage); keep what JSON can hold.
+    def default(obj: Any) -> Any:
+        if hasattr(obj, "model_dump"):
+            return obj.model_dump()
+        return str(obj)
+
+    return orjson.loads(orjson.dumps(value, default=default))
+
+
+class WorkflowStepStore:
+    """Step results older than ``max_age_days`` are ignored; RetentionService deletes them."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AbstractContextManager[Session]] = get_session,
+        max_age_days: int | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_age_days = max_age_days if max_age_days is not None else settings.workflow_step_retention_days
+
+    def cutoff(self) -> datetime:
+        return datetime.now(UTC) - timedelta(days=self.max_age_days)
+
+    def get(self, task: str, fingerprint: str) -> AIResponse | None:
+        try:
+            with self.session_factory() as session:
+                row = session.exec(
+                    select(WorkflowStepResult)
+                    .where(WorkflowStepResult.task == task)
+                    .where(WorkflowStepResult.fingerprint == fingerprint)
+                    .where(WorkflowStepResult.created_at >= self.cutoff())
+                ).first()
+        except SQLAlchemyError as exc:
+            logger.warning("workflow.step_store_read_failed", task=task, error=str(exc))
+            return None
+        if row is None:
+            return None
+        return AIResponse(content=row.content, provider=row.provider, model=row.model, metadata=row.response_metadata)
+
+    def put(self, task: str, fingerprint: str, domain: str, response: AIResponse) -> None:
+        try:
+            with self.session_factory() as session:
+                # An expired copy still holds the (task, fingerprint) key until it is pruned.
+                session.execute(
+                    delete(WorkflowStepResult)
+                    .where(col(WorkflowStepResult.task) == task)
+                    .where(col(WorkflowStepResult.fingerprint) == fingerprint)
+                    .where(col(WorkflowStepResult.created_at) < self.cutoff())
+                )
+                session.add(
+                    WorkflowStepResult(
+                        task=task,
+                        fingerprint=fingerprint,
+                        domain=domain,
+                        provider=response.provider,
+                        model=response.model,
+                        content=response.content,
+                        response_metadata=_json_safe(response.metadata),
+                    )
+                )
+                session.commit()
+        except SQLAlchemyError as exc:
+            # A concurrent run may have stored the same fingerprint; either copy is valid.
+            logger.warning("workflow.step_store_write_failed", task=task, error=str(exc))
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import structlog
+from celery import shared_task
+
+from app.config import get_settings
+from app.services.alert_service import AlertService
+from app.services.email_service import EmailService
+
+settings = get_settings()
+logger = structlog.get_logger()
+alert_service = AlertService()
+# One pool per worker process, shared by every email task it runs.
+email_service = EmailService()
+
+
+@shared_task(name="send_alert_digest_task", bind=True, max_retries=settings.alert_digest_max_retries)
+def send_alert_digest_task(self) -> int:  # type: ignore[no-untyped-def]
+    try:
+        return alert_service.send_digest()
+    except Exception as exc:
+        logger.error("alerts.digest_task_failed", retries=self.request.retries, error=str(exc))
+        # The digest was requeued; once retries run out the next scheduled digest picks it up.
+        raise self.retry(exc=exc, countdown=60 * 2 ** self.request.retries) from exc
+
+
+@shared_task(name="send_alert_email_task", bind=True, max_retries=settings.alert_email_max_retries)
+def send_alert_email_task(self, subject: str, body: str, recipients: list[str]) -> int:  # type: ignore[no-untyped-def]
+    failed = email_service.send(recipients, subject, body)
+    if not failed:
+        return len(recipients)
+    if self.request.retries >= self.max_retries:
+        logger.error("alerts.email_gave_up", recipients=failed)
+        return len(recipients) - len(failed)
+    # Only the recipients that failed are retried, with exponential backoff.
+    raise self.retry(
+        kwargs={"subject": subject, "body": body, "recipients": failed},
+        countdown=30 * 2 ** self.request.retries,
+    )
+
+
+def enqueue_alert_email(subject: str, body: str, recipients: list[str]) -> None:
+    send_alert_email_task.apply_async(kwargs={"subject": subject, "body": body, "recipients": recipients})
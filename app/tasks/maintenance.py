@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import structlog
+from celery import shared_task
+
+from app.db import get_session
+from app.services.archive_service import ReportArchiveService
+from app.services.retention_service import RetentionService
+
+logger = structlog.get_logger()
+archive_service = ReportArchiveService()
+retention_service = RetentionService()
+
+
+@shared_task(name="compact_history_task")
+def compact_history_task() -> dict[str, int]:
+    try:
+        with get_session() as session:
+            return retention_service.compact(session)
+    except Exception as exc:
+        logger.error("retention.failed", error=str(exc))
+        raise
+
+
+@shared_task(name="archive_report_runs_task")
+def archive_report_runs_task(days: int | None = None) -> int:
+    try:
+        with get_session() as session:
+            archived = archive_service.archive_older_than(session, days=days)
+        logger.info("archive.completed", archived=archived)
+        return archived
+    except Exception as exc:
+        logger.error("archive.failed", error=str(exc))
+        raise
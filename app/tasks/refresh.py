@@ -1,13 +1,31 @@
 from __future__ import annotations
 
+import time
+from typing import Any
+
 import structlog
 from celery import shared_task
 
+from app.config import get_settings
 from app.db import get_session
+from app.models.report import ReportRun
+from app.services.event_bus import EventPublisher
+from app.services.insight_batch_service import InsightBatchService, PendingInsightBatch
+from app.services.meta_quota import MetaThrottled
 from app.services.report_service import ReportService
 
+settings = get_settings()
 logger = structlog.get_logger()
 report_service = ReportService()
+insight_batch_service = InsightBatchService(report_service=report_service)
+event_publisher = EventPublisher()
+
+
+def _publish_reports(runs: list[ReportRun]) -> None:
+    for run in runs:
+        event_publisher.publish(
+            "report.created", run.account_id, report_id=run.id, created_at=run.created_at.isoformat()
+        )
 
 
 @shared_task(name="refresh_account_task")
@@ -20,13 +38,77 @@ def refresh_account_task(account_id: str, domain: str = "example.com", timeframe
                 domain=domain,
                 timeframe=timeframe,
             )
+        _publish_reports([run])
         logger.info("refresh.completed", account_id=account_id, report_id=run.id)
         return "ok"
+    except MetaThrottled as exc:
+        # Rescheduled past the quota window rather than retried into more rate-limit errors.
+        refresh_account_task.apply_async(
+            kwargs={"account_id": account_id, "domain": domain, "timeframe": timeframe},
+            countdown=exc.retry_after,
+        )
+        logger.info("refresh.deferred", account_id=account_id, scope=exc.scope, retry_after=exc.retry_after)
+        return "deferred"
     except Exception as exc:  # noqa: BLE001
         logger.error("refresh.failed", account_id=account_id, error=str(exc))
         raise
 
 
+@shared_task(name="refresh_accounts_batch_task")
+def refresh_accounts_batch_task(accounts: list[dict[str, str]], timeframe: str = "last_7d") -> str:
+    """Refresh many accounts with one batched LLM submission instead of one call per account."""
+    try:
+        pending = insight_batch_service.submit(accounts, timeframe=timeframe)
+    except MetaThrottled as exc:
+        _defer_batch(accounts, timeframe, exc.retry_after)
+        return "deferred"
+    if pending.deferred:
+        _defer_batch(pending.deferred, timeframe, pending.retry_after)
+    # Providers that finish synchronously (the local stand-in) are collected inline.
+    with get_session() as session:
+        runs = insight_batch_service.collect(session, pending)
+    if runs is None:
+        collect_insight_batch_task.apply_async(
+            kwargs={"pending": pending.model_dump()},
+            countdown=settings.insight_batch_poll_seconds,
+        )
+        return "submitted"
+    _publish_reports(runs)
+    logger.info("refresh.batch_completed", batch_id=pending.batch_id, runs=len(runs))
+    return "ok"
+
+
+def _defer_batch(accounts: list[dict[str, str]], timeframe: str, retry_after: float) -> None:
+    refresh_accounts_batch_task.apply_async(
+        kwargs={"accounts": accounts, "timeframe": timeframe},
+        countdown=retry_after,
+    )
+    logger.info("refresh.batch_deferred", accounts=len(accounts), retry_after=retry_after)
+
+
+@shared_task(name="collect_insight_batch_task", bind=True, max_retries=None)
+def collect_insight_batch_task(self, pending: dict[str, Any]) -> str:  # type: ignore[no-untyped-def]
+    batch = PendingInsightBatch.model_validate(pending)
+    timed_out = time.time() - batch.submitted_at > settings.insight_batch_timeout_seconds
+    try:
+        with get_session() as session:
+            runs = insight_batch_service.collect(session, batch)
+    except Exception as exc:
+        # collect skips entries that were already saved, so a retry only redoes the rest.
+        logger.warning("refresh.batch_collect_failed", batch_id=batch.batch_id, error=str(exc))
+        if timed_out:
+            raise
+        raise self.retry(exc=exc, countdown=settings.insight_batch_poll_seconds) from exc
+    if runs is None:
+        if timed_out:
+            logger.error("refresh.batch_timeout", batch_id=batch.batch_id)
+            return "timeout"
+        raise self.retry(countdown=settings.insight_batch_poll_seconds)
+    _publish_reports(runs)
+    logger.info("refresh.batch_completed", batch_id=batch.batch_id, runs=len(runs))
+    return "ok"
+
+
 def enqueue_refresh(account_id: str, priority: bool = False) -> None:
     queue = "priority" if priority else "default"
     refresh_account_task.apply_async(kwargs={"account_id": account_id}, queue=queue)
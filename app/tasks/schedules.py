@@ -1,13 +1,56 @@
 from celery.schedules import crontab
 
-from app.tasks.refresh import refresh_account_task
+from app.config import get_settings
+from app.tasks.alerts import send_alert_digest_task
+from app.tasks.maintenance import archive_report_runs_task, compact_history_task
+from app.tasks.refresh import refresh_account_task, refresh_accounts_batch_task
 
-HOURLY_REFRESH_SCHEDULE = {
-    "refresh-default-account": {
-        "interval": crontab(minute=0),  # top of every hour
-        "task": refresh_account_task.s(),  # type: ignore[attr-defined]
-        "args": (),
-        "kwargs": {"account_id": "123456789", "domain": "example.com"},
+settings = get_settings()
+
+SCHEDULED_ACCOUNTS = [{"account_id": "123456789", "domain": "example.com"}]
+
+if settings.insight_batch_enabled:
+    HOURLY_REFRESH_SCHEDULE = {
+        "refresh-accounts-batch": {
+            "interval": crontab(minute=0),  # top of every hour
+            "task": refresh_accounts_batch_task.s(),  # type: ignore[attr-defined]
+            "args": (),
+            "kwargs": {"accounts": SCHEDULED_ACCOUNTS},
+        }
+    }
+else:
+    HOURLY_REFRESH_SCHEDULE = {
+        "refresh-default-account": {
+            "interval": crontab(minute=0),  # top of every hour
+            "task": refresh_account_task.s(),  # type: ignore[attr-defined]
+            "args": (),
+            "kwargs": SCHEDULED_ACCOUNTS[0],
+        }
     }
+
+MAINTENANCE_SCHEDULE = {
+    "compact-history": {
+        "interval": crontab(hour=2, minute=15),  # daily, before archiving so only survivors are archived
+        "task": compact_history_task.s(),  # type: ignore[attr-defined]
+        "args": (),
+        "kwargs": {},
+    },
+    "archive-report-runs": {
+        "interval": crontab(hour=3, minute=15),  # daily, off the top-of-hour refresh peak
+        "task": archive_report_runs_task.s(),  # type: ignore[attr-defined]
+        "args": (),
+        "kwargs": {},
+    },
 }
 
+if settings.alert_digest_enabled:
+    ALERT_DIGEST_SCHEDULE = {
+        "send-alert-digest": {
+            "interval": crontab(minute=f"*/{settings.alert_digest_interval_minutes}"),
+            "task": send_alert_digest_task.s(),  # type: ignore[attr-defined]
+            "args": (),
+            "kwargs": {},
+        }
+    }
+else:
+    ALERT_DIGEST_SCHEDULE = {}
@@ -1,6 +1,8 @@
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 
 from app.config import get_settings
+from app.services.http_clients import close_sync_clients, start_sync_clients
 
 settings = get_settings()
 
@@ -14,9 +16,13 @@ celery_app.autodiscover_tasks(["app.tasks"])
 
 @celery_app.on_after_configure.connect
 def setup_periodic_tasks(sender, **kwargs):  # type: ignore[no-untyped-def]
-    from app.tasks.schedules import HOURLY_REFRESH_SCHEDULE
+    from app.tasks.schedules import (
+        ALERT_DIGEST_SCHEDULE,
+        HOURLY_REFRESH_SCHEDULE,
+        MAINTENANCE_SCHEDULE,
+    )
 
-    for name, schedule in HOURLY_REFRESH_SCHEDULE.items():
+    for name, schedule in {**HOURLY_REFRESH_SCHEDULE, **MAINTENANCE_SCHEDULE, **ALERT_DIGEST_SCHEDULE}.items():
         sender.add_periodic_task(  # type: ignore[attr-defined]
             schedule["interval"],
             schedule["task"],
@@ -25,3 +31,20 @@ def setup_periodic_tasks(sender, **kwargs):  # type: ignore[no-untyped-def]
             kwargs=schedule.get("kwargs", {}),
         )
 
+
+@worker_process_init.connect
+def open_http_clients(**kwargs):  # type: ignore[no-untyped-def]
+    # Each prefork child gets its own pools; they are reused by every task it runs.
+    start_sync_clients()
+
+
+@worker_process_shutdown.connect
+def close_http_clients(**kwargs):  # type: ignore[no-untyped-def]
+    close_sync_clients()
+
+
+@worker_process_shutdown.connect
+def close_smtp_pool(**kwargs):  # type: ignore[no-untyped-def]
+    from app.tasks.alerts import email_service
+
+    email_service.pool.close()
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from celery import shared_task
+
+from app.config import get_settings
+from app.services.workflow_job_service import WorkflowJobService
+
+settings = get_settings()
+job_service = WorkflowJobService()
+
+
+@shared_task(name="run_workflow_job_task", time_limit=settings.workflow_job_time_limit_seconds)
+def run_workflow_job_task(job_id: str) -> str:
+    # Failures are recorded on the job row; LLM workflows are not retried automatically.
+    return job_service.run(job_id)
+
+
+def enqueue_workflow_job(job_id: str) -> None:
+    run_workflow_job_task.apply_async(kwargs={"job_id": job_id})
@@ -0,0 +1,108 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.config import get_settings
+from app.services.batch_providers import BatchRequest, BatchResult, LocalBatchProvider
+
+
+@pytest.fixture(autouse=True)
+def _auth_optional(monkeypatch):
+    """Route tests call endpoints without tokens; test_auth_middleware turns auth back on."""
+    monkeypatch.setattr(get_settings(), "auth_required", False)
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite shared across threads, with every table created."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def session_factory(engine):
+    """Stand-in for ``app.db.get_session`` for services that open their own sessions."""
+
+    @contextmanager
+    def factory():
+        with Session(engine) as session:
+            yield session
+
+    return factory
+
+
+# Stand-ins for the services InsightBatchService drives, shared by the batch and quota tests.
+def echo_batch_request(request: BatchRequest) -> BatchResult:
+    if "fail" in request.custom_id:
+        raise RuntimeError("upstream error")
+    return BatchResult(custom_id=request.custom_id, content=f"insight:{request.custom_id}", provider="local", model="stub")
+
+
+class StubInsightService:
+    def render_prompt(self, meta, competitor):
+        return f"prompt {meta['account']}"
+
+    def generate(self, meta, competitor, account_id=None):
+        return {"text": "sync fallback", "provider": "claude", "model": "default"}
+
+
+class StubUsageService:
+    def __init__(self):
+        self.records = []
+
+    def record(self, record):
+        self.records.append(record)
+
+
+class StubReportService:
+    def __init__(self):
+        self.insight_service = StubInsightService()
+        self.saved = []
+        self.fail_for = set()  # account IDs whose save_report raises
+
+    def fetch_overviews(self, account_ids):
+        return {account_id: {"account": account_id} for account_id in account_ids}
+
+    def fetch_breakdowns(self, account_ids):
+        return {account_id: {} for account_id in account_ids}
+
+    def fetch_competitors(self, domains):
+        return {domain: {"domain": domain} for domain in domains}
+
+    def fetch_data(self, account_id, domain, breakdowns=None, meta=None, competitor=None):
+        return meta, competitor
+
+    def saved_batch_entries(self, db, batch_id, account_ids, since):
+        return {run["batch"]["custom_id"] for run in self.saved if run["batch"]["batch_id"] == batch_id}
+
+    def save_report(self, db, **kwargs):
+        if kwargs["account_id"] in self.fail_for:
+            raise RuntimeError("database unavailable")
+        self.saved.append(kwargs)
+        return kwargs
+
+
+@pytest.fixture
+def stub_report_service():
+    return StubReportService()
+
+
+@pytest.fixture
+def stub_usage_service():
+    return StubUsageService()
+
+
+@pytest.fixture
+def local_batch_provider():
+    """Completes every request on submit; custom IDs containing "fail" come back as errors."""
+    return LocalBatchProvider(generate=echo_batch_request)
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from app import dependencies
+from app.main import app
+from app.routers import workflow
+from app.services.admission import AdmissionController, Overloaded
+from app.services.ai_providers import AIProviderFactory, AIResponse
+from app.services.model_router import ModelRouter, RoutingRule
+from app.services.rate_limiter import TokenBucketLimiter
+from app.services.usage_service import UsageService
+from app.services.workflow_step_store import WorkflowStepStore
+
+
+async def test_gate_queues_up_to_its_limit_then_sheds():
+    controller = AdmissionController(concurrency={"claude": 1}, max_queue=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit(["claude"], timeout=5):
+            await release.wait()
+
+    running = asyncio.create_task(hold())
+    queued = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+    gate = controller.gate("claude")
+    assert (gate.active, gate.waiting) == (1, 1)
+
+    with pytest.raises(Overloaded) as shed:
+        async with controller.admit(["claude"], timeout=5):
+            pass
+    assert shed.value.reason == "queue_full" and shed.value.retry_after >= 1
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert (gate.active, gate.waiting) == (0, 0)
+    assert gate.service_seconds > 0
+
+
+async def test_request_is_shed_when_expected_wait_exceeds_its_deadline():
+    controller = AdmissionController(concurrency={"gemini": 1}, max_queue=10)
+    gate = controller.gate("gemini")
+    gate.service_seconds = 3.0
+    release = asyncio.Event()
+
+    async def hold():
+        async with controller.admit(["gemini"], timeout=30):
+            await release.wait()
+
+    running = asyncio.create_task(hold())
+    await asyncio.sleep(0.01)
+    started = time.monotonic()
+    with pytest.raises(Overloaded) as shed:
+        async with controller.admit(["gemini"], timeout=5):  # 3s wait + 3s call > 5s
+            pass
+    assert shed.value.reason == "deadline"
+    assert time.monotonic() - started < 0.1  # rejected up front, not after queueing
+    release.set()
+    await running
+
+
+def test_shed_task_request_gets_503_with_retry_after(monkeypatch):
+    monkeypatch.setattr(workflow, "admission", AdmissionController(default_concurrency=1, max_queue=0))
+    monkeypatch.setattr(dependencies, "rate_limiter", TokenBucketLimiter(client=fakeredis.FakeRedis(decode_responses=True)))
+    monkeypatch.setattr(
+        workflow.workflow_service,
+        "execute_task",
+        lambda **kwargs: AIResponse(content="ok", provider=kwargs["provider"], model="m"),
+    )
+    client = TestClient(app)
+    body = {"task": "executive_summary", "prompt": "hi", "provider": "claude"}
+    assert client.post("/workflow/task", json=body).json()["content"] == "ok"
+
+    gate = workflow.admission.gate("claude")
+    gate._slots = asyncio.Semaphore(0)  # the only slot is busy
+    response = client.post("/workflow/task", json=body)
+    assert response.status_code == 503
+    assert response.json()["reason"] == "queue_full"
+    assert int(response.headers["retry-after"]) >= 1
+
+
+def test_workflow_is_admitted_on_the_routed_providers(monkeypatch, session_factory):
+    monkeypatch.setattr(workflow, "admission", AdmissionController(default_concurrency=1, max_queue=0))
+    monkeypatch.setattr(dependencies, "rate_limiter", TokenBucketLimiter(client=fakeredis.FakeRedis(decode_responses=True)))
+    monkeypatch.setattr(AIProviderFactory, "list_available_providers", classmethod(lambda cls: ["claude", "gemini"]))
+    service = workflow.workflow_service
+    monkeypatch.setattr(service, "step_store", WorkflowStepStore(session_factory))
+    rules = [RoutingRule(name="all-gemini", provider="gemini", model="gemini-1.5-flash")]
+    router = ModelRouter(rules=rules, usage_service=UsageService(session_factory), budgets={}, dry_run=False)
+    monkeypatch.setattr(service, "router", router)
+    monkeypatch.setattr(
+        service,
+        "execute_task",
+        lambda task, prompt, provider, **kwargs: AIResponse(content="ok", provider=provider, model=kwargs["model"]),
+    )
+    client = TestClient(app)
+    body = {"domain": "shop.com", "force_refresh": True}
+
+    # Unrouted, most steps would call claude; its only slot is busy, but routing moved every step off it.
+    workflow.admission.gate("claude")._slots = asyncio.Semaphore(0)
+    response = client.post("/workflow/execute", json=body)
+    assert response.status_code == 200
+    assert {step["provider"] for step in response.json()["workflow_metadata"].values()} == {"gemini"}
+
+    workflow.admission.gate("gemini")._slots = asyncio.Semaphore(0)
+    response = client.post("/workflow/execute", json=body)
+    assert response.status_code == 503
+    assert response.json()["reason"] == "queue_full"
@@ -0,0 +1,109 @@
+import fakeredis
+import httpx
+import pytest
+from sqlmodel import select
+
+from app.models.report import AlertEvent
+from app.services import alert_service as alert_service_module
+from app.services.alert_service import AlertService, alert_fingerprint
+from app.services.event_bus import EventPublisher
+
+
+def _alert(account_id="1", severity="warning", alert_type="roas_drop"):
+    return {"account_id": account_id, "alert_type": alert_type, "severity": severity, "message": "ROAS fell"}
+
+
+def test_fingerprint_buckets_equivalent_severities():
+    assert alert_fingerprint("1", "roas_drop", "warning") == alert_fingerprint("1", "roas_drop", "Medium")
+    assert alert_fingerprint("1", "roas_drop", "warning") != alert_fingerprint("1", "roas_drop", "critical")
+
+
+def test_repeats_are_suppressed_and_reported_in_one_digest(db, monkeypatch):
+    posted = []
+
+    async def fake_post(self, body):
+        posted.append(body)
+
+    monkeypatch.setattr(AlertService, "_post_webhook", fake_post)
+    monkeypatch.setattr(alert_service_module.settings, "alert_digest_enabled", True)
+    monkeypatch.setattr(alert_service_module.settings, "smtp_host", "smtp.test")
+    monkeypatch.setattr(alert_service_module.settings, "alert_emails", "ops@example.com, ads@example.com")
+    emails = []
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    pubsub = redis_client.pubsub()
+    pubsub.psubscribe("events:*")
+    service = AlertService(
+        client=redis_client,
+        email_dispatcher=lambda subject, body, recipients: emails.append((subject, recipients)),
+        publisher=EventPublisher(client=redis_client),
+    )
+    service.webhook_url = "https://hooks.test/alerts"
+
+    for _ in range(3):
+        service.raise_alert(db, _alert())
+    service.raise_alert(db, _alert(severity="critical"))
+    service.raise_alert(db, _alert(account_id="2"))
+
+    assert len(db.exec(select(AlertEvent)).all()) == 3
+    published = [m for m in iter(pubsub.get_message, None) if m["type"] == "pmessage"]
+    assert [m["channel"] for m in published] == ["events:1", "events:1", "events:2"]
+    assert posted == [] and emails == []  # nothing sent individually while digests are enabled
+
+    assert service.send_digest() == 3
+    assert len(posted) == 1
+    digest = posted[0]
+    assert digest["severity_counts"] == {"medium": 2, "high": 1}
+    assert digest["suppressed"] == {"1:roas_drop:medium": 2}
+    assert "3 new alerts across 2 accounts (2 repeats suppressed)" == digest["text"]
+
+    assert emails == [("Alert digest: " + digest["text"], ["ops@example.com", "ads@example.com"])]
+
+    assert service.send_digest() == 0
+    assert len(posted) == 1
+
+
+def test_failed_persist_does_not_suppress_the_retry(db, monkeypatch):
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    service = AlertService(
+        client=redis_client, email_dispatcher=lambda *args: None, publisher=EventPublisher(client=redis_client)
+    )
+    monkeypatch.setattr(alert_service_module.settings, "alert_digest_enabled", True)
+
+    def db_down(db, payload):
+        raise RuntimeError("database unavailable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(service, "persist_alert", db_down)
+        with pytest.raises(RuntimeError):
+            service.raise_alert(db, _alert())
+
+    assert service.raise_alert(db, _alert()) is not None
+    assert len(db.exec(select(AlertEvent)).all()) == 1
+
+
+def test_failed_digest_is_requeued_for_the_retry(db, monkeypatch):
+    attempts = []
+
+    async def flaky_post(self, body):
+        attempts.append(body)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("webhook down")
+
+    monkeypatch.setattr(AlertService, "_post_webhook", flaky_post)
+    monkeypatch.setattr(alert_service_module.settings, "alert_digest_enabled", True)
+    redis_client = fakeredis.FakeRedis(decode_responses=True)
+    service = AlertService(
+        client=redis_client, email_dispatcher=lambda *args: None, publisher=EventPublisher(client=redis_client)
+    )
+    service.webhook_url = "https://hooks.test/alerts"
+    service.raise_alert(db, _alert())
+    service.raise_alert(db, _alert())
+    service.raise_alert(db, _alert(account_id="2"))
+
+    with pytest.raises(httpx.ConnectError):
+        service.send_digest()
+    assert service.send_digest() == 2
+
+    assert attempts[1]["alerts"] == attempts[0]["alerts"]
+    assert [alert["account_id"] for alert in attempts[1]["alerts"]] == ["1", "2"]
+    assert attempts[1]["suppressed"] == {"1:roas_drop:medium": 1}
@@ -0,0 +1,71 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.dependencies import get_db_session
+from app.main import app
+from app.models.report import AlertEvent
+from app.routers import alerts
+
+
+@pytest.fixture
+def client(db):
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    for i in range(12):
+        db.add(
+            AlertEvent(
+                account_id="a" if i % 2 else "b",
+                alert_type="roas_drop" if i % 3 else "spend_spike",
+                severity="high" if i % 4 == 0 else "low",
+                message=f"alert {i}",
+                # Pairs share a timestamp so the id tiebreak in the cursor matters.
+                created_at=start + timedelta(minutes=i // 2),
+            )
+        )
+    db.commit()
+    app.dependency_overrides[get_db_session] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_keyset_pages_cover_every_match_once(client):
+    http = client
+    seen, cursor = [], None
+    while True:
+        params = {"account_ids": "a", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = http.get("/alerts/", params=params)
+        assert resp.status_code == 200
+        seen += [alert["message"] for alert in resp.json()]
+        cursor = resp.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert seen == [f"alert {i}" for i in (11, 9, 7, 5, 3, 1)]
+
+
+def test_filters_and_count_estimate(client, monkeypatch):
+    http = client
+    resp = http.get("/alerts/", params={"severity": "high", "alert_type": "spend_spike", "with_total": "true"})
+    assert [alert["message"] for alert in resp.json()] == ["alert 0"]
+    assert resp.headers["x-total-estimate"] == "1"
+    assert resp.headers["x-total-exact"] == "true"
+
+    monkeypatch.setattr(alerts.query_service, "count_cap", 5)
+    resp = http.get("/alerts/", params={"with_total": "true", "limit": 1})
+    assert resp.headers["x-total-estimate"] == "5"
+    assert resp.headers["x-total-exact"] == "false"
+
+    assert http.get("/alerts/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_list_query_uses_composite_index(engine):
+    with engine.connect() as conn:
+        plan = conn.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT id FROM alert_events WHERE account_id IN ('a') "
+                "ORDER BY created_at DESC, id DESC LIMIT 50"
+            )
+        ).all()
+    assert any("ix_alert_events_account_created_id" in row[-1] for row in plan)
@@ -0,0 +1,97 @@
+import time
+
+import fakeredis
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app import dependencies
+from app.config import get_settings
+from app.main import app
+from app.middleware import TokenVerifier
+from app.services.rate_limiter import BucketLimit, TokenBucketLimiter
+
+settings = get_settings()
+
+
+def _token(sub: str = "owner@agency.test", ttl: int = 60, **claims) -> str:
+    return jwt.encode({"sub": sub, "exp": int(time.time()) + ttl, **claims}, settings.jwt_secret, algorithm="HS256")
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "auth_required", True)
+    monkeypatch.setattr(dependencies, "rate_limiter", TokenBucketLimiter(client=fakeredis.FakeRedis(decode_responses=True)))
+    return TestClient(app)
+
+
+def test_protected_routes_need_a_valid_token(client):
+    assert client.get("/health").status_code == 200
+    response = client.get("/workflow/providers")
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+    assert client.get("/workflow/providers", headers={"Authorization": "Bearer nope"}).status_code == 401
+    expired = _token(ttl=-10)
+    assert client.get("/workflow/providers", headers={"Authorization": f"Bearer {expired}"}).status_code == 401
+
+    headers = {"Authorization": f"Bearer {_token()}"}
+    assert client.get("/workflow/providers", headers=headers).status_code == 200
+    assert client.get(f"/workflow/providers?access_token={_token()}").status_code == 200
+
+
+def test_verifier_caches_claims_until_token_expiry(monkeypatch):
+    verifier = TokenVerifier(ttl_seconds=300, max_entries=2)
+    token = _token(ttl=5)
+    calls = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(jwt, "decode", lambda *a, **kw: calls.append(1) or real_decode(*a, **kw))
+
+    assert verifier.verify(token)["sub"] == "owner@agency.test"
+    verifier.verify(token)
+    assert len(calls) == 1
+    # The cache entry is bounded by exp, not the 300s TTL.
+    assert verifier._cache[token][0] <= time.time() + 5
+
+    verifier.verify(_token("a@x.test"))
+    verifier.verify(_token("b@x.test"))
+    assert token not in verifier._cache  # least recently used is evicted
+
+
+def test_rate_limit_returns_429_per_tenant(client, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limits", {"refresh": {"capacity": 2, "per_minute": 1}})
+    monkeypatch.setattr("app.routers.reports.enqueue_refresh", lambda **kwargs: None)
+    alice = {"Authorization": f"Bearer {_token('alice@a.test')}"}
+    bob = {"Authorization": f"Bearer {_token('bob@b.test')}"}
+
+    for _ in range(2):
+        assert client.post("/reports/123/refresh", json={}, headers=alice).status_code == 202
+    limited = client.post("/reports/123/refresh", json={}, headers=alice)
+    assert limited.status_code == 429
+    assert 1 <= int(limited.headers["retry-after"]) <= 60
+    assert client.post("/reports/123/refresh", json={}, headers=bob).status_code == 202
+
+
+def test_token_bucket_refills_and_fails_open(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limits", {"traffic": {"capacity": 3, "per_minute": 60}})
+    limiter = TokenBucketLimiter(client=fakeredis.FakeRedis(decode_responses=True))
+    now = [1000.0]
+    monkeypatch.setattr("app.services.rate_limiter.time.time", lambda: now[0])
+
+    assert limiter.take("t", "traffic", cost=10).allowed  # oversized batch drains the bucket
+    denied = limiter.take("t", "traffic")
+    assert not denied.allowed and denied.retry_after == pytest.approx(1.0)
+    now[0] += 2
+    assert limiter.take("t", "traffic", cost=2).allowed
+    assert limiter.take("t", "unconfigured").allowed
+
+    broken = fakeredis.FakeRedis(decode_responses=True)
+    broken.connected = False
+    assert TokenBucketLimiter(client=broken).take("t", "traffic").allowed
+
+
+def test_bucket_limit_rejects_non_positive_values():
+    with pytest.raises(ValidationError):
+        BucketLimit(capacity=0, per_minute=10)
+    with pytest.raises(ValidationError):
+        BucketLimit(capacity=10, per_minute=-1)
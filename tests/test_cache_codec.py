@@ -0,0 +1,47 @@
+import json
+from datetime import UTC, datetime
+
+import pytest
+
+from app.services.cache_codec import HEADER_SIZE, MAGIC, SnapshotCodec, _msgpack_default
+
+
+def test_roundtrip_small_payload_is_not_compressed():
+    codec = SnapshotCodec(compression="zlib", compress_min_bytes=1024)
+    value = codec.encode({"account_id": "1", "spend": 12.5})
+
+    assert value.startswith(MAGIC)
+    assert value[HEADER_SIZE - 1] == 0
+    assert codec.decode(value) == {"account_id": "1", "spend": 12.5}
+
+
+def test_large_payload_is_compressed():
+    codec = SnapshotCodec(compression="zlib", compress_min_bytes=64)
+    payload = {"raw_data": [{"visits": i, "domain": "example.com"} for i in range(500)]}
+    value = codec.encode(payload)
+
+    assert codec.decode(value) == payload
+    stats = codec.size_stats()
+    assert stats["stored_bytes"] < stats["raw_bytes"]
+    assert stats["compression_ratio"] > 1
+
+
+def test_legacy_json_entries_remain_readable():
+    codec = SnapshotCodec()
+    legacy = json.dumps({"account_id": "1"}).encode()
+
+    assert codec.decode(legacy) == {"account_id": "1"}
+    assert codec.stats["legacy_reads"] == 1
+
+
+def test_msgpack_encodes_datetimes_like_orjson():
+    created = datetime(2026, 10, 19, 3, 4, 5, tzinfo=UTC)
+    assert _msgpack_default(created) == "2026-10-19T03:04:05+00:00"
+    with pytest.raises(TypeError):
+        _msgpack_default(object())
+
+    pytest.importorskip("msgpack")
+    payload = {"created_at": created, "spend": 1.5}
+    as_json = SnapshotCodec(codec="orjson")
+    as_msgpack = SnapshotCodec(codec="msgpack")
+    assert as_msgpack.decode(as_msgpack.encode(payload)) == as_json.decode(as_json.encode(payload))
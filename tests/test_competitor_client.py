@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+
+from app.services.competitor_client import CompetitorIntelClient
+
+
+class StubTrafficService:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    async def get_traffic_data(self, domain):
+        self.calls.append(domain)
+        await asyncio.sleep(0)
+        return {"domain": domain, "monthly_visits": 1000}
+
+    async def close(self):
+        pass
+
+
+def _client(handler, traffic):
+    return CompetitorIntelClient(
+        api_key="k",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        traffic_service=traffic,
+    )
+
+
+async def test_market_share_and_traffic_fetched_once_each():
+    traffic = StubTrafficService()
+    client = _client(lambda request: httpx.Response(200, json={"traffic_share": 0.5}), traffic)
+
+    result = await client.fetch_market_share("a.com")
+
+    assert result["traffic_share"] == 0.5
+    assert result["traffic"]["domain"] == "a.com"
+    assert traffic.calls == ["a.com"]
+
+
+async def test_fallback_reuses_traffic_result_for_many_domains():
+    traffic = StubTrafficService()
+    client = _client(lambda request: httpx.Response(503), traffic)
+
+    results = await client.fetch_market_share_many(["a.com", "b.com", "a.com"])
+
+    assert set(results) == {"a.com", "b.com"}
+    assert results["b.com"]["benchmark_cpc"] == 0.38
+    assert sorted(traffic.calls) == ["a.com", "b.com"]
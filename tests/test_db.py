@@ -0,0 +1,35 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, select
+
+from app.db import init_db
+from app.models.report import ReportRun
+
+
+def test_init_db_adds_columns_missing_from_an_older_schema():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as conn:
+        # report_runs as it was before insight_structured and archive_path existed.
+        conn.execute(
+            text(
+                "CREATE TABLE report_runs (id INTEGER PRIMARY KEY, account_id VARCHAR NOT NULL, "
+                "timeframe VARCHAR NOT NULL, meta_payload JSON, competitor_payload JSON, "
+                "insight_text VARCHAR NOT NULL, insight_metadata JSON, artifacts_path VARCHAR, "
+                "created_at DATETIME NOT NULL)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO report_runs (account_id, timeframe, insight_text, created_at) "
+                "VALUES ('acct', 'last_7d', 'old insight', '2024-01-01 00:00:00')"
+            )
+        )
+
+    init_db(engine)
+    init_db(engine)  # idempotent
+
+    with Session(engine) as db:
+        run = db.exec(select(ReportRun)).one()
+    assert run.insight_text == "old insight"
+    assert run.archive_path is None and not run.insight_structured
+    engine.dispose()
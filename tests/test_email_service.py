@@ -0,0 +1,120 @@
+import smtplib
+import socketserver
+import threading
+
+import pytest
+
+from app.services.email_service import EmailService, SMTPPool
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Just enough SMTP for smtplib: counts connections and records delivered messages."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, refuse: set[str] | None = None):
+        self.connections = 0
+        self.messages: list[tuple[list[str], str]] = []
+        self.refuse = refuse or set()
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        server: SMTPStandIn = self.server  # type: ignore[assignment]
+        with server.lock:
+            server.connections += 1
+        self.reply("220 stand-in ready")
+        recipients: list[str] = []
+        while line := self.rfile.readline().decode().strip():
+            command = line.split(" ", 1)[0].upper()
+            if command in ("EHLO", "HELO"):
+                self.reply("250 stand-in")
+            elif command == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                address = line.split(":", 1)[1].strip("<> ")
+                if address in server.refuse:
+                    self.reply("550 no such user")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                body = []
+                while (data := self.rfile.readline().decode()) != ".\r\n":
+                    body.append(data)
+                with server.lock:
+                    server.messages.append((recipients, "".join(body)))
+                self.reply("250 queued")
+            elif command in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPStandIn(refuse={"gone@example.com"})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_batches_reuse_pooled_connections(smtp_server):
+    pool = SMTPPool(host="127.0.0.1", port=smtp_server.server_address[1], use_tls=False, username="", size=2)
+    service = EmailService(pool=pool, sender="alerts@test")
+    recipients = [f"user{i}@example.com" for i in range(6)] + ["gone@example.com"]
+
+    assert service.send(recipients, "Alert digest", "3 new alerts") == []
+    assert service.send(recipients[:3], "Alert digest", "1 new alert") == []
+
+    assert len(smtp_server.messages) == 9
+    assert {tuple(to) for to, _ in smtp_server.messages} >= {("user0@example.com",)}
+    # Two bursts of sends, never more than the pool size in connections.
+    assert smtp_server.connections == pool.opened <= 2
+    pool.close()
+
+
+def test_unreachable_server_reports_recipients_for_retry():
+    pool = SMTPPool(host="127.0.0.1", port=1, use_tls=False, username="", size=1, timeout=1)
+    service = EmailService(pool=pool, sender="alerts@test")
+
+    assert service.send(["a@example.com"], "s", "b") == ["a@example.com"]
+
+
+def test_connection_is_closed_when_login_fails():
+    opened = []
+
+    class RejectingSMTP:
+        def __init__(self, host, port, timeout):
+            self.closed = False
+            opened.append(self)
+
+        def starttls(self):
+            pass
+
+        def login(self, username, password):
+            raise smtplib.SMTPAuthenticationError(535, b"bad credentials")
+
+        def close(self):
+            self.closed = True
+
+    pool = SMTPPool(host="smtp.test", username="u", password="p", use_tls=True, smtp_factory=RejectingSMTP)
+    for _ in range(2):
+        with pytest.raises(smtplib.SMTPAuthenticationError), pool.connection():
+            pass
+
+    assert len(opened) == 2 and all(conn.closed for conn in opened)
+    assert pool.opened == 0
@@ -0,0 +1,70 @@
+import asyncio
+
+import fakeredis
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.event_bus import EventBroker, EventPublisher
+
+
+def _bus(max_queue=100):
+    server = fakeredis.FakeServer()
+    publisher = EventPublisher(client=fakeredis.FakeRedis(server=server))
+    broker = EventBroker(client=fakeredis.FakeAsyncRedis(server=server), max_queue=max_queue)
+    return publisher, broker
+
+
+async def _drain(subscription, timeout=0.2):
+    events = []
+    while (event := await subscription.next(timeout)) is not None:
+        events.append(event)
+    return events
+
+
+async def test_events_are_fanned_out_by_account():
+    publisher, broker = _bus()
+    try:
+        async with broker.subscribe(["1"]) as only_one, broker.subscribe() as everything:
+            publisher.publish("report.created", "1", report_id=10)
+            publisher.publish("alert.created", "2", alert_id=5)
+
+            assert [(e["type"], e["account_id"]) for e in await _drain(only_one)] == [("report.created", "1")]
+            assert [e["account_id"] for e in await _drain(everything)] == ["1", "2"]
+            # Nothing pending: the caller sends a heartbeat.
+            assert await only_one.next(0.01) is None
+    finally:
+        await broker.close()
+
+
+async def test_slow_subscriber_gets_lag_notice_instead_of_blocking():
+    publisher, broker = _bus(max_queue=2)
+    try:
+        async with broker.subscribe() as slow:
+            for report_id in range(5):
+                publisher.publish("report.created", "1", report_id=report_id)
+            await asyncio.sleep(0.2)
+
+            events = await _drain(slow)
+            assert events[0] == {"type": "lagged", "dropped": 3}
+            assert [e["report_id"] for e in events[1:]] == [0, 1]
+    finally:
+        await broker.close()
+
+
+async def test_bad_payload_is_skipped_and_listener_keeps_running():
+    publisher, broker = _bus()
+    try:
+        async with broker.subscribe(["1"]) as subscription:
+            publisher.client.publish("events:1", b"not json")
+            publisher.client.publish("events:1", b"[1, 2]")
+            publisher.publish("report.created", "1", report_id=10)
+
+            assert [e["report_id"] for e in await _drain(subscription)] == [10]
+    finally:
+        await broker.close()
+
+
+def test_stream_requires_an_account_filter():
+    client = TestClient(app)
+    assert client.get("/events/stream").status_code == 422
+    assert client.get("/events/stream", params={"account_ids": " , "}).status_code == 422
@@ -0,0 +1,22 @@
+import pytest
+
+from app.services.http_clients import close_sync_clients, http_clients, run_sync
+
+
+async def _client(name):
+    return http_clients.get(name)
+
+
+def test_sync_clients_are_reused_across_calls_and_closed_on_shutdown():
+    first = run_sync(_client("meta"))
+    assert run_sync(_client("meta")) is first
+    assert run_sync(_client("webhook")) is not first
+
+    close_sync_clients()
+
+    assert first.is_closed
+
+
+async def test_unknown_upstream_is_rejected():
+    with pytest.raises(ValueError):
+        http_clients.get("nope")
@@ -0,0 +1,50 @@
+import pytest
+
+from app.services.batch_providers import BatchRequest
+from app.services.insight_batch_service import InsightBatchService
+
+
+def test_local_batch_provider_completes_on_submit(local_batch_provider):
+    provider = local_batch_provider
+    batch_id = provider.submit([BatchRequest(custom_id="a", prompt="p"), BatchRequest(custom_id="fail", prompt="p")])
+
+    assert provider.is_complete(batch_id)
+    results = {r.custom_id: r for r in provider.results(batch_id)}
+    assert results["a"].content == "insight:a"
+    assert not results["fail"].succeeded
+
+
+def test_batch_service_writes_runs_and_falls_back_on_failures(
+    stub_report_service, stub_usage_service, local_batch_provider
+):
+    report_service, usage = stub_report_service, stub_usage_service
+    service = InsightBatchService(report_service=report_service, provider=local_batch_provider, usage_service=usage)
+
+    pending = service.submit([{"account_id": "1", "domain": "a.com"}, {"account_id": "fail", "domain": "b.com"}])
+    runs = service.collect(None, pending)
+
+    assert len(runs) == 2
+    texts = {run["account_id"]: run["insight"]["text"] for run in report_service.saved}
+    assert texts == {"1": "insight:1-0", "fail": "sync fallback"}
+    assert {(r.account_id, r.task, r.error) for r in usage.records} == {
+        ("1", "insight_batch", False),
+        ("fail", "insight_batch", True),
+    }
+
+
+def test_recollecting_after_a_failure_skips_saved_entries(
+    stub_report_service, stub_usage_service, local_batch_provider
+):
+    report_service, usage = stub_report_service, stub_usage_service
+    report_service.fail_for.add("2")
+    service = InsightBatchService(report_service=report_service, provider=local_batch_provider, usage_service=usage)
+    pending = service.submit([{"account_id": "1", "domain": "a.com"}, {"account_id": "2", "domain": "b.com"}])
+
+    with pytest.raises(RuntimeError):
+        service.collect(None, pending)
+    report_service.fail_for.clear()
+    runs = service.collect(None, pending)
+
+    assert [run["account_id"] for run in runs] == ["2"]
+    assert sorted(run["account_id"] for run in report_service.saved) == ["1", "2"]
+    assert sorted(record.account_id for record in usage.records) == ["1", "2"]
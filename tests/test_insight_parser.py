@@ -0,0 +1,70 @@
+from app.services.insight_parser import parse_competitors, parse_insight
+from app.services.report_service import ReportService
+
+TEMPLATE_ANSWER = """## 1. 3 Bullet Insight Summary
+
+- **ROAS** is up 12% week over week
+- CPM is flat
+
+## 2. Top Optimizations for Meta Ads to Raise ROAS
+
+1. Scale the two best ad sets
+2. Pause creatives with CTR under 0.5%
+
+Defensive Moves:
+- Watch CompetitorA's CPC trend
+"""
+
+
+def test_parse_insight_splits_sections_without_headers_or_blank_lines():
+    insight = parse_insight(TEMPLATE_ANSWER)
+
+    assert insight.summary == "ROAS is up 12% week over week\nCPM is flat"
+    assert insight.recommendations == ["Scale the two best ad sets", "Pause creatives with CTR under 0.5%"]
+    assert insight.defensive_moves == ["Watch CompetitorA's CPC trend"]
+
+
+def test_parse_insight_repairs_unstructured_text():
+    insight = parse_insight("Spend is stable.\n\n- Raise budgets\n- Refresh creative")
+
+    assert insight.summary == "Spend is stable."
+    assert insight.recommendations == ["Raise budgets", "Refresh creative"]
+
+
+def test_parse_insight_always_has_a_summary_and_never_repeats_headings_or_items():
+    only_recommendations = parse_insight("## Optimizations\n- Raise budgets\n- Refresh creative")
+
+    assert parse_insight("**").summary == "No insight generated."
+    assert only_recommendations.summary == "No insight generated."
+    assert only_recommendations.recommendations == ["Raise budgets", "Refresh creative"]
+
+
+def test_parse_competitors_repairs_json_and_falls_back_to_bullets():
+    fenced = '```json\n[{"name": "Acme", "URL": "acme.com", "strength": "price"},]\n```'
+    bullets = "Competitors:\n1. Acme (acme.com) - fast shipping\n2. Beta - beta.io - UGC"
+
+    assert [c.model_dump() for c in parse_competitors(fenced)] == [
+        {"name": "Acme", "url": "acme.com", "key_strength": "price"}
+    ]
+    assert [(c.name, c.url, c.key_strength) for c in parse_competitors(bullets)] == [
+        ("Acme", "acme.com", "fast shipping"),
+        ("Beta", "beta.io", "UGC"),
+    ]
+
+
+def test_snapshot_summary_copies_stored_sections():
+    structured = parse_insight(TEMPLATE_ANSWER).model_dump()
+    snapshot = {
+        "account_id": "1",
+        "timeframe": "last_7d",
+        "meta": {},
+        "competitor": {},
+        "insight": {"text": "ignored", "provider": "claude", "structured": structured},
+        "created_at": "2024-01-01T00:00:00+00:00",
+    }
+
+    # No I/O needed for the read path, so skip the constructor.
+    summary = ReportService.__new__(ReportService).transform_snapshot_to_summary(snapshot)
+
+    assert summary.insight.recommendations == structured["recommendations"]
+    assert summary.insight.defensive_moves == structured["defensive_moves"]
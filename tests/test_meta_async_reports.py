@@ -0,0 +1,78 @@
+import fakeredis
+import httpx
+
+from app.services.meta_async_reports import AsyncReportJob, MetaAsyncReportClient
+from app.services.meta_quota import MetaQuotaGovernor
+from app.services.report_service import top_breakdown_rows
+
+
+class GraphStandIn:
+    """Minimal local stand-in for Meta's async insights report-run flow."""
+
+    def __init__(self, polls_until_done: int = 2, failing_accounts: set[str] | None = None):
+        self.polls_until_done = polls_until_done
+        self.failing_accounts = failing_accounts or set()
+        self.polls: dict[str, int] = {}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")
+        if request.method == "POST":
+            account = parts[-2].removeprefix("act_")
+            run_id = f"run-{account}"
+            self.polls[run_id] = 0
+            return httpx.Response(200, json={"report_run_id": run_id})
+
+        run_id = parts[0]
+        if len(parts) == 1:
+            self.polls[run_id] += 1
+            if run_id.removeprefix("run-") in self.failing_accounts:
+                return httpx.Response(200, json={"async_status": "Job Failed"})
+            done = self.polls[run_id] >= self.polls_until_done
+            return httpx.Response(200, json={"async_status": "Job Completed" if done else "Job Running"})
+
+        if request.url.params.get("after") == "page2":
+            return httpx.Response(200, json={"data": [{"campaign_id": "c2"}]})
+        return httpx.Response(
+            200,
+            json={
+                "data": [{"campaign_id": "c1"}],
+                "paging": {"next": f"https://graph.test/{run_id}/insights?after=page2"},
+            },
+        )
+
+
+def _client(stand_in: GraphStandIn) -> MetaAsyncReportClient:
+    return MetaAsyncReportClient(
+        token="t",
+        base_url="https://graph.test",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(stand_in)),
+        poll_initial_seconds=0,
+        job_timeout_seconds=5,
+        governor=MetaQuotaGovernor(client=fakeredis.FakeRedis(decode_responses=True)),
+    )
+
+
+async def test_job_is_polled_and_all_pages_downloaded():
+    stand_in = GraphStandIn(polls_until_done=3)
+    result = await _client(stand_in).run(AsyncReportJob(account_id="1"))
+
+    assert result.error is None
+    assert stand_in.polls["run-1"] == 3
+    assert [row["campaign_id"] for row in result.rows] == ["c1", "c2"]
+
+
+async def test_fetch_breakdowns_multiplexes_accounts_and_skips_failures():
+    client = _client(GraphStandIn(failing_accounts={"2"}))
+    breakdowns = await client.fetch_breakdowns(["1", "2", "3"], ["campaign"])
+
+    assert len(breakdowns["1"]["campaign"]) == 2
+    assert breakdowns["2"] == {}
+    assert len(breakdowns["3"]["campaign"]) == 2
+
+
+def test_breakdowns_keep_the_highest_spend_rows_per_level():
+    rows = [{"ad_id": str(i), "spend": str(i)} for i in range(100)] + [{"ad_id": "x", "spend": None}]
+    capped = top_breakdown_rows({"ad": rows, "campaign": [{"campaign_id": "1", "spend": "5"}]}, limit=3)
+
+    assert [row["ad_id"] for row in capped["ad"]] == ["99", "98", "97"]
+    assert capped["campaign"] == [{"campaign_id": "1", "spend": "5"}]
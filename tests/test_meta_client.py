@@ -0,0 +1,55 @@
+import json
+from urllib.parse import parse_qs
+
+import fakeredis
+import httpx
+
+from app.services import meta_client as meta_client_module
+from app.services.meta_client import MetaAdsClient
+from app.services.meta_quota import MetaQuotaGovernor
+
+
+def _batch_client(handler) -> MetaAdsClient:
+    return MetaAdsClient(
+        token="t",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        governor=MetaQuotaGovernor(client=fakeredis.FakeRedis(decode_responses=True)),
+    )
+
+
+def _ok(account_id: str) -> dict:
+    return {"code": 200, "body": json.dumps({"data": [{"account_id": account_id, "spend": "1"}]})}
+
+
+async def _no_sleep(_):
+    return None
+
+
+async def test_batch_overview_splits_chunks_and_retries_only_failed(monkeypatch):
+    monkeypatch.setattr(meta_client_module.asyncio, "sleep", _no_sleep)
+    seen: list[list[str]] = []
+    flaky = {"7"}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        batch = json.loads(parse_qs(request.content.decode())["batch"][0])
+        ids = [item["relative_url"].split("/")[0].removeprefix("act_") for item in batch]
+        seen.append(ids)
+        responses = []
+        for account_id in ids:
+            if account_id in flaky:
+                flaky.discard(account_id)
+                responses.append({"code": 500, "body": json.dumps({"error": {"code": 2}})})
+            elif account_id == "9":
+                responses.append({"code": 400, "body": json.dumps({"error": {"code": 100}})})
+            else:
+                responses.append(_ok(account_id))
+        return httpx.Response(200, json=responses)
+
+    ids = [str(i) for i in range(60)]
+    overviews = await _batch_client(handler).fetch_account_overviews(ids)
+
+    assert [len(chunk) for chunk in seen] == [50, 10, 1]
+    assert seen[-1] == ["7"]
+    assert overviews["7"]["account_id"] == "7"
+    assert overviews["9"] == MetaAdsClient._fallback_overview()
+    assert list(overviews) == ids
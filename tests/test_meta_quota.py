@@ -0,0 +1,129 @@
+import json
+from urllib.parse import parse_qs
+
+import fakeredis
+import httpx
+import pytest
+
+from app.services import meta_quota
+from app.services.insight_batch_service import InsightBatchService
+from app.services.meta_client import MetaAdsClient
+from app.services.meta_quota import MetaQuotaGovernor, MetaThrottled, parse_usage_headers
+
+
+def _governor() -> MetaQuotaGovernor:
+    return MetaQuotaGovernor(client=fakeredis.FakeRedis(decode_responses=True), soft_pct=75, hard_pct=95)
+
+
+def test_usage_headers_are_parsed_per_scope():
+    headers = {
+        "x-app-usage": json.dumps({"call_count": 12, "total_time": 40, "total_cputime": 3}),
+        "x-business-use-case-usage": json.dumps(
+            {"biz1": [{"type": "ads_insights", "call_count": 80, "estimated_time_to_regain_access": 2}]}
+        ),
+        "x-ad-account-usage": json.dumps({"acc_id_util_pct": 30, "reset_time_duration": 120}),
+    }
+
+    readings = parse_usage_headers(headers, account_id="42")
+
+    assert readings["app"] == (40.0, 0.0)
+    assert readings["business:biz1"] == (80.0, 120.0)
+    assert readings["account:42"] == (80.0, 120.0)
+
+
+async def test_soft_usage_paces_and_hard_usage_defers(monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    monkeypatch.setattr(meta_quota.asyncio, "sleep", fake_sleep)
+    governor = _governor()
+
+    governor.record({"x-ad-account-usage": json.dumps({"acc_id_util_pct": 85})}, account_id="1")
+    await governor.throttle("1")
+    assert slept == [pytest.approx(5.0)]
+
+    await governor.throttle("2")  # other accounts are unaffected
+    assert len(slept) == 1
+
+    governor.record({"x-ad-account-usage": json.dumps({"acc_id_util_pct": 97})}, account_id="1")
+    with pytest.raises(MetaThrottled) as exc_info:
+        await governor.throttle("1")
+    assert exc_info.value.scope == "account:1"
+    assert exc_info.value.retry_after > 15
+
+
+async def test_throttled_sub_requests_are_deferred_not_retried():
+    governor = _governor()
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        batch = json.loads(parse_qs(request.content.decode())["batch"][0])
+        ids = [item["relative_url"].split("/")[0].removeprefix("act_") for item in batch]
+        calls.append(ids)
+        return httpx.Response(
+            200,
+            json=[
+                {"code": 400, "body": json.dumps({"error": {"code": 80004}})}
+                if account_id == "2"
+                else {"code": 200, "body": json.dumps({"data": [{"spend": "1"}]})}
+                for account_id in ids
+            ],
+        )
+
+    client = MetaAdsClient(token="t", client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), governor=governor)
+    with pytest.raises(MetaThrottled) as exc_info:
+        await client.fetch_account_overviews(["1", "2"])
+
+    assert calls == [["1", "2"]]
+    assert exc_info.value.account_ids == ["2"]
+    assert set(exc_info.value.partial) == {"1"}
+    # The block is shared: any worker asking about account 2 now waits it out.
+    assert governor.delay_for("2")[1] == "account:2"
+
+
+def test_batch_submit_defers_throttled_accounts(
+    monkeypatch, stub_report_service, stub_usage_service, local_batch_provider
+):
+    def fetch_overviews(account_ids):
+        raise MetaThrottled(600, scope="account", account_ids=["2"], partial={"1": {"account": "1"}})
+
+    monkeypatch.setattr(stub_report_service, "fetch_overviews", fetch_overviews)
+    service = InsightBatchService(
+        report_service=stub_report_service, provider=local_batch_provider, usage_service=stub_usage_service
+    )
+    pending = service.submit([{"account_id": "1", "domain": "a.com"}, {"account_id": "2", "domain": "b.com"}])
+
+    assert [job.account_id for job in pending.jobs.values()] == ["1"]
+    assert pending.deferred == [{"account_id": "2", "domain": "b.com"}]
+    assert pending.retry_after == 600
+
+
+def test_throttles_after_the_overviews_defer_only_their_accounts(
+    monkeypatch, stub_report_service, stub_usage_service, local_batch_provider
+):
+    def fetch_breakdowns(account_ids):
+        raise MetaThrottled(300, scope="account", account_ids=["2"], partial={"1": {}, "3": {}})
+
+    def fetch_data(account_id, domain, breakdowns=None, meta=None, competitor=None):
+        if account_id == "3":
+            raise MetaThrottled(900, scope="account", account_ids=["3"])
+        return meta, competitor
+
+    monkeypatch.setattr(stub_report_service, "fetch_breakdowns", fetch_breakdowns)
+    monkeypatch.setattr(stub_report_service, "fetch_data", fetch_data)
+    service = InsightBatchService(
+        report_service=stub_report_service, provider=local_batch_provider, usage_service=stub_usage_service
+    )
+    accounts = [{"account_id": account_id, "domain": f"{account_id}.com"} for account_id in ("1", "2", "3")]
+    pending = service.submit(accounts)
+
+    assert [job.account_id for job in pending.jobs.values()] == ["1"]
+    assert [account["account_id"] for account in pending.deferred] == ["2", "3"]
+    assert pending.retry_after == 900
+
+    # Nothing left to submit: the caller gets MetaThrottled, as when every overview is throttled.
+    with pytest.raises(MetaThrottled) as exc_info:
+        service.submit([accounts[2]])
+    assert exc_info.value.account_ids == ["3"]
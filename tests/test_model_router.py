@@ -0,0 +1,64 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from app.services.ai_providers import AIProviderFactory
+from app.services.model_router import ModelRouter
+from app.services.usage_service import LLMUsageRecord, UsageService
+
+
+@pytest.fixture
+def usage(monkeypatch, session_factory):
+    monkeypatch.setattr(AIProviderFactory, "list_available_providers", classmethod(lambda cls: ["claude", "gemini"]))
+    return UsageService(session_factory)
+
+
+def _calls(usage, provider, model, count, error=False, latency=500.0, account_id="acct", tokens=0):
+    for _ in range(count):
+        usage.record(
+            LLMUsageRecord(
+                account_id=account_id,
+                task="meta_ads_diagnostic",
+                provider=provider,
+                model=model,
+                input_tokens=tokens,
+                latency_ms=latency,
+                error=error,
+                at=datetime.now(UTC),
+            )
+        )
+
+
+def test_small_diagnostics_go_to_fast_model_and_summaries_to_heavy(usage):
+    router = ModelRouter(usage_service=usage, budgets={}, dry_run=False)
+
+    diagnostic = router.route("meta_ads_diagnostic", "spend is flat", default_provider="gemini")
+    summary = router.route("executive_summary", "summarize", default_provider="gemini")
+    huge = router.route("meta_ads_diagnostic", "", default_provider="claude", prompt_tokens=20_000)
+
+    assert (diagnostic.rule, diagnostic.model) == ("fast-diagnostics", "gemini-1.5-flash")
+    assert (summary.provider, summary.rule) == ("claude", "heavy-summaries")
+    assert (huge.provider, huge.rule, huge.model) == ("claude", None, None)
+
+
+def test_unhealthy_routes_and_budgets_are_skipped(usage):
+    _calls(usage, "gemini", "gemini-1.5-flash", 3, error=True)
+    _calls(usage, "claude", "claude-3-5-haiku-20241022", 2, latency=9_000)
+    _calls(usage, "claude", "other", 1, account_id="big", tokens=5_000)
+    router = ModelRouter(usage_service=usage, budgets={"big": {"max_tokens_per_hour": 1_000}}, dry_run=False)
+
+    diagnostic = router.route("traffic_analysis", "short", default_provider="gemini")
+    summary = router.route("executive_summary", "summarize", default_provider="gemini", account_id="big")
+
+    assert diagnostic.rule is None and len(diagnostic.skipped) == 2
+    assert summary.rule is None and summary.skipped == ["heavy-summaries: tenant over token budget"]
+
+
+def test_dry_run_keeps_default_and_reports_choice(usage):
+    router = ModelRouter(usage_service=usage, budgets={}, dry_run=True)
+
+    decision = router.route("meta_ads_diagnostic", "short", default_provider="claude")
+
+    assert decision.applied is False and decision.provider == "claude" and decision.model is None
+    assert decision.would_choose == {"provider": "gemini", "model": "gemini-1.5-flash", "rule": "fast-diagnostics"}
+    assert router.route("meta_ads_diagnostic", "short", default_provider="claude", preview=True).applied
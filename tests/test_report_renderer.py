@@ -0,0 +1,86 @@
+from datetime import UTC, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_db_session
+from app.main import app
+from app.models.report import ReportRun
+from app.services.report_renderer import (
+    ReportArchived,
+    ReportRenderer,
+    render_artifact,
+    render_context,
+)
+
+
+def _run() -> ReportRun:
+    return ReportRun(
+        id=7,
+        account_id="acct",
+        timeframe="last_7d",
+        meta_payload={"spend": 1200, "purchase_roas": 3.1, "breakdowns": {"campaign": [{"id": 1}]}},
+        competitor_payload={"market_share": 0.12, "raw_data": {"visits": [1, 2, 3]}},
+        insight_text="unused",
+        insight_structured={
+            "summary": "ROAS is steady <script>alert(1)</script>",
+            "recommendations": ["Shift budget to retargeting"],
+            "defensive_moves": [],
+        },
+        insight_metadata={"provider": "claude"},
+        created_at=datetime(2024, 1, 1, tzinfo=UTC),
+    )
+
+
+def test_html_uses_structured_sections_and_escapes_llm_text():
+    html = render_artifact(render_context(_run()), "html").decode()
+
+    assert "<td>1200</td>" in html and "<th>purchase_roas</th>" in html
+    assert "<li>Shift budget to retargeting</li>" in html
+    assert "&lt;script&gt;" in html and "<script>" not in html
+    assert "Defensive moves" not in html
+    assert "raw_data" not in html and "breakdowns" not in html
+
+
+async def test_artifact_is_rendered_once_in_the_pool_then_served_from_disk(tmp_path):
+    renderer = ReportRenderer(output_dir=tmp_path, max_workers=1)
+    try:
+        path = await renderer.get_or_render(_run(), "html")
+        first_write = path.stat().st_mtime_ns
+        assert path == tmp_path / "acct" / "7.html"
+
+        renderer.shutdown()  # a cache hit must not need the pool
+        renderer._pool = None
+        again = await renderer.get_or_render(_run(), "html")
+        assert again == path and again.stat().st_mtime_ns == first_write
+        assert renderer._pool is None
+    finally:
+        renderer.shutdown()
+
+
+async def test_archived_run_is_refused_not_rendered_blank(tmp_path):
+    renderer = ReportRenderer(output_dir=tmp_path, max_workers=1)
+    run = _run()
+    run.archive_path = "account_id=acct/year=2024/part-0.parquet"
+    run.insight_structured = {}
+    try:
+        with pytest.raises(ReportArchived):
+            await renderer.get_or_render(run, "html")
+        assert not (tmp_path / "acct" / "7.html").exists()
+        assert renderer._pool is None
+    finally:
+        renderer.shutdown()
+
+
+def test_artifact_route_returns_gone_for_archived_runs(db):
+    run = _run()
+    run.archive_path = "account_id=acct/year=2024/part-0.parquet"
+    db.add(run)
+    db.commit()
+    app.dependency_overrides[get_db_session] = lambda: db
+    try:
+        client = TestClient(app)
+        assert client.get("/reports/acct/artifact", params={"format": "html"}).status_code == 410
+        assert client.get("/reports/acct/artifact", params={"format": "txt"}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,143 @@
+import csv
+import io
+import json
+from contextlib import contextmanager
+from datetime import UTC, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_db_session
+from app.main import app
+from app.models.report import ReportRun
+from app.routers import reports
+from app.services import report_export_service
+
+
+class StubCache:
+    def __init__(self, snapshots):
+        self.snapshots = snapshots
+        self.calls = 0
+
+    def get_snapshots(self, keys):
+        self.calls += 1
+        return [self.snapshots.get(key.split(":")[1]) for key in keys]
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    cache = StubCache(
+        {
+            "cached": {
+                "account_id": "cached",
+                "timeframe": "last_7d",
+                "meta": {"spend": 1},
+                "competitor": {},
+                "insight": {"text": "From cache", "provider": "claude"},
+                "created_at": datetime(2024, 1, 1).isoformat(),
+            }
+        }
+    )
+    monkeypatch.setattr(reports.service, "cache", cache)
+    monkeypatch.setattr(report_export_service, "get_session", contextmanager(lambda: (yield db)))
+    app.dependency_overrides[get_db_session] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def _run(account_id: str, text: str) -> ReportRun:
+    return ReportRun(
+        account_id=account_id,
+        timeframe="last_7d",
+        insight_text=text,
+        insight_metadata={},
+        created_at=datetime.now(UTC),
+    )
+
+
+def test_batch_reports_combine_cache_hits_and_latest_db_runs(client, db):
+    db.add_all([_run("db", "old"), _run("db", "new"), _run("other", "x")])
+    db.commit()
+
+    resp = client.get("/reports/", params={"account_ids": "cached,db,unknown"})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["reports"]["cached"]["insight"]["summary"] == "From cache"
+    assert body["reports"]["db"]["insight"]["summary"] == "new"
+    assert body["missing"] == ["unknown"]
+
+
+def test_batch_reports_post_body(client, db):
+    db.add(_run("db", "only"))
+    db.commit()
+
+    resp = client.post("/reports/batch", json={"account_ids": ["db"]})
+
+    assert resp.status_code == 200
+    assert list(resp.json()["reports"]) == ["db"]
+
+
+def test_history_streams_newest_first_with_keyset_cursor(client, db):
+    db.add_all([_run("acct", f"run {i}") for i in range(5)] + [_run("other", "x")])
+    db.commit()
+
+    resp = client.get("/reports/acct/history", params={"limit": 2, "fields": "insight_text"})
+    page = [json.loads(line) for line in resp.text.splitlines()]
+
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert [row["insight_text"] for row in page] == ["run 4", "run 3"]
+    assert set(page[0]) == {"id", "insight_text"}
+
+    resp = client.get("/reports/acct/history", params={"limit": 2, "before_id": page[-1]["id"]})
+    assert [json.loads(line)["insight_text"] for line in resp.text.splitlines()] == ["run 2", "run 1"]
+
+
+def test_export_csv_with_projection(client, db):
+    db.add_all([_run("a", "one"), _run("b", "two")])
+    db.commit()
+
+    resp = client.get(
+        "/reports/export", params={"account_ids": "a,b", "format": "csv", "fields": "account_id,insight_metadata"}
+    )
+    rows = list(csv.reader(io.StringIO(resp.text)))
+
+    assert rows[0] == ["id", "account_id", "insight_metadata"]
+    assert [row[1] for row in rows[1:]] == ["a", "b"]
+    assert rows[1][2] == "{}"
+
+
+def test_export_rejects_unknown_fields_and_unscoped_requests(client):
+    resp = client.get("/reports/export", params={"account_ids": "a", "fields": "password"})
+    assert resp.status_code == 400
+    assert client.get("/reports/export").status_code == 422
+    assert client.get("/reports/export", params={"account_ids": " , "}).status_code == 400
+    assert client.get("/reports/export", params={"account_ids": "a", "limit": 10**6}).status_code == 422
+
+
+def test_sparse_fields_and_negotiated_compression(client, db, monkeypatch):
+    from app import responses
+
+    run = _run("db", "new")
+    run.meta_payload = {"spend": 10, "purchase_roas": 3.2, "breakdowns": {"campaign": [{"id": i} for i in range(200)]}}
+    db.add(run)
+    db.commit()
+
+    resp = client.get("/reports/", params={"account_ids": "db", "fields": "insight,meta.spend"})
+    report = resp.json()["reports"]["db"]
+    assert set(report) == {"account_id", "created_at", "insight", "meta"}
+    assert report["meta"] == {"spend": 10}
+
+    assert client.get("/reports/db", params={"fields": "nope"}).status_code == 400
+
+    monkeypatch.setattr(responses.settings, "response_compress_min_bytes", 100)
+    resp = client.get("/reports/db", headers={"Accept-Encoding": "gzip, br;q=0.5"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.json()["report"]["meta"]["breakdowns"]["campaign"][199] == {"id": 199}
+
+    # brotli is the optional "compression" extra; without it the next accepted encoding is used.
+    resp = client.get("/reports/db", headers={"Accept-Encoding": "br, gzip;q=0.5"})
+    assert resp.headers["content-encoding"] == ("br" if responses.brotli is not None else "gzip")
+    assert resp.json()["report"]["account_id"] == "db"
+
+    assert "content-encoding" not in client.get("/reports/db", headers={"Accept-Encoding": "identity"}).headers
@@ -0,0 +1,67 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlmodel import select
+
+from app.models.report import AlertEvent, ReportDailySummary, ReportRun
+from app.services.retention_service import RetentionService
+
+NOW = datetime(2024, 6, 1, 12, tzinfo=UTC)
+
+
+def _run(
+    account_id: str, created_at: datetime, spend: float, text: str = "insight", structured: bool = True
+) -> ReportRun:
+    return ReportRun(
+        account_id=account_id,
+        timeframe="last_7d",
+        meta_payload={"spend": spend},
+        insight_text=text,
+        insight_structured={"summary": text} if structured else {},
+        created_at=created_at,
+    )
+
+
+def test_rollup_keeps_last_run_per_day_and_summarizes(db):
+    day = NOW - timedelta(days=40)
+    db.add_all([_run("a", day + timedelta(hours=h), spend=10 * (h + 1), text=f"t{h}") for h in range(3)])
+    db.add(_run("a", NOW - timedelta(days=1), spend=1))
+    db.commit()
+
+    stats = RetentionService(policies={}).compact(db, now=NOW)
+    summary = db.exec(select(ReportDailySummary)).one()
+    remaining = db.exec(select(ReportRun.id)).all()
+
+    assert stats["rolled_up_days"] == 1 and stats["deleted_runs"] == 2
+    assert summary.run_count == 3 and summary.avg_spend == 20
+    assert summary.last_run_id in remaining and len(remaining) == 2
+
+
+def test_prune_and_per_account_alert_retention(db):
+    db.add_all([_run("a", NOW - timedelta(days=10, hours=h), spend=1, text="same") for h in range(3)])
+    db.add_all(
+        [
+            AlertEvent(account_id=account, alert_type="cpc", severity="high", message="m", created_at=NOW - timedelta(days=age))
+            for account, age in [("a", 40), ("a", 5), ("b", 40)]
+        ]
+    )
+    db.commit()
+
+    stats = RetentionService(policies={"a": {"alert_retention_days": 30}}, batch_size=1).compact(db, now=NOW)
+    texts = sorted(db.exec(select(ReportRun.insight_text)).all())
+    alerts = sorted(db.exec(select(AlertEvent.account_id)).all())
+
+    assert stats["pruned_runs"] == 2
+    assert texts == ["", "", "same"]
+    assert alerts == ["a", "b"]
+
+
+def test_prune_keeps_the_text_of_runs_without_structured_insight(db):
+    db.add_all(
+        [_run("a", NOW - timedelta(days=10, hours=h), spend=1, text="same", structured=False) for h in range(2)]
+    )
+    db.commit()
+
+    stats = RetentionService(policies={}).compact(db, now=NOW)
+
+    assert stats["pruned_runs"] == 0
+    assert db.exec(select(ReportRun.insight_text)).all() == ["same", "same"]
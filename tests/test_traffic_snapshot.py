@@ -0,0 +1,36 @@
+from app.services.traffic_snapshot import TrafficSnapshot
+
+
+def test_upstream_strings_and_numbers_normalize_to_numeric_fields():
+    snapshot = TrafficSnapshot.from_upstream(
+        {"visits": "52.0K", "bounceRate": 0.45, "avg_visit_duration": "2m 5s", "mobile_percentage": 60, "extra": "x" * 1000},
+        "example.com",
+        fetched_at=1700000000,
+    )
+
+    assert snapshot.monthly_visits == 52000
+    assert snapshot.bounce_rate == 0.45
+    assert snapshot.avg_duration_seconds == 125
+    assert snapshot.mobile_share == 0.6
+    assert "extra" not in snapshot.to_dict()
+
+
+def test_display_formats_only_at_the_edge_and_roundtrips():
+    snapshot = TrafficSnapshot(domain="a.com", fetched_at=1, monthly_visits=1_250_000, bounce_rate=0.412)
+
+    assert snapshot.display()["monthly_visits"] == "1.2M"
+    assert snapshot.display()["bounce_rate"] == "41.2%"
+    assert snapshot.display()["avg_duration"] == "N/A"
+    assert TrafficSnapshot.from_dict(snapshot.to_dict()) == snapshot
+
+
+def test_fraction_strings_and_zero_values_are_kept():
+    snapshot = TrafficSnapshot.from_upstream(
+        {"monthly_visits": 0, "visits": "52.0K", "bounce_rate": "0.45", "deviceSplit": "60%"},
+        "example.com",
+        fetched_at=1700000000,
+    )
+
+    assert snapshot.monthly_visits == 0
+    assert snapshot.bounce_rate == 0.45
+    assert snapshot.mobile_share == 0.6
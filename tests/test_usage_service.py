@@ -0,0 +1,94 @@
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from sqlmodel import select
+
+from app.models.usage import LLMUsageHourly
+from app.services.ai_providers import AIProviderFactory
+from app.services.insight_service import InsightService
+from app.services.usage_service import LLMUsageRecord, UsageService
+
+HOUR = datetime(2024, 6, 1, 9, tzinfo=UTC)
+
+
+def _record(account_id, task, minute, tokens, latency, error=False):
+    return LLMUsageRecord(
+        account_id=account_id,
+        task=task,
+        provider="claude",
+        model="sonnet",
+        input_tokens=tokens,
+        output_tokens=tokens // 2,
+        latency_ms=latency,
+        error=error,
+        at=HOUR.replace(minute=minute),
+    )
+
+
+def test_calls_in_the_same_hour_fold_into_one_row_and_aggregate_by_task(session_factory):
+    service = UsageService(session_factory)
+    service.record(_record("a", "market_gap_analysis", 1, 100, 800))
+    service.record(_record("a", "market_gap_analysis", 40, 300, 1200))
+    service.record(_record("b", "market_gap_analysis", 5, 50, 400, error=True))
+    service.record(_record("a", "executive_summary", 7, 20, 300))
+
+    with service.session_factory() as db:
+        assert len(db.exec(select(LLMUsageHourly)).all()) == 3
+        by_task = service.query(db, group_by=["task"])
+        by_account = service.query(db, group_by=["account_id"], task="market_gap_analysis")
+
+    assert by_task[0] == {
+        "task": "market_gap_analysis",
+        "calls": 3,
+        "errors": 1,
+        "input_tokens": 450,
+        "output_tokens": 225,
+        "avg_latency_ms": 800.0,
+        "max_latency_ms": 1200.0,
+    }
+    assert [row["account_id"] for row in by_account] == ["a", "b"]
+
+
+class StubAnthropic:
+    def __init__(self):
+        self.messages = self
+
+    def create(self, model, max_tokens, messages):
+        return SimpleNamespace(
+            content=[SimpleNamespace(text="legacy insight")],
+            usage=SimpleNamespace(input_tokens=120, output_tokens=40),
+        )
+
+
+def test_legacy_insight_fallback_is_recorded(session_factory, monkeypatch):
+    def unavailable(name):
+        raise ValueError(f"{name} not configured")
+
+    monkeypatch.setattr(AIProviderFactory, "get_provider", staticmethod(unavailable))
+    service = InsightService(usage_service=UsageService(session_factory), router=None)
+    service._anthropic = StubAnthropic()
+
+    result = service.generate({"spend": 1}, {}, provider="claude", account_id="a")
+
+    with session_factory() as db:
+        row = db.exec(select(LLMUsageHourly)).one()
+    assert result["text"] == "legacy insight"
+    assert (row.account_id, row.task, row.provider, row.calls) == ("a", "insight", "claude", 1)
+    assert (row.input_tokens, row.output_tokens, row.errors) == (120, 40, 0)
+
+
+def test_failed_provider_call_is_recorded_as_an_error(session_factory, monkeypatch):
+    class FailingProvider:
+        def generate(self, prompt, **kwargs):
+            raise RuntimeError("upstream 529")
+
+    monkeypatch.setattr(AIProviderFactory, "get_provider", staticmethod(lambda name: FailingProvider()))
+    service = InsightService(usage_service=UsageService(session_factory), router=None)
+    service._anthropic = StubAnthropic()
+
+    result = service.generate({"spend": 1}, {}, provider="claude", account_id="a")
+
+    with session_factory() as db:
+        by_model = {row["model"]: row for row in service.usage_service.query(db, group_by=["model"])}
+    assert result["text"] == "legacy insight"
+    assert (by_model["default"]["calls"], by_model["default"]["errors"]) == (1, 1)
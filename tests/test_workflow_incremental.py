@@ -0,0 +1,70 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlmodel import select
+
+from app.models.workflow import WorkflowStepResult
+from app.services.ai_providers import AIProvider, AIProviderFactory, AIResponse
+from app.services.retention_service import RetentionService
+from app.services.usage_service import UsageService
+from app.services.workflow_service import WorkflowService, WorkflowTask
+from app.services.workflow_step_store import WorkflowStepStore
+
+
+class CountingProvider(AIProvider):
+    def __init__(self, name):
+        self.name = name
+        self.prompts = []
+
+    def is_available(self):
+        return True
+
+    def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return AIResponse(content=f"out {len(self.prompts)}", provider=self.name, model="stub", metadata={})
+
+
+async def test_rerun_recomputes_only_steps_whose_inputs_changed(monkeypatch, session_factory):
+    providers = {"claude": CountingProvider("claude"), "gemini": CountingProvider("gemini")}
+    monkeypatch.setattr(AIProviderFactory, "_providers", providers)
+    service = WorkflowService(
+        step_store=WorkflowStepStore(session_factory), usage_service=UsageService(session_factory)
+    )
+    meta = {"spend": 100}
+
+    first = await service.generate_market_research_report("shop.com", meta, {"a": "rival.com"})
+    calls = len(providers["claude"].prompts) + len(providers["gemini"].prompts)
+    second = await service.generate_market_research_report("shop.com", meta, {"a": "other.com"})
+    rerun = {
+        task for task, info in second["workflow_metadata"].items() if not info["cached"]
+    }
+
+    assert calls == 7
+    assert not any(info["cached"] for info in first["workflow_metadata"].values())
+    # competitor_data feeds gap and growth; recommendations and summary depend on them.
+    assert rerun == {
+        WorkflowTask.MARKET_GAP_ANALYSIS.value,
+        WorkflowTask.GROWTH_OPPORTUNITY_IDENTIFICATION.value,
+        WorkflowTask.STRATEGIC_RECOMMENDATIONS.value,
+        WorkflowTask.EXECUTIVE_SUMMARY.value,
+    }
+    assert second["meta_diagnostic"] == first["meta_diagnostic"]
+
+    forced = await service.generate_market_research_report("shop.com", meta, {"a": "other.com"}, reuse=False)
+    assert not any(info["cached"] for info in forced["workflow_metadata"].values())
+
+
+def test_expired_steps_are_recomputed_and_pruned(session_factory, db):
+    store = WorkflowStepStore(session_factory, max_age_days=14)
+    store.put("summary", "fp", "shop.com", AIResponse(content="old", provider="claude", model="stub", metadata={}))
+    row = db.exec(select(WorkflowStepResult)).one()
+    row.created_at = datetime.now(UTC) - timedelta(days=20)
+    db.add(row)
+    db.commit()
+
+    assert store.get("summary", "fp") is None
+    store.put("summary", "fp", "shop.com", AIResponse(content="new", provider="claude", model="stub", metadata={}))
+    assert store.get("summary", "fp").content == "new"
+
+    store.put("growth", "fp", "shop.com", AIResponse(content="x", provider="claude", model="stub", metadata={}))
+    cutoff = datetime.now(UTC) + timedelta(seconds=1)
+    assert RetentionService(policies={}).delete_step_results(db, cutoff) == 2
@@ -0,0 +1,93 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.dependencies import get_db_session
+from app.main import app
+from app.models.workflow import WorkflowJob
+from app.routers import workflow
+from app.services.ai_providers import AIProvider, AIProviderFactory, AIResponse
+from app.services.usage_service import UsageService
+from app.services.workflow_job_service import WorkflowJobService
+from app.services.workflow_service import WorkflowConfig, WorkflowService
+from app.services.workflow_step_store import WorkflowStepStore
+
+
+class EchoProvider(AIProvider):
+    def __init__(self, name):
+        self.name = name
+
+    def is_available(self):
+        return True
+
+    def generate(self, prompt, **kwargs):
+        return AIResponse(content=f"{self.name} answer", provider=self.name, model="stub", metadata={})
+
+
+@pytest.fixture
+def setup(monkeypatch, session_factory):
+    def db_override():
+        with session_factory() as session:
+            yield session
+
+    monkeypatch.setattr(
+        AIProviderFactory, "_providers", {"claude": EchoProvider("claude"), "gemini": EchoProvider("gemini")}
+    )
+    service = WorkflowService(
+        workflow_config=WorkflowConfig(),
+        step_store=WorkflowStepStore(session_factory),
+        usage_service=UsageService(session_factory),
+    )
+    jobs = WorkflowJobService(workflow_service=service, session_factory=session_factory, poll_seconds=0.01)
+    queued = []
+    monkeypatch.setattr(workflow, "workflow_service", service)
+    monkeypatch.setattr(workflow, "job_service", jobs)
+    monkeypatch.setattr(workflow, "enqueue_workflow_job", queued.append)
+    app.dependency_overrides[get_db_session] = db_override
+    yield TestClient(app), jobs, queued, service
+    app.dependency_overrides.clear()
+
+
+def test_job_is_queued_with_its_own_config_and_result_is_persisted(setup):
+    client, jobs, queued, service = setup
+
+    resp = client.post(
+        "/workflow/jobs",
+        json={"domain": "shop.com", "meta_data": {"spend": 1}, "custom_config": {"executive_summary": "gemini"}},
+    )
+    assert resp.status_code == 202
+    job_id = resp.json()["job_id"]
+    assert queued == [job_id]
+    assert client.get(f"/workflow/jobs/{job_id}/result").status_code == 409
+    # The shared default mapping is untouched by the job's custom config.
+    assert service.config.get_provider_for_task("executive_summary") == "claude"
+
+    assert jobs.run(job_id) == "succeeded"
+
+    status = client.get(f"/workflow/jobs/{job_id}", params={"wait": 1}).json()
+    result = client.get(f"/workflow/jobs/{job_id}/result").json()
+    assert status["status"] == "succeeded"
+    assert result["executive_summary"] == "gemini answer"
+    assert result["workflow_metadata"]["executive_summary"]["provider"] == "gemini"
+    assert jobs.run(job_id) == "succeeded"
+
+
+def test_unknown_job_returns_404(setup):
+    client, *_ = setup
+    assert client.get("/workflow/jobs/missing").status_code == 404
+
+
+def test_running_job_past_the_time_limit_is_reported_failed(setup, db):
+    client, *_ = setup
+    db.add(
+        WorkflowJob(
+            id="stuck", domain="shop.com", status="running", started_at=datetime.now(UTC) - timedelta(hours=2)
+        )
+    )
+    db.commit()
+
+    status = client.get("/workflow/jobs/stuck", params={"wait": 1}).json()
+
+    assert status["status"] == "failed"
+    assert status["error"] == "worker time limit exceeded"